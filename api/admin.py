@@ -38,4 +38,11 @@ custom_admin_site.register(Produccion, ProduccionAdmin)
 custom_admin_site.register(ProduccionTurno, ProduccionTurnoAdmin)
 custom_admin_site.register(FallaTurno, FallaTurnoAdmin)
 custom_admin_site.register(ParadaTurno, ParadaTurnoAdmin)
-custom_admin_site.register(NodeRedLog, NodeRedLogAdmin)
\ No newline at end of file
+custom_admin_site.register(NodeRedLog, NodeRedLogAdmin)
+custom_admin_site.register(IndicadorConfiabilidad, IndicadorConfiabilidadAdmin)
+custom_admin_site.register(ResumenDetencion, ResumenDetencionAdmin)
+custom_admin_site.register(CapacidadVariable, CapacidadVariableAdmin)
+custom_admin_site.register(PrediccionVariable, PrediccionVariableAdmin)
+custom_admin_site.register(PlanMantenimiento, PlanMantenimientoAdmin)
+custom_admin_site.register(VencimientoMantenimiento, VencimientoMantenimientoAdmin)
+custom_admin_site.register(ResumenNotificacionArchivada, ResumenNotificacionArchivadaAdmin)
@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.db.models import Q
 from .models import *
 from django.contrib.auth.admin import UserAdmin
+from . import jerarquia_service
 
 # ---------------------- #
 # Filtros personalizados #
@@ -17,7 +18,7 @@ class LineaProduccionFilter(admin.SimpleListFilter):
     parameter_name = 'linea'
 
     def lookups(self, request, model_admin):
-        return [(str(lp.id), lp.nombre) for lp in LineaProduccion.objects.all()]
+        return jerarquia_service.opciones_lineas()
 
     def queryset(self, request, queryset):
         if self.value():
@@ -34,8 +35,7 @@ class SectorFilter(admin.SimpleListFilter):
     parameter_name = 'sector'
 
     def lookups(self, request, model_admin):
-        sectores = Sector.objects.select_related('linea').all()
-        return [(str(s.id), f"{s.linea.nombre} - {s.nombre}") for s in sectores]
+        return jerarquia_service.opciones_sectores()
 
     def queryset(self, request, queryset):
         if self.value():
@@ -339,9 +339,9 @@ class DispositivoAppAdmin(admin.ModelAdmin):
     list_filter = ('plataforma', 'esta_activo')
 
 class ProduccionAdmin(admin.ModelAdmin):
-    list_display = ('fecha', 'turno', 'linea', 'meta_produccion', 'eficiencia', 'fuente_dato')
+    list_display = ('fecha', 'turno', 'linea', 'producto', 'meta_produccion', 'eficiencia', 'fuente_dato')
     list_filter = ('fecha', 'turno', 'linea', 'fuente_dato')
-    search_fields = ('linea__nombre', 'turno__nombre')
+    search_fields = ('linea__nombre', 'turno__nombre', '=componentes__producto')
 
 class ProduccionTurnoAdmin(admin.ModelAdmin):
     list_display = ('fecha', 'turno', 'linea', 'cantidad', 'unidad', 'meta_produccion', 'eficiencia', 'fuente_dato')
@@ -365,4 +365,49 @@ class NodeRedLogAdmin(admin.ModelAdmin):
     list_display = ('tipo_dato', 'fecha_recepcion', 'estado', 'registros_afectados')
     list_filter = ('tipo_dato', 'estado', 'fecha_recepcion')
     search_fields = ('mensaje',)
-    readonly_fields = ('fecha_recepcion',)
\ No newline at end of file
+    readonly_fields = ('fecha_recepcion',)
+
+class IndicadorConfiabilidadAdmin(admin.ModelAdmin):
+    list_display = ('activo_tipo', 'activo_nombre', 'linea', 'cantidad_fallas', 'mtbf_horas', 'mttr_horas', 'tasa_fallas', 'actualizado')
+    list_filter = ('activo_tipo', 'linea')
+    search_fields = ('activo_nombre',)
+    readonly_fields = ('actualizado',)
+
+class ResumenDetencionAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'linea', 'turno', 'origen', 'dimension', 'valor', 'registros', 'minutos', 'cantidad')
+    list_filter = ('origen', 'dimension', 'linea', 'turno')
+    date_hierarchy = 'fecha'
+
+class CapacidadVariableAdmin(admin.ModelAdmin):
+    list_display = ('variable', 'muestras', 'media', 'sigma', 'cp', 'cpk', 'total_violaciones', 'actualizado')
+    search_fields = ('variable__nombre', 'variable__ruta__nombre')
+    readonly_fields = ('actualizado',)
+
+
+class PrediccionVariableAdmin(admin.ModelAdmin):
+    list_display = ('variable', 'muestras', 'anomalias', 'score', 'en_alerta', 'actualizado')
+    list_filter = ('en_alerta',)
+    search_fields = ('variable__nombre', 'variable__ruta__nombre')
+    readonly_fields = ('actualizado',)
+
+
+class PlanMantenimientoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'equipo_tipo', 'intervalo_dias', 'intervalo_horas', 'anticipacion_dias', 'prioridad', 'activo')
+    list_filter = ('equipo_tipo', 'activo', 'prioridad')
+    search_fields = ('nombre',)
+
+
+class VencimientoMantenimientoAdmin(admin.ModelAdmin):
+    list_display = ('plan', 'equipo_tipo', 'equipo_id', 'fecha_vencimiento', 'horas_vencimiento', 'orden')
+    list_filter = ('equipo_tipo', 'plan')
+    date_hierarchy = 'fecha_vencimiento'
+    raw_id_fields = ('orden',)
+    readonly_fields = ('actualizado',)
+
+
+class ResumenNotificacionArchivadaAdmin(admin.ModelAdmin):
+    list_display = ('usuario_id', 'mes', 'tipo', 'cantidad', 'leidas', 'actualizado')
+    list_filter = ('tipo',)
+    search_fields = ('usuario_id',)
+    date_hierarchy = 'mes'
+    readonly_fields = ('actualizado',)
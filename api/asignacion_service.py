@@ -0,0 +1,145 @@
+# api/asignacion_service.py
+"""
+Asignación de órdenes de mantenimiento balanceando la carga de los técnicos.
+
+La carga de cada técnico es la suma de tiempo_estimado de sus órdenes
+asignadas / en proceso (TIEMPO_POR_DEFECTO si la orden no lo tiene). Se lee
+con una sola consulta agregada y se mantiene en un heap: cada asignación toma
+al técnico menos cargado y lo reinserta con la carga nueva, O(log n).
+
+Las órdenes se asignan por prioridad (crítica primero) y antigüedad; el lote
+completo se guarda con bulk_update dentro de una transacción y cada técnico
+recibe una sola notificación con todas sus órdenes nuevas.
+"""
+import heapq
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import OrdenMantenimiento, HistorialCambioOrden, User
+from . import busqueda_service
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_ABIERTOS = ('asignada', 'en_proceso')
+PRIORIDAD_RANGO = {'critica': 0, 'alta': 1, 'media': 2, 'baja': 3}
+TIEMPO_POR_DEFECTO = 60
+
+
+def _tiempo(orden):
+    return orden.tiempo_estimado or TIEMPO_POR_DEFECTO
+
+
+class ColaTecnicos:
+    """Min-heap de técnicos por (carga en minutos, órdenes abiertas, id)"""
+
+    def __init__(self, cargas):
+        self._heap = [(carga, abiertas, tecnico_id) for tecnico_id, (carga, abiertas) in cargas.items()]
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def desde_bd(cls, tecnico_ids=None):
+        return cls(cargas_tecnicos(tecnico_ids))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def asignar(self, minutos):
+        """Devuelve el técnico menos cargado y le suma `minutos`"""
+        carga, abiertas, tecnico_id = self._heap[0]
+        heapq.heapreplace(self._heap, (carga + minutos, abiertas + 1, tecnico_id))
+        return tecnico_id
+
+    def cargas(self):
+        return {tecnico_id: {'carga_minutos': carga, 'ordenes_abiertas': abiertas}
+                for carga, abiertas, tecnico_id in self._heap}
+
+
+def cargas_tecnicos(tecnico_ids=None):
+    """{tecnico_id: (minutos abiertos, órdenes abiertas)} en una consulta"""
+    abiertas = Q(ordenes_asignadas__estado__in=ESTADOS_ABIERTOS)
+    tecnicos = User.objects.filter(role='tecnico', is_active=True)
+    if tecnico_ids:
+        tecnicos = tecnicos.filter(pk__in=tecnico_ids)
+    filas = tecnicos.annotate(
+        carga=Coalesce(Sum(
+            Coalesce('ordenes_asignadas__tiempo_estimado', Value(TIEMPO_POR_DEFECTO)), filter=abiertas
+        ), 0),
+        abiertas=Count('ordenes_asignadas', filter=abiertas),
+    ).values_list('id', 'carga', 'abiertas')
+    return {tecnico_id: (carga, cantidad) for tecnico_id, carga, cantidad in filas}
+
+
+def ordenar_por_prioridad(ordenes):
+    return sorted(ordenes, key=lambda o: (PRIORIDAD_RANGO.get(o.prioridad, len(PRIORIDAD_RANGO)), o.fecha_creacion, o.pk))
+
+
+def asignar_ordenes(orden_ids=None, tecnico_ids=None, usuario=None, notificar=True):
+    """
+    Asigna las órdenes pendientes sin operario (todas o las indicadas) en una transacción.
+    Devuelve (asignaciones [(orden, tecnico_id)], cola) para informar las cargas resultantes.
+    """
+    with transaction.atomic():
+        cola = ColaTecnicos.desde_bd(tecnico_ids)
+        if not len(cola):
+            return [], cola
+
+        pendientes = OrdenMantenimiento.objects.select_for_update(skip_locked=True).filter(
+            estado='pendiente', operario_asignado__isnull=True
+        )
+        if orden_ids is not None:
+            pendientes = pendientes.filter(pk__in=orden_ids)
+
+        asignaciones = []
+        for orden in ordenar_por_prioridad(pendientes):
+            tecnico_id = cola.asignar(_tiempo(orden))
+            orden.operario_asignado_id = tecnico_id
+            orden.estado = 'asignada'
+            asignaciones.append((orden, tecnico_id))
+
+        if not asignaciones:
+            return [], cola
+
+        OrdenMantenimiento.objects.bulk_update([o for o, _ in asignaciones], ['operario_asignado', 'estado'], batch_size=500)
+        # Un registro por campo modificado, cada uno con sus propios valores
+        historial = []
+        for orden, tecnico_id in asignaciones:
+            historial.append(HistorialCambioOrden(
+                orden=orden, usuario=usuario, tipo_cambio='estado', campo_afectado='estado',
+                valor_anterior='pendiente', valor_nuevo='asignada',
+            ))
+            historial.append(HistorialCambioOrden(
+                orden=orden, usuario=usuario, tipo_cambio='asignacion', campo_afectado='operario_asignado',
+                valor_anterior=None, valor_nuevo=str(tecnico_id),
+            ))
+        HistorialCambioOrden.objects.bulk_create(historial, batch_size=500)
+
+        # bulk_update no dispara post_save: se reindexa el estado para la búsqueda global
+        busqueda_service.indexar_queryset(
+            'orden', OrdenMantenimiento.objects.filter(pk__in=[o.pk for o, _ in asignaciones])
+        )
+
+        if notificar:
+            por_tecnico = {}
+            for orden, tecnico_id in asignaciones:
+                por_tecnico.setdefault(tecnico_id, []).append(orden.pk)
+
+            def enviar():
+                from .notification_service import NotificationService
+                service = NotificationService()
+                for tecnico_id, ids in por_tecnico.items():
+                    service.notificar_asignacion_lote(tecnico_id, ids)
+            transaction.on_commit(enviar)
+
+    logger.info(f"Asignación automática: {len(asignaciones)} órdenes entre {len(cola)} técnicos")
+    return asignaciones, cola
+
+
+def elegir_tecnico(tiempo_estimado=None):
+    """Técnico menos cargado para una orden nueva (None si no hay técnicos activos)"""
+    cola = ColaTecnicos.desde_bd()
+    if not len(cola):
+        return None
+    return cola.asignar(tiempo_estimado or TIEMPO_POR_DEFECTO)
@@ -0,0 +1,116 @@
+# api/authentication.py
+"""
+Autenticación JWT sin consulta del usuario en cada petición.
+
+JWTAuthentication de simplejwt lee la fila de User en cada request (los
+dashboards y Node-RED consultan varias veces por segundo). Acá el usuario se
+arma desde una foto de sus campos en caché (Redis, TTL corto) con
+User.from_db(): es una instancia real (sirve para asignar FKs como
+creado_por=request.user) y los campos que no están en la foto (password,
+last_login, ...) quedan diferidos y se leen de la base solo si alguien los usa.
+
+- La foto se guarda al emitir tokens (login) y la borran las señales de User
+  al guardar o eliminar, así que un cambio de rol o una desactivación se ve en
+  la petición siguiente. Los update() masivos sobre User no disparan señales:
+  los cubre el TTL (AUTH_USUARIO_CACHE_TTL).
+- Todos los tokens llevan username/role/email como claims
+  (CustomTokenObtainPairSerializer.get_token) para que los clientes no pidan
+  /user-info/; para autorizar se usa la foto, porque los claims no reflejan un
+  cambio de rol o una desactivación hasta que el token vence.
+- Si la caché no responde se consulta la base como siempre.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _clave(user_id):
+    return f"auth:usuario:{user_id}"
+
+
+def _foto(user):
+    foto = {campo: getattr(user, campo) for campo in CAMPOS}
+    if api_settings.CHECK_REVOKE_TOKEN:
+        foto[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(user.password)
+    return foto
+
+
+def cachear_usuario(user):
+    try:
+        cache.set(_clave(user.pk), _foto(user), getattr(settings, 'AUTH_USUARIO_CACHE_TTL', 300))
+    except Exception as e:
+        logger.warning(f"No se pudo cachear el usuario {user.pk}: {e}")
+
+
+def _borrar(user_id):
+    try:
+        cache.delete(_clave(user_id))
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar el usuario {user_id} en caché: {e}")
+
+
+def invalidar_usuario(user_id):
+    """Borra la foto ahora y al confirmar (una petición concurrente pudo recachear la vieja)"""
+    _borrar(user_id)
+    transaction.on_commit(lambda: _borrar(user_id))
+
+
+def _desde_foto(foto):
+    # from_db() espera los valores en el orden de los campos del modelo
+    campos = [campo.attname for campo in User._meta.concrete_fields if campo.attname in CAMPOS]
+    user = User.from_db('default', campos, [foto[campo] for campo in campos])
+    user._hash_password_token = foto.get(api_settings.REVOKE_TOKEN_CLAIM)
+    return user
+
+
+def obtener_usuario(user_id):
+    """User (campos de CAMPOS cargados) desde la caché o, si no está, desde la base"""
+    try:
+        foto = cache.get(_clave(user_id))
+    except Exception as e:
+        logger.warning(f"Caché de usuarios no disponible: {e}")
+        return User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    if foto is not None:
+        return _desde_foto(foto)
+
+    user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    cachear_usuario(user)
+    return user
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que toma el usuario de la caché (ver docstring del módulo)"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = obtener_usuario(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            hash_password = getattr(user, '_hash_password_token', None) or get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != hash_password:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,98 @@
+# api/bandeja_service.py
+"""
+Bandeja de notificaciones incremental para la app móvil.
+
+La app guardaba la lista completa de no leídas y la volvía a descargar en cada
+sondeo. Ahora envía el id de la última notificación que tiene (`since`) y
+recibe solo las nuevas; el long-poll deja la petición abierta hasta que llega
+alguna:
+
+- La señal post_save de NotificacionApp (y el envío masivo, que usa
+  bulk_create) publica en Redis (canal por usuario) al confirmar la
+  transacción que crea la notificación.
+- esperar() consulta una vez, se suscribe al canal, vuelve a consultar (cierra
+  la carrera entre la consulta y la suscripción) y bloquea hasta el mensaje o
+  el timeout; al vencer hace una última consulta por si se perdió un mensaje.
+- Sin Redis (caché local en desarrollo) se degrada a sondear la base cada
+  INTERVALO_SIN_REDIS segundos dentro del mismo timeout.
+"""
+import logging
+import time
+
+from django.conf import settings
+
+from .models import NotificacionApp
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_MAXIMO = getattr(settings, 'NOTIFICACIONES_LONG_POLL_MAX', 25)
+INTERVALO_SIN_REDIS = 2
+LIMITE = 100
+
+
+def _canal(usuario_id):
+    return f"notificaciones:bandeja:{usuario_id}"
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def publicar(usuario_ids):
+    """Despierta a los long-poll abiertos de los usuarios (nunca falla la creación)"""
+    try:
+        conexion = _redis()
+        with conexion.pipeline(transaction=False) as pipe:
+            for usuario_id in set(usuario_ids):
+                pipe.publish(_canal(usuario_id), 1)
+            pipe.execute()
+    except Exception as e:
+        logger.debug(f"Sin pub/sub de notificaciones: {e}")
+
+
+def nuevas(usuario_id, since=0, limite=LIMITE):
+    """No leídas del usuario con id > since, de la más antigua a la más nueva"""
+    return list(
+        NotificacionApp.objects.filter(usuario_id=usuario_id, leida=False, id__gt=since or 0)
+        .order_by('id')[:limite]
+    )
+
+
+def _suscribir(usuario_id):
+    """PubSub suscrito al canal del usuario, o None si Redis no está disponible"""
+    try:
+        pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(_canal(usuario_id))
+        return pubsub
+    except Exception:
+        return None
+
+
+def esperar(usuario_id, since=0, timeout=TIMEOUT_MAXIMO):
+    """Notificaciones nuevas desde `since`, bloqueando hasta `timeout` segundos si aún no hay"""
+    timeout = max(0, min(float(timeout), TIMEOUT_MAXIMO))
+    filas = nuevas(usuario_id, since)
+    if filas or not timeout:
+        return filas
+
+    limite = time.monotonic() + timeout
+    pubsub = _suscribir(usuario_id)
+    if pubsub is None:
+        while time.monotonic() < limite:
+            time.sleep(min(INTERVALO_SIN_REDIS, max(limite - time.monotonic(), 0)))
+            filas = nuevas(usuario_id, since)
+            if filas:
+                return filas
+        return []
+
+    try:
+        filas = nuevas(usuario_id, since)
+        while not filas and time.monotonic() < limite:
+            mensaje = pubsub.get_message(timeout=max(limite - time.monotonic(), 0))
+            if mensaje:
+                filas = nuevas(usuario_id, since)
+        # pub/sub no garantiza la entrega: al vencer el timeout se consulta una última vez
+        return filas or nuevas(usuario_id, since)
+    finally:
+        pubsub.close()
@@ -0,0 +1,213 @@
+# api/busqueda_service.py
+"""
+Índice de búsqueda global (SearchDocument).
+
+Cada Motor, Variador, PLC, PLCEntradaSalida y OrdenMantenimiento tiene un
+documento con su texto buscable y el payload que devuelve BusquedaGlobalView.
+Las señales lo mantienen al día y la consulta usa el motor de texto completo
+de la base de datos:
+
+- PostgreSQL: tsvector ('simple') con prefijos + pg_trgm para subcadenas,
+  ambos sobre índices GIN creados en la migración.
+- SQLite: tabla virtual FTS5 (api_searchdocument_fts) sincronizada por triggers,
+  más LIKE por subcadena cuando hay términos cortos o con dígitos ('001' en 'MTR001').
+- Otros motores: icontains sobre la tabla desnormalizada.
+"""
+import json
+import logging
+import re
+
+from django.apps import apps as django_apps
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLA = 'api_searchdocument_fts'
+
+# tipo -> modelo, grupo en la respuesta, campos devueltos, campos buscables, límite
+FUENTES = {
+    'motor': {
+        'modelo': 'Motor', 'grupo': 'motores', 'limite': 10,
+        'campos': ['id', 'codigo', 'tipo', 'estado'],
+        'texto': ['codigo', 'tipo'],
+    },
+    'variador': {
+        'modelo': 'Variador', 'grupo': 'variadores', 'limite': 10,
+        'campos': ['id', 'codigo', 'marca', 'modelo', 'estado'],
+        'texto': ['codigo', 'marca', 'modelo'],
+    },
+    'plc': {
+        'modelo': 'PLC', 'grupo': 'plcs', 'limite': 10,
+        'campos': ['id', 'nombre', 'modelo', 'tipo'],
+        'texto': ['nombre', 'modelo'],
+    },
+    'entrada_salida': {
+        'modelo': 'PLCEntradaSalida', 'grupo': 'entradas_salidas', 'limite': 20,
+        'campos': ['id', 'direccion', 'etiqueta', 'tipo', 'plc__nombre'],
+        'texto': ['etiqueta', 'direccion', 'descripcion'],
+    },
+    'orden': {
+        'modelo': 'OrdenMantenimiento', 'grupo': 'ordenes', 'limite': 10,
+        'campos': ['id', 'titulo', 'estado', 'prioridad'],
+        'texto': ['titulo', 'descripcion'],
+    },
+}
+
+TIPO_POR_MODELO = {fuente['modelo']: tipo for tipo, fuente in FUENTES.items()}
+
+
+def _documentos(tipo, queryset):
+    """Construye SearchDocument a partir de un queryset del modelo origen"""
+    fuente = FUENTES[tipo]
+    columnas = list(dict.fromkeys(fuente['campos'] + fuente['texto']))
+    for fila in queryset.values(*columnas).iterator():
+        textos = [str(fila[c]) for c in fuente['texto'] if fila[c]]
+        yield SearchDocument(
+            tipo=tipo,
+            objeto_id=fila['id'],
+            titulo=(textos[0] if textos else '')[:255],
+            contenido=' '.join(textos[1:]),
+            datos={c: fila[c] for c in fuente['campos']},
+        )
+
+
+def indexar_queryset(tipo, queryset):
+    """Crea o actualiza los documentos de todas las filas del queryset"""
+    documentos = list(_documentos(tipo, queryset))
+    if not documentos:
+        return
+    SearchDocument.objects.bulk_create(
+        documentos,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['tipo', 'objeto_id'],
+        update_fields=['titulo', 'contenido', 'datos'],
+    )
+
+
+def indexar(instancia):
+    """Crea o actualiza el documento de una instancia"""
+    modelo = type(instancia)
+    indexar_queryset(TIPO_POR_MODELO[modelo.__name__], modelo.objects.filter(pk=instancia.pk))
+
+
+def eliminar(instancia):
+    tipo = TIPO_POR_MODELO[type(instancia).__name__]
+    SearchDocument.objects.filter(tipo=tipo, objeto_id=instancia.pk).delete()
+
+
+def reindexar_todo():
+    """Regenera el índice completo"""
+    SearchDocument.objects.all().delete()
+    total = 0
+    for tipo, fuente in FUENTES.items():
+        lote = list(_documentos(tipo, django_apps.get_model('api', fuente['modelo']).objects.all()))
+        SearchDocument.objects.bulk_create(lote, batch_size=1000)
+        total += len(lote)
+    logger.info(f"Índice de búsqueda regenerado: {total} documentos")
+    return total
+
+
+def _terminos(query):
+    return re.findall(r'\w[\w.\-/]*', query.lower())
+
+
+def _requiere_subcadena(terminos):
+    """FTS5 solo encuentra prefijos de token: '001' no aparece dentro de 'MTR001'"""
+    return any(len(t) < 3 or any(c.isdigit() for c in t) for t in terminos)
+
+
+def _consulta_fts5(terminos):
+    # Cada término como frase con prefijo: "m-00"* ; las comillas se duplican
+    return ' '.join('"{}"*'.format(t.replace('"', '""')) for t in terminos)
+
+
+def _consulta_tsquery(terminos):
+    partes = []
+    for termino in terminos:
+        # to_tsquery no admite operadores sueltos: se separan en lexemas con prefijo
+        lexemas = [l for l in re.split(r'[^\w]+', termino) if l]
+        partes.extend(f"{l}:*" for l in lexemas)
+    return ' & '.join(partes)
+
+
+def _buscar_sql(query, terminos):
+    """Devuelve [(tipo, datos_json)] ya ordenados por relevancia y limitados por tipo"""
+    limites = ' '.join(f"WHEN '{tipo}' THEN {f['limite']}" for tipo, f in FUENTES.items())
+    patron = '%{}%'.format(query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
+
+    if connection.vendor == 'postgresql':
+        tsquery = _consulta_tsquery(terminos)
+        if not tsquery:
+            return []
+        sql = f"""
+            SELECT tipo, datos FROM (
+                SELECT tipo, datos, ROW_NUMBER() OVER (
+                    PARTITION BY tipo
+                    ORDER BY ts_rank(to_tsvector('simple', titulo || ' ' || contenido), q) * 2
+                             + similarity(titulo, %s) DESC, id
+                ) AS n
+                FROM api_searchdocument, to_tsquery('simple', %s) q
+                WHERE to_tsvector('simple', titulo || ' ' || contenido) @@ q
+                   OR (titulo || ' ' || contenido) ILIKE %s
+            ) ranking
+            WHERE n <= CASE tipo {limites} ELSE 10 END
+            ORDER BY tipo, n
+        """
+        params = [query, tsquery, patron]
+    elif connection.vendor == 'sqlite':
+        # Términos cortos o tipo código (con dígitos) agregan una búsqueda por
+        # subcadena sobre la tabla desnormalizada; sus filas van después de las de FTS.
+        subcadena = _requiere_subcadena(terminos)
+        union = 'LEFT JOIN' if subcadena else 'JOIN'
+        filtro = "OR (d.titulo || ' ' || d.contenido) LIKE %s ESCAPE '\\'" if subcadena else ''
+        sql = f"""
+            SELECT tipo, datos FROM (
+                SELECT d.tipo, d.datos, ROW_NUMBER() OVER (
+                    PARTITION BY d.tipo ORDER BY m.rango IS NULL, m.rango, d.id
+                ) AS n
+                FROM api_searchdocument d {union} (
+                    SELECT rowid, bm25({FTS_TABLA}, 5.0, 1.0) AS rango
+                    FROM {FTS_TABLA} WHERE {FTS_TABLA} MATCH %s
+                ) m ON m.rowid = d.id
+                WHERE m.rowid IS NOT NULL {filtro}
+            )
+            WHERE n <= CASE tipo {limites} ELSE 10 END
+            ORDER BY tipo, n
+        """
+        params = [_consulta_fts5(terminos)] + ([patron] if subcadena else [])
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def buscar(query):
+    """Resultados agrupados como los devolvía BusquedaGlobalView"""
+    resultados = {fuente['grupo']: [] for fuente in FUENTES.values()}
+    query = (query or '').strip()
+    terminos = _terminos(query)
+    if not terminos:
+        return resultados
+
+    filas = _buscar_sql(query, terminos)
+    if filas is None:
+        # Motor sin índice de texto: icontains sobre la tabla desnormalizada
+        filas = []
+        for tipo, fuente in FUENTES.items():
+            filas.extend(
+                SearchDocument.objects.filter(tipo=tipo)
+                .filter(Q(titulo__icontains=query) | Q(contenido__icontains=query))
+                .values_list('tipo', 'datos')[:fuente['limite']]
+            )
+
+    for tipo, datos in filas:
+        if isinstance(datos, str):
+            datos = json.loads(datos)
+        resultados[FUENTES[tipo]['grupo']].append(datos)
+    return resultados
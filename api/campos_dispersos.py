@@ -0,0 +1,207 @@
+# api/campos_dispersos.py
+"""
+Campos a pedido (?fields= / ?omit=) para los serializers de la API.
+
+- GET /api/motores/?fields=id,codigo,estado devuelve solo esas claves;
+  ?omit=plano_url,imagen_url quita las indicadas. Nombres desconocidos se
+  ignoran y los métodos que escriben usan siempre todos los campos.
+- CamposDinamicosMixin recorta los campos del serializer raíz (los anidados
+  quedan completos). columnas_requeridas() traduce los campos que quedan a
+  columnas para only()/select_related (mixins.CamposDispersosMixin).
+- ValoresListSerializer arma las listas con values() en lugar de instanciar
+  modelos cuando todos los campos pedidos se resuelven a columnas; si alguno
+  no (SerializerMethodField sin declarar, relaciones múltiples, properties)
+  se usa la serialización normal. La salida es la misma en ambos casos.
+
+Los SerializerMethodField se declaran en el serializer:
+- `archivos_url = {'imagen_url': 'imagen'}`: URL absoluta de un FileField,
+  resoluble con values().
+- `dependencias_metodo = {'linea_info': []}`: columnas que el método lee de la
+  instancia (solo sirve para only(); las relaciones múltiples no cuentan).
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PKOnlyObject
+
+METODOS_LECTURA = ('GET', 'HEAD')
+
+
+def _nombres(valor):
+    return {nombre.strip() for nombre in (valor or '').split(',') if nombre.strip()}
+
+
+def campos_solicitados(request):
+    """(fields, omit) pedidos en la query; (None, set()) si no hay recorte"""
+    if request is None or request.method not in METODOS_LECTURA:
+        return None, set()
+    params = getattr(request, 'query_params', request.GET)
+    return _nombres(params.get('fields')) or None, _nombres(params.get('omit'))
+
+
+def _es_raiz(serializer):
+    padre = serializer.parent
+    if isinstance(padre, serializers.ListSerializer):
+        padre = padre.parent
+    return padre is None
+
+
+def _resolver(modelo, campo):
+    """
+    Camino de values() para un campo del serializer: (partes, campo_modelo, display)
+    o None si el campo no sale de una columna.
+    """
+    if isinstance(campo, (serializers.BaseSerializer, ManyRelatedField, serializers.SerializerMethodField)):
+        return None
+    if campo.source == '*':
+        return None
+
+    actual, partes, campo_modelo, display = modelo, [], None, False
+    for posicion, attr in enumerate(campo.source_attrs):
+        ultimo = posicion == len(campo.source_attrs) - 1
+        if ultimo and attr.startswith('get_') and attr.endswith('_display'):
+            attr, display = attr[4:-8], True
+        try:
+            campo_modelo = actual._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if campo_modelo.many_to_many or campo_modelo.one_to_many:
+            return None
+        if not ultimo:
+            if not campo_modelo.is_relation:
+                return None
+            actual = campo_modelo.related_model
+        partes.append(campo_modelo.name)
+    return partes, campo_modelo, display
+
+
+def columnas_requeridas(serializer):
+    """
+    (columnas, relaciones) que necesitan los campos legibles de `serializer`
+    para only()/select_related, o None si algún campo no se puede acotar.
+    """
+    modelo = serializer.Meta.model
+    dependencias = getattr(serializer, 'dependencias_metodo', {})
+    archivos = getattr(serializer, 'archivos_url', {})
+    columnas, relaciones = {modelo._meta.pk.name}, set()
+
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if nombre in archivos:
+            columnas.add(archivos[nombre])
+        elif nombre in dependencias:
+            columnas.update(dependencias[nombre])
+        elif isinstance(campo, ManyRelatedField) or (
+            isinstance(campo, serializers.ListSerializer) and campo.source_attrs
+            and _es_relacion_multiple(modelo, campo.source_attrs[0])
+        ):
+            continue  # Se resuelve con su propia consulta, solo necesita el pk
+        else:
+            resuelto = _resolver(modelo, campo)
+            if resuelto is None:
+                return None
+            partes = resuelto[0]
+            columnas.add('__'.join(partes))
+            if len(partes) > 1:
+                relaciones.add('__'.join(partes[:-1]))
+    return columnas, relaciones
+
+
+def _es_relacion_multiple(modelo, attr):
+    try:
+        campo_modelo = modelo._meta.get_field(attr)
+    except FieldDoesNotExist:
+        return False
+    return campo_modelo.many_to_many or campo_modelo.one_to_many
+
+
+class CamposDinamicosMixin:
+    """Recorta los campos del serializer raíz según ?fields= / ?omit="""
+
+    def get_fields(self):
+        campos = super().get_fields()
+        if not _es_raiz(self):
+            return campos
+        pedidos, omitidos = campos_solicitados(self.context.get('request'))
+        if pedidos is None and not omitidos:
+            return campos
+        return {
+            nombre: campo for nombre, campo in campos.items()
+            if (pedidos is None or nombre in pedidos) and nombre not in omitidos
+        }
+
+
+class ValoresListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer que lee las filas con values() cuando puede (ver el
+    docstring del módulo). Usar como Meta.list_serializer_class.
+    """
+
+    def _plan(self):
+        """[(nombre, columna, prefijos_fk, conversión)] o None si hace falta la instancia"""
+        child = self.child
+        modelo = child.Meta.model
+        archivos = getattr(child, 'archivos_url', {})
+        request = self.context.get('request')
+        plan = []
+
+        for nombre, campo in child.fields.items():
+            if campo.write_only:
+                continue
+            if nombre in archivos:
+                campo_archivo = modelo._meta.get_field(archivos[nombre])
+                if request is None:
+                    return None
+                plan.append((nombre, campo_archivo.name, [], self._url_absoluta(campo_archivo, request)))
+                continue
+            resuelto = _resolver(modelo, campo)
+            if resuelto is None:
+                return None
+            partes, campo_modelo, display = resuelto
+            if campo_modelo.is_relation and not isinstance(campo, serializers.RelatedField):
+                return None
+            prefijos = ['__'.join(partes[:i]) for i in range(1, len(partes))]
+            plan.append((nombre, '__'.join(partes), prefijos, self._conversion(campo, campo_modelo, display)))
+        return plan
+
+    @staticmethod
+    def _url_absoluta(campo_archivo, request):
+        def convertir(valor):
+            return request.build_absolute_uri(FieldFile(None, campo_archivo, valor).url) if valor else None
+        return convertir
+
+    @staticmethod
+    def _conversion(campo, campo_modelo, display):
+        if display:
+            opciones = dict(campo_modelo.flatchoices)
+            return lambda valor: campo.to_representation(str(opciones.get(valor, valor)))
+        if isinstance(campo_modelo, models.FileField):
+            return lambda valor: campo.to_representation(FieldFile(None, campo_modelo, valor))
+        if campo_modelo.is_relation:
+            return lambda valor: campo.to_representation(PKOnlyObject(pk=valor))
+        return campo.to_representation
+
+    def to_representation(self, data):
+        queryset = data.all() if isinstance(data, models.Manager) else data
+        # Listas ya evaluadas o con prefetch: values() repetiría la consulta
+        if not isinstance(queryset, models.QuerySet) or queryset._result_cache is not None:
+            return super().to_representation(data)
+        plan = self._plan()
+        if plan is None:
+            return super().to_representation(data)
+
+        columnas = {columna for _, columna, _, _ in plan}
+        columnas.update(prefijo for _, _, prefijos, _ in plan for prefijo in prefijos)
+        filas = []
+        for valores in queryset.values(*columnas):
+            fila = {}
+            for nombre, columna, prefijos, convertir in plan:
+                # DRF omite la clave cuando una relación intermedia es nula
+                if any(valores[prefijo] is None for prefijo in prefijos):
+                    continue
+                valor = valores[columna]
+                fila[nombre] = None if valor is None else convertir(valor)
+            filas.append(fila)
+        return filas
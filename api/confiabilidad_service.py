@@ -0,0 +1,317 @@
+# api/confiabilidad_service.py
+"""
+Analítica de confiabilidad (MTBF, MTTR y tasa de fallas) por activo y por línea.
+
+Fuentes:
+- FallaTurno (equipo, fecha + inicio del turno, duracion_minutos)
+- Reparacion correctiva (motor/variador, fecha_inicio → fecha_fin, días inclusivos)
+- HistorialMantenimiento 'instalacion' como inicio de la ventana de observación
+
+Todas las fallas se ordenan por (activo, inicio) y se recorren en una sola
+pasada: los intervalos solapados de un mismo activo se fusionan (una falla
+que ocurre mientras el activo sigue en reparación no cuenta dos veces) y de
+ahí salen cantidad de fallas y tiempo de reparación.
+
+    MTBF = (tiempo observado - tiempo en reparación) / fallas
+    MTTR = tiempo en reparación / fallas
+"""
+from datetime import datetime, timedelta
+import logging
+
+import pandas as pd
+from django.db.models import Max, Min, Sum, F, Q, FloatField, ExpressionWrapper
+from django.utils import timezone
+
+from .models import (
+    FallaTurno, Reparacion, HistorialMantenimiento, Equipo, Motor, Variador,
+    IndicadorConfiabilidad,
+)
+
+logger = logging.getLogger(__name__)
+
+CLAVE = ['activo_tipo', 'activo_id']
+COLUMNAS_EVENTO = CLAVE + ['inicio', 'fin']
+
+
+def _ahora_local():
+    return timezone.localtime().replace(tzinfo=None)
+
+
+def _a_naive(valor):
+    if valor is None:
+        return None
+    if timezone.is_aware(valor):
+        return timezone.localtime(valor).replace(tzinfo=None)
+    return valor
+
+
+def cargar_eventos(activos=None):
+    """
+    Devuelve un DataFrame con los intervalos de falla de todos los activos
+    (o solo de `activos`, conjunto de tuplas (tipo, id)).
+    """
+    ahora = _ahora_local()
+    registros = []
+
+    fallas = FallaTurno.objects.filter(equipo__isnull=False)
+    if activos is not None:
+        fallas = fallas.filter(equipo_id__in=[i for t, i in activos if t == 'equipo'])
+    for equipo_id, fecha, hora_inicio, duracion in fallas.values_list(
+        'equipo_id', 'fecha', 'turno__hora_inicio', 'duracion_minutos'
+    ).iterator():
+        inicio = datetime.combine(fecha, hora_inicio)
+        registros.append(('equipo', equipo_id, inicio, inicio + timedelta(minutes=duracion)))
+
+    reparaciones = Reparacion.objects.filter(tipo='correctivo', equipo_tipo__in=['motor', 'variador'])
+    if activos is not None:
+        reparaciones = reparaciones.filter(equipo_id__in=[i for t, i in activos if t != 'equipo'])
+    for tipo, equipo_id, fecha_inicio, fecha_fin in reparaciones.values_list(
+        'equipo_tipo', 'equipo_id', 'fecha_inicio', 'fecha_fin'
+    ).iterator():
+        if activos is not None and (tipo, equipo_id) not in activos:
+            continue
+        inicio = datetime.combine(fecha_inicio, datetime.min.time())
+        # Reparación abierta: cuenta hasta ahora
+        fin = datetime.combine(fecha_fin + timedelta(days=1), datetime.min.time()) if fecha_fin else ahora
+        registros.append((tipo, equipo_id, inicio, max(fin, inicio)))
+
+    return pd.DataFrame.from_records(registros, columns=COLUMNAS_EVENTO)
+
+
+def cargar_inicios_observacion(activos=None):
+    """Fecha de instalación conocida por activo: {(tipo, id): datetime}"""
+    inicios = {}
+
+    historial = HistorialMantenimiento.objects.filter(tipo_evento='instalacion')
+    if activos is not None:
+        historial = historial.filter(equipo_id__in={i for _, i in activos})
+    for tipo, equipo_id, fecha in historial.values('equipo_tipo', 'equipo_id').annotate(
+        primera=Min('fecha')
+    ).values_list('equipo_tipo', 'equipo_id', 'primera'):
+        inicios[(tipo, equipo_id)] = _a_naive(fecha)
+
+    for tipo, modelo in (('motor', Motor), ('variador', Variador)):
+        qs = modelo.objects.filter(fecha_instalacion__isnull=False)
+        if activos is not None:
+            qs = qs.filter(pk__in=[i for t, i in activos if t == tipo])
+        for pk, fecha in qs.values_list('pk', 'fecha_instalacion'):
+            instalacion = datetime.combine(fecha, datetime.min.time())
+            actual = inicios.get((tipo, pk))
+            inicios[(tipo, pk)] = min(actual, instalacion) if actual else instalacion
+
+    return inicios
+
+
+def calcular_indicadores(eventos, inicios_observacion, ahora):
+    """
+    Calcula los indicadores por activo a partir de los intervalos de falla.
+
+    `eventos` tiene columnas activo_tipo, activo_id, inicio, fin.
+    """
+    columnas = CLAVE + [
+        'cantidad_fallas', 'inicio_observacion', 'ultima_falla', 'horas_observadas',
+        'horas_reparacion', 'mtbf_horas', 'mttr_horas', 'tasa_fallas', 'disponibilidad',
+    ]
+    if eventos.empty:
+        return pd.DataFrame(columns=columnas)
+
+    df = eventos.sort_values(CLAVE + ['inicio'], ignore_index=True)
+    grupos = df.groupby(CLAVE, sort=False)
+
+    # Fusión de intervalos solapados: un intervalo abre una nueva falla si
+    # empieza después del mayor 'fin' visto hasta ahora en el mismo activo.
+    fin_acumulado = grupos['fin'].cummax()
+    fin_previo = fin_acumulado.groupby([df['activo_tipo'], df['activo_id']], sort=False).shift()
+    nueva_falla = fin_previo.isna() | (df['inicio'] > fin_previo)
+    df['falla'] = nueva_falla.cumsum()
+
+    fallas = df.groupby('falla', sort=False).agg(
+        activo_tipo=('activo_tipo', 'first'),
+        activo_id=('activo_id', 'first'),
+        inicio=('inicio', 'min'),
+        fin=('fin', 'max'),
+    )
+    fallas['horas'] = (fallas['fin'] - fallas['inicio']).dt.total_seconds() / 3600
+
+    resumen = fallas.groupby(CLAVE, sort=False).agg(
+        cantidad_fallas=('horas', 'size'),
+        horas_reparacion=('horas', 'sum'),
+        primera_falla=('inicio', 'min'),
+        ultima_falla=('inicio', 'max'),
+    ).reset_index()
+
+    instalacion = pd.Series(
+        [inicios_observacion.get(k) for k in zip(resumen['activo_tipo'], resumen['activo_id'])],
+        dtype='datetime64[ns]',
+    )
+    resumen['inicio_observacion'] = instalacion.where(
+        instalacion < resumen['primera_falla'], resumen['primera_falla']
+    )
+
+    ahora = pd.Timestamp(ahora)
+    resumen['horas_observadas'] = (ahora - resumen['inicio_observacion']).dt.total_seconds() / 3600
+    resumen['horas_observadas'] = resumen[['horas_observadas', 'horas_reparacion']].max(axis=1)
+    horas_operacion = resumen['horas_observadas'] - resumen['horas_reparacion']
+
+    resumen['mtbf_horas'] = horas_operacion / resumen['cantidad_fallas']
+    resumen['mttr_horas'] = resumen['horas_reparacion'] / resumen['cantidad_fallas']
+    resumen['tasa_fallas'] = (
+        resumen['cantidad_fallas'] / horas_operacion.where(horas_operacion > 0) * 1000
+    ).fillna(0)
+    resumen['disponibilidad'] = (
+        horas_operacion / resumen['horas_observadas'].where(resumen['horas_observadas'] > 0)
+    )
+
+    return resumen[columnas]
+
+
+def _datos_activos(activos):
+    """Nombre y línea de cada activo: {(tipo, id): (nombre, linea_id)}"""
+    datos = {}
+
+    def ids(tipo):
+        return [i for t, i in activos if t == tipo]
+
+    for pk, nombre, linea_id in Equipo.objects.filter(pk__in=ids('equipo')).values_list(
+        'pk', 'nombre', 'sector__linea_id'
+    ):
+        datos[('equipo', pk)] = (nombre, linea_id)
+    for tipo, modelo in (('motor', Motor), ('variador', Variador)):
+        for pk, codigo, linea_id in modelo.objects.filter(pk__in=ids(tipo)).values_list(
+            'pk', 'codigo', 'linea_id'
+        ):
+            datos[(tipo, pk)] = (codigo, linea_id)
+    return datos
+
+
+def _activos_modificados(desde):
+    """Activos con fallas, reparaciones o instalaciones registradas después de `desde`"""
+    activos = {
+        ('equipo', pk) for pk in FallaTurno.objects.filter(
+            fecha_actualizacion__gt=desde, equipo__isnull=False
+        ).values_list('equipo_id', flat=True)
+    }
+    activos.update(
+        Reparacion.objects.filter(updated_at__gt=desde).values_list('equipo_tipo', 'equipo_id')
+    )
+    activos.update(
+        HistorialMantenimiento.objects.filter(
+            fecha__gt=desde, tipo_evento='instalacion'
+        ).values_list('equipo_tipo', 'equipo_id')
+    )
+    return {a for a in activos if a[0] in ('equipo', 'motor', 'variador')}
+
+
+def actualizar_indicadores(completo=False):
+    """
+    Recalcula y persiste IndicadorConfiabilidad.
+
+    En modo incremental solo se recalculan los activos con eventos nuevos desde
+    la última actualización; el modo completo recorre todo el historial (y
+    además refleja el paso del tiempo en el MTBF de los activos sin fallas nuevas).
+    """
+    marca = timezone.now()
+    activos = None
+    if not completo:
+        ultima = IndicadorConfiabilidad.objects.aggregate(ultima=Max('actualizado'))['ultima']
+        if ultima is not None:
+            activos = _activos_modificados(ultima)
+            if not activos:
+                return 0
+
+    eventos = cargar_eventos(activos)
+    inicios = cargar_inicios_observacion(activos)
+    resumen = calcular_indicadores(eventos, inicios, _ahora_local())
+
+    claves = list(zip(resumen['activo_tipo'], resumen['activo_id']))
+    datos = _datos_activos(set(claves))
+
+    indicadores = []
+    for fila, clave in zip(resumen.itertuples(index=False), claves):
+        nombre, linea_id = datos.get(clave, ('', None))
+        indicadores.append(IndicadorConfiabilidad(
+            activo_tipo=fila.activo_tipo,
+            activo_id=int(fila.activo_id),
+            activo_nombre=nombre or '',
+            linea_id=linea_id,
+            cantidad_fallas=int(fila.cantidad_fallas),
+            inicio_observacion=timezone.make_aware(fila.inicio_observacion.to_pydatetime()),
+            ultima_falla=timezone.make_aware(fila.ultima_falla.to_pydatetime()),
+            horas_observadas=float(fila.horas_observadas),
+            horas_reparacion=float(fila.horas_reparacion),
+            mtbf_horas=float(fila.mtbf_horas),
+            mttr_horas=float(fila.mttr_horas),
+            tasa_fallas=float(fila.tasa_fallas),
+            disponibilidad=None if pd.isna(fila.disponibilidad) else float(fila.disponibilidad),
+            actualizado=marca,
+        ))
+
+    IndicadorConfiabilidad.objects.bulk_create(
+        indicadores,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['activo_tipo', 'activo_id'],
+        update_fields=[
+            'activo_nombre', 'linea', 'cantidad_fallas', 'inicio_observacion', 'ultima_falla',
+            'horas_observadas', 'horas_reparacion', 'mtbf_horas', 'mttr_horas',
+            'tasa_fallas', 'disponibilidad', 'actualizado',
+        ],
+    )
+
+    # Activos que ya no tienen fallas registradas (p. ej. registros borrados)
+    if activos is None:
+        IndicadorConfiabilidad.objects.filter(actualizado__lt=marca).delete()
+    else:
+        sin_fallas = activos - set(claves)
+        if sin_fallas:
+            filtro = Q()
+            for tipo, pk in sin_fallas:
+                filtro |= Q(activo_tipo=tipo, activo_id=pk)
+            IndicadorConfiabilidad.objects.filter(filtro).delete()
+
+    logger.info(f"Indicadores de confiabilidad actualizados: {len(indicadores)} activos")
+    return len(indicadores)
+
+
+def ranking_activos(orden='tasa_fallas', activo_tipo=None, linea_id=None, limite=10):
+    """Activos más críticos según el criterio pedido"""
+    ordenes = {
+        'tasa_fallas': ['-tasa_fallas', 'mtbf_horas'],
+        'mtbf': ['mtbf_horas'],
+        'mttr': ['-mttr_horas'],
+        'fallas': ['-cantidad_fallas'],
+    }
+    qs = IndicadorConfiabilidad.objects.select_related('linea')
+    if activo_tipo:
+        qs = qs.filter(activo_tipo=activo_tipo)
+    if linea_id:
+        qs = qs.filter(linea_id=linea_id)
+    return qs.order_by(*ordenes.get(orden, ordenes['tasa_fallas']))[:limite]
+
+
+def resumen_por_linea():
+    """MTBF/MTTR por línea recalculados a partir de los totales de sus activos"""
+    horas_operacion = ExpressionWrapper(
+        F('horas_observadas') - F('horas_reparacion'), output_field=FloatField()
+    )
+    filas = IndicadorConfiabilidad.objects.filter(linea__isnull=False).values(
+        'linea_id', 'linea__nombre'
+    ).annotate(
+        fallas=Sum('cantidad_fallas'),
+        horas_operacion=Sum(horas_operacion),
+        horas_reparacion=Sum('horas_reparacion'),
+    ).order_by('linea__nombre')
+
+    resultado = []
+    for fila in filas:
+        fallas = fila['fallas'] or 0
+        operacion = fila['horas_operacion'] or 0
+        resultado.append({
+            'linea_id': fila['linea_id'],
+            'linea_nombre': fila['linea__nombre'],
+            'cantidad_fallas': fallas,
+            'mtbf_horas': round(operacion / fallas, 2) if fallas else None,
+            'mttr_horas': round((fila['horas_reparacion'] or 0) / fallas, 2) if fallas else None,
+            'tasa_fallas': round(fallas / operacion * 1000, 4) if operacion > 0 else 0,
+        })
+    return resultado
@@ -0,0 +1,79 @@
+# api/contadores_service.py
+"""
+Contadores de notificaciones no leídas por usuario en caché (Redis).
+
+El badge de la app consulta conteo_no_leidas con frecuencia; en lugar de un
+COUNT(*) sobre app_notificaciones por consulta se mantiene un entero por
+usuario:
+
+- +1 al crear una NotificacionApp (señal post_save y envíos masivos con
+  bulk_create), -1 al marcarla leída o borrarla sin leer, 0 al marcar todas.
+- Si la clave no existe el incremento se omite y la siguiente lectura la
+  reconstruye desde la base de datos, así que nunca se cuenta dos veces.
+- reconciliar() recalcula todos los contadores con un único GROUP BY; la tarea
+  periódica corrige la deriva (transacciones revertidas, updates masivos).
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import NotificacionApp
+
+logger = logging.getLogger(__name__)
+
+
+def _clave(usuario_id):
+    return f"notificaciones:no_leidas:{usuario_id}"
+
+
+def contar_no_leidas(usuario_id):
+    """Conteo desde la base de datos (reconstrucción de la caché)"""
+    return NotificacionApp.objects.filter(usuario_id=usuario_id, leida=False).count()
+
+
+def conteo(usuario_id):
+    """Conteo de no leídas: una lectura de caché; solo consulta la base si falta la clave"""
+    valor = cache.get(_clave(usuario_id))
+    if valor is None:
+        valor = contar_no_leidas(usuario_id)
+        cache.add(_clave(usuario_id), valor, timeout=None)
+    return valor
+
+
+def incrementar(usuario_id, cantidad=1):
+    try:
+        cache.incr(_clave(usuario_id), cantidad)
+    except ValueError:
+        # Sin clave: la próxima lectura la reconstruye incluyendo esta notificación
+        pass
+
+
+def decrementar(usuario_id, cantidad=1):
+    try:
+        if cache.decr(_clave(usuario_id), cantidad) < 0:
+            cache.delete(_clave(usuario_id))
+    except ValueError:
+        pass
+
+
+def reiniciar(usuario_id):
+    cache.set(_clave(usuario_id), 0, timeout=None)
+
+
+def reconciliar():
+    """Recalcula los contadores de todos los usuarios con notificaciones; devuelve cuántos se corrigieron"""
+    conteos = dict(
+        NotificacionApp.objects.values('usuario_id')
+        .annotate(no_leidas=Count('id', filter=Q(leida=False)))
+        .values_list('usuario_id', 'no_leidas')
+    )
+    actuales = cache.get_many([_clave(usuario_id) for usuario_id in conteos])
+    corregidos = {
+        _clave(usuario_id): valor for usuario_id, valor in conteos.items()
+        if actuales.get(_clave(usuario_id)) != valor
+    }
+    if corregidos:
+        cache.set_many(corregidos, timeout=None)
+    logger.info(f"Contadores de no leídas: {len(conteos)} usuarios, {len(corregidos)} corregidos")
+    return len(corregidos)
@@ -0,0 +1,131 @@
+# api/detenciones_service.py
+"""
+Cubo de paradas y fallas (ResumenDetencion) para gráficos y Pareto.
+
+Cada celda es (fecha, línea, turno, origen, dimensión, valor) con la cantidad
+de registros, los minutos sumados y la cantidad (piezas) sumada. Se mantiene
+al día desde las señales de ParadaTurno/FallaTurno recalculando solo el
+turno afectado, así los dashboards agregan unas pocas filas del cubo en
+lugar de recorrer las tablas de hechos.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Sum, Q
+
+from .models import ParadaTurno, FallaTurno, ResumenDetencion
+
+logger = logging.getLogger(__name__)
+
+# origen -> (modelo, dimensiones)
+ORIGENES = {
+    'parada': (ParadaTurno, ('motivo', 'tipo')),
+    'falla': (FallaTurno, ('tipo', 'gravedad')),
+}
+
+MEDIDAS = ('registros', 'minutos', 'cantidad')
+
+CELDA = ['fecha', 'linea_id', 'turno_id']
+
+
+def _filas(origen, queryset):
+    """Agrega el queryset de hechos en filas del cubo (una consulta por dimensión)"""
+    _, dimensiones = ORIGENES[origen]
+    # Las paradas no tienen cantidad de piezas: cuenta como un evento cada una
+    cantidad = Sum('cantidad') if origen == 'falla' else Count('id')
+
+    filas = []
+    for dimension in dimensiones:
+        agregados = queryset.values(*CELDA, dimension).annotate(
+            registros=Count('id'),
+            minutos=Sum('duracion_minutos'),
+            total_cantidad=cantidad,
+        ).order_by()
+        for fila in agregados:
+            filas.append(ResumenDetencion(
+                fecha=fila['fecha'],
+                linea_id=fila['linea_id'],
+                turno_id=fila['turno_id'],
+                origen=origen,
+                dimension=dimension,
+                valor=fila[dimension],
+                registros=fila['registros'],
+                minutos=fila['minutos'] or 0,
+                cantidad=fila['total_cantidad'] or 0,
+            ))
+    return filas
+
+
+def recalcular_turno(origen, fecha, linea_id, turno_id):
+    """Recalcula las celdas de un turno a partir de sus paradas/fallas"""
+    modelo, _ = ORIGENES[origen]
+    celda = {'fecha': fecha, 'linea_id': linea_id, 'turno_id': turno_id}
+    filas = _filas(origen, modelo.objects.filter(**celda))
+
+    with transaction.atomic():
+        if filas:
+            ResumenDetencion.objects.bulk_create(
+                filas,
+                update_conflicts=True,
+                unique_fields=['fecha', 'turno', 'linea', 'origen', 'dimension', 'valor'],
+                update_fields=['registros', 'minutos', 'cantidad'],
+            )
+        # Valores que ya no tienen registros en el turno
+        vigentes = Q()
+        for fila in filas:
+            vigentes |= Q(dimension=fila.dimension, valor=fila.valor)
+        obsoletas = ResumenDetencion.objects.filter(origen=origen, **celda)
+        if filas:
+            obsoletas = obsoletas.exclude(vigentes)
+        obsoletas.delete()
+
+
+def reconstruir_cubo():
+    """Regenera el cubo completo desde ParadaTurno y FallaTurno"""
+    with transaction.atomic():
+        ResumenDetencion.objects.all().delete()
+        total = 0
+        for origen, (modelo, _) in ORIGENES.items():
+            filas = _filas(origen, modelo.objects.all())
+            ResumenDetencion.objects.bulk_create(filas, batch_size=1000)
+            total += len(filas)
+    logger.info(f"Cubo de detenciones reconstruido: {total} celdas")
+    return total
+
+
+def consultar(origen, dimension, fecha=None, fecha_desde=None, fecha_hasta=None,
+              linea_id=None, turno_id=None):
+    """Totales por valor de la dimensión para los filtros dados"""
+    qs = ResumenDetencion.objects.filter(origen=origen, dimension=dimension)
+    if fecha:
+        qs = qs.filter(fecha=fecha)
+    if fecha_desde:
+        qs = qs.filter(fecha__gte=fecha_desde)
+    if fecha_hasta:
+        qs = qs.filter(fecha__lte=fecha_hasta)
+    if linea_id:
+        qs = qs.filter(linea_id=linea_id)
+    if turno_id:
+        qs = qs.filter(turno_id=turno_id)
+
+    return list(
+        qs.values('valor').annotate(
+            registros=Sum('registros'),
+            minutos=Sum('minutos'),
+            cantidad=Sum('cantidad'),
+        ).order_by('-registros', 'valor')
+    )
+
+
+def pareto(origen, dimension, medida='minutos', **filtros):
+    """Valores ordenados por la medida con porcentaje y porcentaje acumulado"""
+    filas = sorted(consultar(origen, dimension, **filtros), key=lambda f: f[medida], reverse=True)
+    total = sum(f[medida] for f in filas)
+
+    acumulado = 0
+    for fila in filas:
+        acumulado += fila[medida]
+        fila['porcentaje'] = round(fila[medida] / total * 100, 2) if total else 0
+        fila['porcentaje_acumulado'] = round(acumulado / total * 100, 2) if total else 0
+
+    return {'origen': origen, 'dimension': dimension, 'medida': medida, 'total': total, 'items': filas}
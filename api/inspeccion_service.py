@@ -0,0 +1,139 @@
+# api/inspeccion_service.py
+"""
+Registro en lote de una ejecución de inspección (sincronización offline de la app).
+
+Toda la ejecución llega en un solo payload: los resultados se insertan con
+bulk_create, las tolerancias se evalúan vectorizadas sobre el lote y se genera
+un único Evento y una única notificación por ejecución en lugar de uno por
+resultado. El uuid_cliente hace que los reintentos no dupliquen datos.
+"""
+from collections import defaultdict
+import logging
+
+import numpy as np
+from django.db import transaction, IntegrityError
+
+from .models import InspeccionEjecucion, ResultadoInspeccion, VariableInspeccion, EstadisticaVariable, Evento
+
+logger = logging.getLogger(__name__)
+
+
+def evaluar_tolerancias(valores, referencias, tolerancias):
+    """Devuelve (desvios, severidades) para todo el lote; severidad '' si está en rango"""
+    valores = np.asarray(valores, dtype=float)
+    referencias = np.asarray(referencias, dtype=float)
+    tolerancias = np.asarray(tolerancias, dtype=float)
+
+    desvios = np.abs(valores - referencias)
+    severidades = np.select(
+        [desvios <= tolerancias, desvios > tolerancias * 2, desvios < tolerancias * 1.2],
+        ['', 'crítico', 'leve'],
+        default='moderado',
+    )
+    return desvios, severidades
+
+
+def _descripcion_evento(ruta, alertas, tendencias):
+    partes = []
+    if alertas:
+        detalle = ', '.join(f"{a['variable']} {a['valor_medido']} [{a['severidad']}]" for a in alertas)
+        partes.append(f"{len(alertas)} variable(s) fuera de rango: {detalle}")
+    if tendencias:
+        detalle = ', '.join(f"{t['variable']} (prom. {t['promedio_movil']:.2f})" for t in tendencias)
+        partes.append(f"Predicción: tendencia anómala en {detalle}")
+    return f"Inspección '{ruta.nombre}': " + '. '.join(partes)
+
+
+def registrar_ejecucion(tecnico, ruta, resultados, uuid_cliente=None, observaciones=None):
+    """
+    Crea la ejecución con todos sus resultados.
+
+    `resultados` es una lista de {'variable': VariableInspeccion | id, 'valor_medido': float}.
+    Devuelve (ejecucion, resumen, creada). Si uuid_cliente ya existe se devuelve
+    la ejecución previa sin volver a procesar nada.
+    """
+    if uuid_cliente:
+        previa = InspeccionEjecucion.objects.filter(uuid_cliente=uuid_cliente).first()
+        if previa:
+            return previa, None, False
+
+    variable_ids = [getattr(r['variable'], 'pk', r['variable']) for r in resultados]
+    variables = {r['variable'].pk: r['variable'] for r in resultados if isinstance(r['variable'], VariableInspeccion)}
+    faltantes = set(variable_ids) - set(variables)
+    if faltantes:
+        variables.update(VariableInspeccion.objects.in_bulk(faltantes))
+
+    try:
+        with transaction.atomic():
+            ejecucion = InspeccionEjecucion.objects.create(
+                ruta=ruta, tecnico=tecnico, observaciones=observaciones, uuid_cliente=uuid_cliente
+            )
+            ResultadoInspeccion.objects.bulk_create([
+                ResultadoInspeccion(ejecucion=ejecucion, variable_id=variable_id, valor_medido=r['valor_medido'])
+                for variable_id, r in zip(variable_ids, resultados)
+            ])
+
+            valores = [r['valor_medido'] for r in resultados]
+            desvios, severidades = evaluar_tolerancias(
+                valores,
+                [variables[i].valor_referencia for i in variable_ids],
+                [variables[i].tolerancia for i in variable_ids],
+            )
+            alertas = [
+                {
+                    'variable': variables[variable_id].nombre,
+                    'variable_id': variable_id,
+                    'valor_medido': valor,
+                    'desvio': float(desvio),
+                    'severidad': str(severidad),
+                }
+                for variable_id, valor, desvio, severidad in zip(variable_ids, valores, desvios, severidades)
+                if severidad
+            ]
+
+            # Estadísticas y tendencia por variable (una lectura/escritura para el lote)
+            valores_por_variable = defaultdict(list)
+            for variable_id, valor in zip(variable_ids, valores):
+                valores_por_variable[variable_id].append(valor)
+            estadisticas = EstadisticaVariable.registrar_lote(valores_por_variable)
+
+            tendencias = []
+            for variable_id, estadistica in estadisticas.items():
+                variable = variables[variable_id]
+                if len(estadistica.ultimos) < 3:
+                    continue
+                promedio = estadistica.promedio_movil
+                if abs(promedio - variable.valor_referencia) > variable.tolerancia:
+                    tendencias.append({
+                        'variable': variable.nombre,
+                        'variable_id': variable_id,
+                        'promedio_movil': promedio,
+                        'ewma': estadistica.ewma,
+                    })
+
+            if alertas or tendencias:
+                Evento.objects.create(
+                    tipo=ruta.activo_tipo,
+                    descripcion=_descripcion_evento(ruta, alertas, tendencias),
+                    usuario=tecnico,
+                    objeto_id=ruta.activo_id,
+                )
+    except IntegrityError:
+        # Reintento concurrente con el mismo uuid_cliente: gana el primero
+        previa = InspeccionEjecucion.objects.filter(uuid_cliente=uuid_cliente).first() if uuid_cliente else None
+        if previa is None:
+            raise
+        return previa, None, False
+
+    resumen = {'resultados': len(resultados), 'alertas': alertas, 'tendencias': tendencias}
+
+    if alertas:
+        def notificar():
+            from .notification_service import NotificationService
+            NotificationService().notificar_alertas_ejecucion(ejecucion.id, alertas)
+        transaction.on_commit(notificar)
+
+    logger.info(
+        f"Ejecución {ejecucion.id} registrada en lote: {len(resultados)} resultados, {len(alertas)} alertas"
+    )
+    return ejecucion, resumen, True
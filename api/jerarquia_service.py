@@ -0,0 +1,121 @@
+# api/jerarquia_service.py
+"""
+Árbol de activos Línea → Sector → Equipo → Motor/Variador materializado en caché.
+
+Se arma con cinco consultas planas (values()) unidas en Python por id y se
+guarda entero en Redis junto con un índice 'tipo:id' → nodo (pickle conserva
+las referencias, así que el índice no duplica datos). Las señales de los
+cinco modelos lo invalidan (signals.invalidar_jerarquia).
+
+- Motores y variadores cuelgan del equipo; si no tienen equipo, del sector o
+  la línea que tengan. Los que no tienen ubicación en producción (depósito,
+  taller) van a 'sin_ubicacion'.
+- Si la caché no responde el árbol se arma igual en cada llamada.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import LineaProduccion, Sector, Equipo, Motor, Variador
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'jerarquia:activos'
+TIPOS_NODO = ('linea', 'sector', 'equipo')
+
+
+def _activos(modelo, *campos):
+    return modelo.objects.order_by('codigo').values(
+        'id', 'codigo', 'estado', 'potencia', 'ubicacion_tipo', 'linea_id', 'sector_id', 'equipo_id', *campos
+    )
+
+
+def construir():
+    """{'arbol': {'lineas', 'sin_ubicacion'}, 'indice': {'tipo:id': nodo}}"""
+    indice = {}
+    lineas = []
+    for linea in LineaProduccion.objects.order_by('nombre').values('id', 'nombre'):
+        nodo = {**linea, 'tipo': 'linea', 'sectores': [], 'motores': [], 'variadores': []}
+        indice[f"linea:{linea['id']}"] = nodo
+        lineas.append(nodo)
+
+    for sector in Sector.objects.order_by('nombre').values('id', 'nombre', 'linea_id'):
+        nodo = {'id': sector['id'], 'nombre': sector['nombre'], 'tipo': 'sector',
+                'equipos': [], 'motores': [], 'variadores': []}
+        indice[f"sector:{sector['id']}"] = nodo
+        indice[f"linea:{sector['linea_id']}"]['sectores'].append(nodo)
+
+    for equipo in Equipo.objects.order_by('nombre').values('id', 'nombre', 'sector_id'):
+        nodo = {'id': equipo['id'], 'nombre': equipo['nombre'], 'tipo': 'equipo', 'motores': [], 'variadores': []}
+        indice[f"equipo:{equipo['id']}"] = nodo
+        indice[f"sector:{equipo['sector_id']}"]['equipos'].append(nodo)
+
+    sin_ubicacion = {'motores': [], 'variadores': []}
+    for clave, filas in (('motores', _activos(Motor)), ('variadores', _activos(Variador, 'marca', 'modelo'))):
+        for activo in filas:
+            equipo_id, sector_id, linea_id = (activo.pop(campo) for campo in ('equipo_id', 'sector_id', 'linea_id'))
+            padre = (
+                indice.get(f"equipo:{equipo_id}")
+                or indice.get(f"sector:{sector_id}")
+                or indice.get(f"linea:{linea_id}")
+            )
+            (padre or sin_ubicacion)[clave].append(activo)
+
+    return {'arbol': {'lineas': lineas, 'sin_ubicacion': sin_ubicacion}, 'indice': indice}
+
+
+def _materializado():
+    try:
+        datos = cache.get(CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Caché de jerarquía no disponible: {e}")
+        return construir()
+    if datos is None:
+        datos = construir()
+        try:
+            cache.set(CACHE_KEY, datos, getattr(settings, 'JERARQUIA_CACHE_TTL', 60 * 60))
+        except Exception as e:
+            logger.warning(f"No se pudo cachear la jerarquía: {e}")
+    return datos
+
+
+def obtener(nodo=None):
+    """
+    Árbol completo, o el subárbol de `nodo` ('linea:3', 'sector:5', 'equipo:7').
+    KeyError si el nodo no existe, ValueError si el formato no es válido.
+    """
+    datos = _materializado()
+    if nodo is None:
+        return datos['arbol']
+    tipo, _, id_nodo = nodo.partition(':')
+    if tipo not in TIPOS_NODO or not id_nodo.isdigit():
+        raise ValueError(nodo)
+    return datos['indice'][f"{tipo}:{int(id_nodo)}"]
+
+
+def opciones_lineas():
+    """[(id, nombre)] para filtros del admin"""
+    return [(str(linea['id']), linea['nombre']) for linea in obtener()['lineas']]
+
+
+def opciones_sectores():
+    """[(id, 'Línea - Sector')] para filtros del admin"""
+    return [
+        (str(sector['id']), f"{linea['nombre']} - {sector['nombre']}")
+        for linea in obtener()['lineas'] for sector in linea['sectores']
+    ]
+
+
+def _borrar():
+    try:
+        cache.delete(CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar la jerarquía: {e}")
+
+
+def invalidar():
+    """Borra el árbol ahora y al confirmar (un lector concurrente pudo recachear datos viejos)"""
+    _borrar()
+    transaction.on_commit(_borrar)
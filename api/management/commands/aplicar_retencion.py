@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.retencion_service import purgar_notificaciones, purgar_dispositivos, resumen_antiguedad, DIAS_LEIDAS, DIAS_NO_LEIDAS
+
+
+class Command(BaseCommand):
+    help = "Archiva y elimina notificaciones y dispositivos fuera del período de retención"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_LEIDAS, help="Antigüedad de las leídas a eliminar")
+        parser.add_argument('--dias-no-leidas', type=int, default=DIAS_NO_LEIDAS)
+        parser.add_argument('--resumen', action='store_true', help="Solo muestra las notificaciones por antigüedad")
+
+    def handle(self, *args, **opciones):
+        for tramo, cantidad in resumen_antiguedad().items():
+            self.stdout.write(f"{tramo:>20}: {cantidad}")
+        if opciones['resumen']:
+            return
+
+        notificaciones = purgar_notificaciones(dias=opciones['dias'], dias_no_leidas=opciones['dias_no_leidas'])
+        dispositivos = purgar_dispositivos()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Eliminadas {notificaciones['leidas']} notificaciones leídas y {notificaciones['no_leidas']} no leídas; "
+            f"{dispositivos['inactivos'] + dispositivos['sin_uso']} dispositivos"
+        ))
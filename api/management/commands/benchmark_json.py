@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+def _serializadas(cantidad):
+    """Filas con la forma de la lista de ProduccionTiempoReal ya serializada"""
+    ahora = timezone.now()
+    return [
+        {
+            'id': i,
+            'timestamp': (ahora - timedelta(minutes=i)).isoformat(),
+            'fecha': ahora.date().isoformat(),
+            'turno': i % 3 + 1,
+            'turno_nombre': 'Mañana',
+            'linea': i % 4 + 1,
+            'linea_nombre': f"Línea {i % 4 + 1}",
+            'producto': 'Ladrillo hueco 18x18x33',
+            'bandejas': 120 + i % 50,
+            'fabricacion_toneladas': 12.5 + i / 100,
+            'fabricacion_scrap': 0.35,
+            'coccion_vagones': 14,
+            'eficiencia': 87.25,
+            'costo': '1520.50',
+        }
+        for i in range(cantidad)
+    ]
+
+
+def _crudas(cantidad):
+    """Filas de values()/aggregate() con datetime y Decimal sin convertir (exportes de FallaTurno)"""
+    ahora = timezone.now()
+    return [
+        {
+            'id': i,
+            'fecha': ahora.date(),
+            'fecha_creacion': ahora - timedelta(seconds=i),
+            'linea__nombre': f"Línea {i % 4 + 1}",
+            'tipo': 'mecanica',
+            'cantidad': i % 7,
+            'duracion_minutos': i % 90,
+            'costo': Decimal('1520.50'),
+        }
+        for i in range(cantidad)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compara el tiempo de render de listas grandes entre JSONRenderer (stdlib) y ORJSONRenderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000, 50000])
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def _medir(self, renderer, datos, repeticiones):
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            contenido = renderer.render(datos, 'application/json', {})
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+        return mejor, contenido
+
+    def handle(self, *args, **opciones):
+        for nombre, generar in (('serializadas', _serializadas), ('values()', _crudas)):
+            for cantidad in opciones['filas']:
+                datos = generar(cantidad)
+                stdlib, esperado = self._medir(JSONRenderer(), datos, opciones['repeticiones'])
+                rapido, obtenido = self._medir(ORJSONRenderer(), datos, opciones['repeticiones'])
+                iguales = 'idéntico' if obtenido == esperado else 'DISTINTO'
+                self.stdout.write(
+                    f"{nombre:>12} {cantidad:>6} filas: json {stdlib * 1000:8.1f} ms | "
+                    f"orjson {rapido * 1000:7.1f} ms | x{stdlib / rapido:.1f} | "
+                    f"{len(obtenido) / 1024:.0f} KiB ({iguales})"
+                )
+
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark de JSON finalizado"))
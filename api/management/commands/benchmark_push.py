@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.push_gateway import PushGateway, TransporteSimulado
+
+
+class Command(BaseCommand):
+    help = "Mide el throughput del gateway push con el transporte simulado (sin red)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=500)
+        parser.add_argument('--latencia', type=float, default=50, help="Latencia simulada por envío (ms)")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+
+    def handle(self, *args, **opciones):
+        tokens = [f"token-{i}" for i in range(opciones['tokens'])]
+        latencia = opciones['latencia'] / 1000
+
+        for workers in opciones['workers']:
+            gateway = PushGateway(TransporteSimulado(latencia=latencia), max_workers=workers)
+            inicio = time.perf_counter()
+            respuesta = gateway.notify_multiple_devices(tokens, 'Benchmark', 'Prueba de carga', {'tipo': 'sistema'})
+            segundos = time.perf_counter() - inicio
+            gateway.cerrar()
+            self.stdout.write(
+                f"{workers:>3} hilos: {respuesta['success']} envíos en {segundos:.2f} s "
+                f"({respuesta['success'] / segundos:.0f} envíos/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark de push finalizado"))
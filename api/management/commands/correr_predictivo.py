@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.predictivo_service import ejecutar_prediccion, cargar_modelo, MODELO_PATH
+
+
+class Command(BaseCommand):
+    help = 'Corre el modelo predictivo de mantenimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo', action='store_true',
+            help='Puntúa todas las variables, no solo las que tienen resultados nuevos',
+        )
+
+    def handle(self, *args, **options):
+        if cargar_modelo() is None:
+            self.stdout.write(self.style.WARNING(f'No se encontró el modelo en {MODELO_PATH}.'))
+            return
+
+        resultado = ejecutar_prediccion(completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Análisis IA completado: {resultado['variables']} variables, {resultado['alertas']} alertas nuevas"
+        ))
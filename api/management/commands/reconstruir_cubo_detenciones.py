@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.detenciones_service import reconstruir_cubo
+
+
+class Command(BaseCommand):
+    help = "Regenera el cubo ResumenDetencion desde ParadaTurno y FallaTurno"
+
+    def handle(self, *args, **kwargs):
+        total = reconstruir_cubo()
+        self.stdout.write(self.style.SUCCESS(f"✅ Cubo de detenciones reconstruido: {total} celdas"))
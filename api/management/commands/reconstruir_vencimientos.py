@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.programacion_service import reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = "Regenera el índice de vencimientos preventivos (VencimientoMantenimiento) desde los planes activos"
+
+    def handle(self, *args, **kwargs):
+        total = reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(f"✅ Índice de vencimientos regenerado: {total} filas"))
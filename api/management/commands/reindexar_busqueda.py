@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.busqueda_service import reindexar_todo
+
+
+class Command(BaseCommand):
+    help = "Regenera el índice de la búsqueda global (SearchDocument)"
+
+    def handle(self, *args, **kwargs):
+        total = reindexar_todo()
+        self.stdout.write(self.style.SUCCESS(f"✅ Índice de búsqueda regenerado: {total} documentos"))
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_produccion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProduccionTiempoReal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('fecha', models.DateField()),
+                ('producto', models.CharField(blank=True, max_length=100)),
+                ('bandejas', models.PositiveIntegerField(blank=True, null=True)),
+                ('fabricacion_toneladas', models.FloatField(blank=True, null=True)),
+                ('fabricacion_scrap', models.FloatField(blank=True, null=True)),
+                ('apilado_vagones', models.PositiveIntegerField(blank=True, null=True)),
+                ('apilado_toneladas', models.FloatField(blank=True, null=True)),
+                ('coccion_vagones', models.PositiveIntegerField(blank=True, null=True)),
+                ('coccion_toneladas', models.FloatField(blank=True, null=True)),
+                ('desapilado_primera', models.PositiveIntegerField(blank=True, null=True)),
+                ('desapilado_segunda', models.PositiveIntegerField(blank=True, null=True)),
+                ('desapilado_toneladas', models.FloatField(blank=True, null=True)),
+                ('meta_produccion', models.PositiveIntegerField(blank=True, null=True)),
+                ('eficiencia', models.FloatField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fuente_dato', models.CharField(default='node_red_tiempo_real', max_length=20)),
+                ('es_cierre_turno', models.BooleanField(default=False)),
+                ('linea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.lineaproduccion')),
+                ('supervisor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('turno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.turno')),
+            ],
+            options={
+                'verbose_name_plural': 'Producción Tiempo Real',
+                'ordering': ['timestamp'],
+                'indexes': [models.Index(fields=['timestamp', 'linea'], name='api_producc_timesta_7c4b8f_idx'), models.Index(fields=['fecha', 'linea', 'turno'], name='api_producc_fecha_a33774_idx'), models.Index(fields=['fecha', 'timestamp'], name='api_producc_fecha_6930c1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_producciontiemporeal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicadorConfiabilidad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo_tipo', models.CharField(choices=[('equipo', 'Equipo'), ('motor', 'Motor'), ('variador', 'Variador')], max_length=20)),
+                ('activo_id', models.IntegerField()),
+                ('activo_nombre', models.CharField(blank=True, max_length=150)),
+                ('cantidad_fallas', models.PositiveIntegerField(default=0)),
+                ('inicio_observacion', models.DateTimeField()),
+                ('ultima_falla', models.DateTimeField(blank=True, null=True)),
+                ('horas_observadas', models.FloatField(default=0)),
+                ('horas_reparacion', models.FloatField(default=0)),
+                ('mtbf_horas', models.FloatField(blank=True, null=True)),
+                ('mttr_horas', models.FloatField(blank=True, null=True)),
+                ('tasa_fallas', models.FloatField(default=0, help_text='Fallas cada 1000 horas de operación')),
+                ('disponibilidad', models.FloatField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('linea', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='indicadores_confiabilidad', to='api.lineaproduccion')),
+            ],
+            options={
+                'verbose_name': 'Indicador de confiabilidad',
+                'verbose_name_plural': 'Indicadores de confiabilidad',
+                'indexes': [models.Index(fields=['tasa_fallas'], name='api_indicad_tasa_fa_071f73_idx'), models.Index(fields=['linea', 'tasa_fallas'], name='api_indicad_linea_i_8930e3_idx'), models.Index(fields=['actualizado'], name='api_indicad_actuali_654137_idx')],
+                'unique_together': {('activo_tipo', 'activo_id')},
+            },
+        ),
+    ]
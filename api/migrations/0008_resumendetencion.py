@@ -0,0 +1,60 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_cubo(apps, schema_editor):
+    """Carga inicial del cubo con las paradas y fallas existentes"""
+    from django.db.models import Count, Sum
+
+    ResumenDetencion = apps.get_model('api', 'ResumenDetencion')
+    origenes = {
+        'parada': (apps.get_model('api', 'ParadaTurno'), ('motivo', 'tipo')),
+        'falla': (apps.get_model('api', 'FallaTurno'), ('tipo', 'gravedad')),
+    }
+    for origen, (modelo, dimensiones) in origenes.items():
+        cantidad = Sum('cantidad') if origen == 'falla' else Count('id')
+        for dimension in dimensiones:
+            filas = modelo.objects.values('fecha', 'linea_id', 'turno_id', dimension).annotate(
+                registros=Count('id'), minutos=Sum('duracion_minutos'), total_cantidad=cantidad,
+            ).order_by()
+            ResumenDetencion.objects.bulk_create([
+                ResumenDetencion(
+                    fecha=f['fecha'], linea_id=f['linea_id'], turno_id=f['turno_id'],
+                    origen=origen, dimension=dimension, valor=f[dimension],
+                    registros=f['registros'], minutos=f['minutos'] or 0,
+                    cantidad=f['total_cantidad'] or 0,
+                )
+                for f in filas
+            ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_indicadorconfiabilidad'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDetencion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('origen', models.CharField(choices=[('parada', 'Parada'), ('falla', 'Falla')], max_length=10)),
+                ('dimension', models.CharField(choices=[('motivo', 'Motivo'), ('tipo', 'Tipo'), ('gravedad', 'Gravedad')], max_length=10)),
+                ('valor', models.CharField(max_length=20)),
+                ('registros', models.PositiveIntegerField(default=0)),
+                ('minutos', models.PositiveIntegerField(default=0)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('linea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.lineaproduccion')),
+                ('turno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.turno')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['origen', 'dimension', 'fecha'], name='api_resumen_origen_006a58_idx'), models.Index(fields=['linea', 'origen', 'dimension', 'fecha'], name='api_resumen_linea_i_07aaa5_idx')],
+                'unique_together': {('fecha', 'turno', 'linea', 'origen', 'dimension', 'valor')},
+            },
+        ),
+        migrations.RunPython(poblar_cubo, migrations.RunPython.noop),
+    ]
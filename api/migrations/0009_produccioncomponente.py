@@ -0,0 +1,47 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_componentes(apps, schema_editor):
+    """Descompone los códigos de producto ya cargados"""
+    Produccion = apps.get_model('api', 'Produccion')
+    ProduccionComponente = apps.get_model('api', 'ProduccionComponente')
+
+    componentes = []
+    for pk, codigo in Produccion.objects.exclude(producto='').values_list('pk', 'producto').iterator():
+        for parte in codigo.split('&'):
+            producto, _, porcentaje = parte.partition('|')
+            producto = producto.strip()
+            if not producto:
+                continue
+            try:
+                porcentaje = float(porcentaje) if porcentaje.strip() else None
+            except ValueError:
+                porcentaje = None
+            componentes.append(ProduccionComponente(produccion_id=pk, producto=producto, porcentaje=porcentaje))
+    ProduccionComponente.objects.bulk_create(componentes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_resumendetencion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProduccionComponente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('producto', models.CharField(max_length=100)),
+                ('porcentaje', models.FloatField(blank=True, null=True)),
+                ('produccion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='componentes', to='api.produccion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', 'produccion'], name='api_producc_product_860e59_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_componentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:13
+
+from django.db import migrations, models
+
+
+FTS5_SQL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS api_searchdocument_fts USING fts5(
+        titulo, contenido, content='api_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS api_searchdocument_ai AFTER INSERT ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(rowid, titulo, contenido) VALUES (new.id, new.titulo, new.contenido);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS api_searchdocument_ad AFTER DELETE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, titulo, contenido)
+        VALUES ('delete', old.id, old.titulo, old.contenido);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS api_searchdocument_au AFTER UPDATE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, titulo, contenido)
+        VALUES ('delete', old.id, old.titulo, old.contenido);
+        INSERT INTO api_searchdocument_fts(rowid, titulo, contenido) VALUES (new.id, new.titulo, new.contenido);
+    END""",
+]
+
+FTS5_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS api_searchdocument_au",
+    "DROP TRIGGER IF EXISTS api_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS api_searchdocument_ai",
+    "DROP TABLE IF EXISTS api_searchdocument_fts",
+]
+
+POSTGRES_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS api_searchdocument_tsv_idx ON api_searchdocument
+        USING gin (to_tsvector('simple', titulo || ' ' || contenido))""",
+    """CREATE INDEX IF NOT EXISTS api_searchdocument_trgm_idx ON api_searchdocument
+        USING gin ((titulo || ' ' || contenido) gin_trgm_ops)""",
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS api_searchdocument_trgm_idx",
+    "DROP INDEX IF EXISTS api_searchdocument_tsv_idx",
+]
+
+
+def _ejecutar(schema_editor, sentencias):
+    for sql in sentencias:
+        schema_editor.execute(sql)
+
+
+def crear_indice_texto(apps, schema_editor):
+    """Índices de texto completo según el motor de base de datos"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _ejecutar(schema_editor, POSTGRES_SQL)
+    elif vendor == 'sqlite':
+        _ejecutar(schema_editor, FTS5_SQL)
+
+
+def eliminar_indice_texto(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _ejecutar(schema_editor, POSTGRES_DROP_SQL)
+    elif vendor == 'sqlite':
+        _ejecutar(schema_editor, FTS5_DROP_SQL)
+
+
+# Copia congelada de busqueda_service.FUENTES: la migración no debe depender
+# del código vivo, que puede cambiar de campos después de esta migración.
+FUENTES = {
+    'motor': ('Motor', ['id', 'codigo', 'tipo', 'estado'], ['codigo', 'tipo']),
+    'variador': ('Variador', ['id', 'codigo', 'marca', 'modelo', 'estado'], ['codigo', 'marca', 'modelo']),
+    'plc': ('PLC', ['id', 'nombre', 'modelo', 'tipo'], ['nombre', 'modelo']),
+    'entrada_salida': ('PLCEntradaSalida', ['id', 'direccion', 'etiqueta', 'tipo', 'plc__nombre'],
+                       ['etiqueta', 'direccion', 'descripcion']),
+    'orden': ('OrdenMantenimiento', ['id', 'titulo', 'estado', 'prioridad'], ['titulo', 'descripcion']),
+}
+
+
+def poblar_indice(apps, schema_editor):
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    for tipo, (modelo, campos, texto) in FUENTES.items():
+        columnas = list(dict.fromkeys(campos + texto))
+        lote = []
+        for fila in apps.get_model('api', modelo).objects.values(*columnas).iterator():
+            textos = [str(fila[c]) for c in texto if fila[c]]
+            lote.append(SearchDocument(
+                tipo=tipo,
+                objeto_id=fila['id'],
+                titulo=(textos[0] if textos else '')[:255],
+                contenido=' '.join(textos[1:]),
+                datos={c: fila[c] for c in campos},
+            ))
+        SearchDocument.objects.bulk_create(lote, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_produccioncomponente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('motor', 'Motor'), ('variador', 'Variador'), ('plc', 'PLC'), ('entrada_salida', 'Entrada/Salida PLC'), ('orden', 'Orden de Mantenimiento')], max_length=20)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('titulo', models.CharField(blank=True, default='', max_length=255)),
+                ('contenido', models.TextField(blank=True, default='')),
+                ('datos', models.JSONField(default=dict)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.RunPython(crear_indice_texto, eliminar_indice_texto),
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+VENTANA = 5
+ALFA_EWMA = 0.3
+
+
+def poblar_estadisticas(apps, schema_editor):
+    """Recorre el historial una única vez para inicializar las estadísticas"""
+    ResultadoInspeccion = apps.get_model('api', 'ResultadoInspeccion')
+    EstadisticaVariable = apps.get_model('api', 'EstadisticaVariable')
+
+    estadisticas = {}
+    for variable_id, valor in ResultadoInspeccion.objects.order_by('fecha', 'id').values_list(
+        'variable_id', 'valor_medido'
+    ).iterator():
+        e = estadisticas.setdefault(variable_id, EstadisticaVariable(variable_id=variable_id, ultimos=[]))
+        e.cantidad += 1
+        delta = valor - e.media
+        e.media += delta / e.cantidad
+        e.m2 += delta * (valor - e.media)
+        e.ewma = valor if e.ewma is None else ALFA_EWMA * valor + (1 - ALFA_EWMA) * e.ewma
+        e.ultimos = (e.ultimos + [valor])[-VENTANA:]
+    EstadisticaVariable.objects.bulk_create(estadisticas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaVariable',
+            fields=[
+                ('variable', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadistica', serialize=False, to='api.variableinspeccion')),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('media', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0)),
+                ('ewma', models.FloatField(blank=True, null=True)),
+                ('ultimos', models.JSONField(blank=True, default=list)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(poblar_estadisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_estadisticavariable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspeccionejecucion',
+            name='uuid_cliente',
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_inspeccionejecucion_uuid_cliente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CapacidadVariable',
+            fields=[
+                ('variable', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='capacidad', serialize=False, to='api.variableinspeccion')),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('subgrupos', models.PositiveIntegerField(default=0)),
+                ('media', models.FloatField(blank=True, null=True)),
+                ('rango_medio', models.FloatField(blank=True, null=True)),
+                ('sigma', models.FloatField(blank=True, null=True)),
+                ('lcl_x', models.FloatField(blank=True, null=True)),
+                ('ucl_x', models.FloatField(blank=True, null=True)),
+                ('lcl_r', models.FloatField(blank=True, null=True)),
+                ('ucl_r', models.FloatField(blank=True, null=True)),
+                ('cp', models.FloatField(blank=True, null=True)),
+                ('cpk', models.FloatField(blank=True, null=True)),
+                ('violaciones', models.JSONField(blank=True, default=dict)),
+                ('total_violaciones', models.PositiveIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cpk'], name='api_capacid_cpk_f87ef0_idx')],
+            },
+        ),
+    ]
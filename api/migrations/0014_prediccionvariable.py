@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_capacidadvariable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrediccionVariable',
+            fields=[
+                ('variable', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='prediccion', serialize=False, to='api.variableinspeccion')),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('anomalias', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(blank=True, help_text='Proporción de lecturas anómalas en la ventana', null=True)),
+                ('en_alerta', models.BooleanField(default=False)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['en_alerta', 'score'], name='api_predicc_en_aler_2be7b4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_prediccionvariable'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='evento',
+            name='tipo',
+            field=models.CharField(choices=[('motor', 'Motor'), ('variador', 'Variador'), ('orden', 'Orden de Mantenimiento'), ('reparacion', 'Reparación'), ('linea', 'Línea de Producción')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def iniciar_horas_ultimo_mantenimiento(apps, schema_editor):
+    # Los equipos existentes empiezan a contar horas desde hoy en lugar de vencer todos juntos
+    for modelo in ('Motor', 'Variador'):
+        apps.get_model('api', modelo).objects.update(horas_ultimo_mantenimiento=models.F('horas_uso'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_evento_tipo_linea'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanMantenimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('equipo_tipo', models.CharField(choices=[('motor', 'Motor'), ('variador', 'Variador')], max_length=20)),
+                ('intervalo_dias', models.PositiveIntegerField(blank=True, null=True)),
+                ('dias_primer_mantenimiento', models.PositiveIntegerField(blank=True, help_text='Desde la instalación; si se omite se usa intervalo_dias', null=True)),
+                ('intervalo_horas', models.PositiveIntegerField(blank=True, null=True)),
+                ('horas_uso_diarias', models.FloatField(default=24, help_text='Uso estimado para proyectar la fecha de los vencimientos por horas')),
+                ('anticipacion_dias', models.PositiveIntegerField(default=7, help_text='Días antes del vencimiento en que se genera la orden')),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta'), ('critica', 'Crítica')], default='media', max_length=20)),
+                ('tiempo_estimado', models.PositiveIntegerField(blank=True, help_text='Tiempo estimado en minutos', null=True)),
+                ('checklist', models.JSONField(blank=True, null=True)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='motor',
+            name='horas_ultimo_mantenimiento',
+            field=models.PositiveIntegerField(default=0, help_text='Horas de uso registradas en el último mantenimiento preventivo'),
+        ),
+        migrations.AddField(
+            model_name='variador',
+            name='horas_ultimo_mantenimiento',
+            field=models.PositiveIntegerField(default=0, help_text='Horas de uso registradas en el último mantenimiento preventivo'),
+        ),
+        migrations.CreateModel(
+            name='VencimientoMantenimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipo_tipo', models.CharField(max_length=20)),
+                ('equipo_id', models.IntegerField()),
+                ('fecha_vencimiento', models.DateField()),
+                ('fecha_generacion', models.DateField(help_text='fecha_vencimiento - anticipación del plan')),
+                ('horas_vencimiento', models.PositiveIntegerField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('orden', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vencimientos_preventivos', to='api.ordenmantenimiento')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vencimientos', to='api.planmantenimiento')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('orden__isnull', True)), fields=['fecha_generacion'], name='vencimiento_pendiente_idx'), models.Index(fields=['fecha_vencimiento'], name='api_vencimi_fecha_v_871795_idx'), models.Index(fields=['equipo_tipo', 'equipo_id'], name='api_vencimi_equipo__9687d8_idx')],
+                'unique_together': {('plan', 'equipo_tipo', 'equipo_id')},
+            },
+        ),
+        migrations.RunPython(iniciar_horas_ultimo_mantenimiento, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_planes_mantenimiento'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='motor',
+            name='proximo_mantenimiento',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='variador',
+            name='proximo_mantenimiento',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
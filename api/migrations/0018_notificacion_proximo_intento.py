@@ -0,0 +1,35 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:35
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def encolar_fallidas_recientes(apps, schema_editor):
+    # Las fallidas de las últimas 24 h (la ventana de la tarea anterior) entran a la cola de reintentos
+    ahora = timezone.now()
+    apps.get_model('api', 'NotificacionApp').objects.filter(
+        enviada_push=False, intentos_envio__gt=0, intentos_envio__lt=5,
+        fecha_creacion__gte=ahora - timedelta(hours=24),
+    ).update(proximo_intento=ahora)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_indice_proximo_mantenimiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacionapp',
+            name='proximo_intento',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificacionapp',
+            index=models.Index(condition=models.Q(('enviada_push', False)), fields=['proximo_intento'], name='notificacion_reintento_idx'),
+        ),
+        migrations.RunPython(encolar_fallidas_recientes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_notificacion_proximo_intento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenNotificacionArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('usuario_id', models.IntegerField()),
+                ('mes', models.DateField()),
+                ('tipo', models.CharField(max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('leidas', models.PositiveIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'app_notificaciones_archivadas',
+                'ordering': ['-mes', 'usuario_id', 'tipo'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dispositivoapp',
+            index=models.Index(fields=['esta_activo', 'ultima_actualizacion'], name='dispositivo_retencion_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumennotificacionarchivada',
+            constraint=models.UniqueConstraint(fields=('usuario_id', 'mes', 'tipo'), name='resumen_notificacion_unico'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_sincronizacion_delta'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historialcambioorden',
+            name='tipo_cambio',
+            field=models.CharField(choices=[('descripcion', 'Descripción'), ('estado', 'Estado'), ('asignacion', 'Asignación'), ('equipo', 'Equipo'), ('imagen', 'Imagen')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,131 @@
+# api/mixins.py
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versiones_service
+from .campos_dispersos import campos_solicitados, columnas_requeridas
+from .sincronizacion_service import cambios_desde, codificar_cursor, decodificar_cursor
+
+
+class CondicionalGetMixin:
+    """
+    GET condicional para catálogos que cambian poco.
+
+    El ETag sale de las versiones en caché de `tablas_version` (por defecto el
+    modelo del queryset) y de la URL pedida; si coincide con If-None-Match se
+    responde 304 sin tocar el queryset ni los serializers. Incluir en
+    tablas_version los modelos cuyos nombres muestra el serializer.
+    """
+    tablas_version = None
+
+    def get_tablas_version(self):
+        return self.tablas_version or [self.queryset.model]
+
+    def respuesta_condicional(self, request, generar):
+        """Llama a generar() solo si el cliente no tiene ya la versión vigente"""
+        tablas = self.get_tablas_version()
+        etag = versiones_service.etag(tablas, request.get_full_path(), getattr(request, 'accepted_media_type', ''))
+        if etag is None:
+            return generar()
+        ultima = versiones_service.ultima_modificacion(tablas)
+        cabeceras = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if ultima:
+            cabeceras['Last-Modified'] = http_date(ultima.timestamp())
+
+        if self._sin_cambios(request, etag, ultima):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+
+        response = generar()
+        if response.status_code == status.HTTP_200_OK:
+            for cabecera, valor in cabeceras.items():
+                response[cabecera] = valor
+        return response
+
+    @staticmethod
+    def _sin_cambios(request, etag, ultima):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return if_none_match.strip() == '*' or etag in [valor.strip() for valor in if_none_match.split(',')]
+        desde = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return bool(desde and ultima and int(ultima.timestamp()) <= desde)
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_condicional(request, lambda: super(CondicionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.respuesta_condicional(request, lambda: super(CondicionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+
+class CamposDispersosMixin:
+    """
+    Acota el queryset de list/retrieve a las columnas que usan los campos
+    pedidos con ?fields= / ?omit= (only() + select_related de las FK
+    atravesadas). Sin esos parámetros el queryset queda como está.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'action', None) not in ('list', 'retrieve'):
+            return queryset
+        pedidos, omitidos = campos_solicitados(self.request)
+        if pedidos is None and not omitidos:
+            return queryset
+        requeridas = columnas_requeridas(self.get_serializer())
+        if requeridas is None:
+            return queryset
+        columnas, relaciones = requeridas
+        # Las select_related del queryset base pueden apuntar a columnas diferidas
+        queryset = queryset.select_related(None)
+        if relaciones:
+            queryset = queryset.select_related(*relaciones)
+        return queryset.only(*columnas)
+
+
+class SincronizacionDeltaMixin(CondicionalGetMixin):
+    """
+    Lista de catálogo con sincronización delta para la app móvil.
+
+    - ?since=<cursor>: {'cursor', 'completo', 'cambios', 'eliminados'} con solo las
+      filas modificadas y los ids eliminados desde el cursor. No se combina con
+      filterset_fields (400): un activo que deja de cumplir el filtro no se
+      informaría como cambio ni como eliminado.
+    - Sin since: la lista completa de siempre como GET condicional (ETag /
+      Last-Modified, 304 si la app ya la tiene) y el cursor para la próxima
+      sincronización en X-Sync-Cursor.
+    """
+    sincronizacion_modelo = None  # Clave de sincronizacion_service.MODELOS
+
+    def serializar_sincronizacion(self, queryset):
+        return self.get_serializer(queryset, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_sincronizada(request, self.filter_queryset(self.get_queryset()))
+
+    def respuesta_sincronizada(self, request, queryset):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                instante = decodificar_cursor(since)
+            except (ValueError, OverflowError, OSError):
+                return Response({'error': 'Cursor de sincronización inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            filtros = [campo for campo in getattr(self, 'filterset_fields', None) or () if campo in request.query_params]
+            if filtros:
+                return Response(
+                    {'error': f"since no admite filtros ({', '.join(filtros)}): sincronice el catálogo completo"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            modificadas, eliminados, cursor, completo = cambios_desde(self.sincronizacion_modelo, queryset, instante)
+            return Response({
+                'cursor': cursor,
+                'completo': completo,
+                'cambios': self.serializar_sincronizacion(modificadas),
+                'eliminados': eliminados,
+            })
+
+        # El cursor se toma antes de leer para no perder cambios concurrentes
+        cursor = codificar_cursor(timezone.now())
+        return self.respuesta_condicional(
+            request, lambda: Response(self.serializar_sincronizacion(queryset), headers={'X-Sync-Cursor': cursor})
+        )
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.conf import settings
@@ -66,6 +66,7 @@ class Sector(models.Model):
 class Equipo(models.Model):
     nombre = models.CharField(max_length=100)
     sector = models.ForeignKey(Sector, on_delete=models.CASCADE, related_name='equipos')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Sincronización delta de la app
     
     class Meta:
         unique_together = [['nombre', 'sector']]
@@ -147,15 +148,45 @@ class EquipoBase(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='operativo')
     fecha_instalacion = models.DateField(null=True, blank=True)
     ultimo_mantenimiento = models.DateField(null=True, blank=True)
-    proximo_mantenimiento = models.DateField(null=True, blank=True)
+    proximo_mantenimiento = models.DateField(null=True, blank=True, db_index=True)
     horas_uso = models.PositiveIntegerField(default=0)
+    horas_ultimo_mantenimiento = models.PositiveIntegerField(
+        default=0, help_text="Horas de uso registradas en el último mantenimiento preventivo"
+    )
     manual = models.FileField(upload_to='manuales/', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Sincronización delta de la app
+
+    # Sin planes activos para la clase se mantienen las frecuencias históricas
+    EQUIPO_TIPO = None
+    DIAS_PRIMER_MANTENIMIENTO = 30
+    DIAS_ENTRE_MANTENIMIENTOS = 90
     
     class Meta:
         abstract = True
 
+    def _calcular_proximo_mantenimiento(self):
+        """Calcula próximo mantenimiento (solo equipos operativos) según los planes de su clase"""
+        from datetime import timedelta  # ✅ Importación local
+        from .programacion_service import vencimientos_equipo
+
+        # El post_save reutiliza estos vencimientos para actualizar el índice
+        self._vencimientos = vencimientos_equipo(self)
+        fechas = [fecha for _, fecha, _ in self._vencimientos if fecha]
+        if fechas:
+            self.proximo_mantenimiento = min(fechas)
+        elif self._vencimientos:
+            self.proximo_mantenimiento = None
+        elif self.ultimo_mantenimiento:
+            self.proximo_mantenimiento = self.ultimo_mantenimiento + timedelta(days=self.DIAS_ENTRE_MANTENIMIENTOS)
+        elif self.fecha_instalacion:
+            self.proximo_mantenimiento = self.fecha_instalacion + timedelta(days=self.DIAS_PRIMER_MANTENIMIENTO)
+        else:
+            self.proximo_mantenimiento = None
+
 
 class Motor(EquipoBase, UbicacionBase):
+    EQUIPO_TIPO = 'motor'
+
     codigo = models.CharField(max_length=100, unique=True)
     potencia = models.CharField(max_length=50)
     tipo = models.CharField(max_length=50)
@@ -196,19 +227,6 @@ class Motor(EquipoBase, UbicacionBase):
         # ✅ UN solo super().save() al final
         super().save(*args, **kwargs)
 
-    def _calcular_proximo_mantenimiento(self):
-        """Calcula próximo mantenimiento solo para equipos operativos"""
-        from datetime import timedelta  # ✅ Importación local
-        
-        if self.ultimo_mantenimiento:
-            # Basado en último mantenimiento + frecuencia (ej: 90 días)
-            self.proximo_mantenimiento = self.ultimo_mantenimiento + timedelta(days=90)
-        elif self.fecha_instalacion:
-            # Equipo nuevo - primer mantenimiento (ej: 30 días)
-            self.proximo_mantenimiento = self.fecha_instalacion + timedelta(days=30)
-        else:
-            self.proximo_mantenimiento = None
-            
     def get_absolute_plano_url(self, request):
         if self.plano_url:
             return request.build_absolute_uri(self.plano_url)
@@ -221,6 +239,8 @@ class Motor(EquipoBase, UbicacionBase):
     
 
 class Variador(EquipoBase, UbicacionBase):
+    EQUIPO_TIPO = 'variador'
+
     codigo = models.CharField(max_length=100, unique=True)
     marca = models.CharField(max_length=100)
     modelo = models.CharField(max_length=100)
@@ -250,16 +270,18 @@ class Variador(EquipoBase, UbicacionBase):
         
         super().save(*args, **kwargs)
 
-    def _calcular_proximo_mantenimiento(self):
-        """Calcula próximo mantenimiento solo para equipos operativos"""
-        from datetime import timedelta  # ✅ Importación local
-        
-        if self.ultimo_mantenimiento:
-            self.proximo_mantenimiento = self.ultimo_mantenimiento + timedelta(days=90)
-        elif self.fecha_instalacion:
-            self.proximo_mantenimiento = self.fecha_instalacion + timedelta(days=30)
-        else:
-            self.proximo_mantenimiento = None
+class RegistroEliminado(models.Model):
+    """Tombstone de un activo eliminado, para que la app lo quite en la sincronización delta"""
+    modelo = models.CharField(max_length=30)
+    objeto_id = models.BigIntegerField()
+    eliminado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['modelo', 'eliminado_en'])]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} ({self.eliminado_en:%Y-%m-%d %H:%M})"
+
 
 class ReunionDiaria(models.Model):
     ESTADO_CHOICES = [
@@ -396,6 +418,67 @@ class OrdenMantenimiento(models.Model):
         #if self.tipo == 'preventivo' and not self.proximo_mantenimiento:
         #    raise ValidationError("Las órdenes preventivas requieren fecha de próximo mantenimiento")
 
+class PlanMantenimiento(models.Model):
+    """Plan preventivo por clase de equipo: por calendario, por horas de uso o ambos (vence lo primero)"""
+    EQUIPO_TIPO_CHOICES = [
+        ('motor', 'Motor'),
+        ('variador', 'Variador'),
+    ]
+
+    nombre = models.CharField(max_length=100)
+    equipo_tipo = models.CharField(max_length=20, choices=EQUIPO_TIPO_CHOICES)
+    intervalo_dias = models.PositiveIntegerField(null=True, blank=True)
+    dias_primer_mantenimiento = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Desde la instalación; si se omite se usa intervalo_dias"
+    )
+    intervalo_horas = models.PositiveIntegerField(null=True, blank=True)
+    horas_uso_diarias = models.FloatField(
+        default=24, help_text="Uso estimado para proyectar la fecha de los vencimientos por horas"
+    )
+    anticipacion_dias = models.PositiveIntegerField(
+        default=7, help_text="Días antes del vencimiento en que se genera la orden"
+    )
+    prioridad = models.CharField(max_length=20, choices=OrdenMantenimiento.PRIORIDAD_CHOICES, default='media')
+    tiempo_estimado = models.PositiveIntegerField(help_text="Tiempo estimado en minutos", null=True, blank=True)
+    checklist = models.JSONField(null=True, blank=True)
+    activo = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_equipo_tipo_display()})"
+
+    def clean(self):
+        if not self.intervalo_dias and not self.intervalo_horas:
+            raise ValidationError("Debe definir un intervalo en días, en horas de uso o ambos.")
+        if self.horas_uso_diarias <= 0:
+            raise ValidationError("Las horas de uso diarias deben ser mayores a cero.")
+
+
+class VencimientoMantenimiento(models.Model):
+    """Índice de vencimientos preventivos por (plan, equipo), mantenido por programacion_service"""
+    plan = models.ForeignKey(PlanMantenimiento, on_delete=models.CASCADE, related_name='vencimientos')
+    equipo_tipo = models.CharField(max_length=20)
+    equipo_id = models.IntegerField()
+    fecha_vencimiento = models.DateField()
+    fecha_generacion = models.DateField(help_text="fecha_vencimiento - anticipación del plan")
+    horas_vencimiento = models.PositiveIntegerField(null=True, blank=True)
+    orden = models.ForeignKey(
+        OrdenMantenimiento, on_delete=models.SET_NULL, null=True, blank=True, related_name='vencimientos_preventivos'
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('plan', 'equipo_tipo', 'equipo_id')]
+        indexes = [
+            models.Index(fields=['fecha_generacion'], condition=models.Q(orden__isnull=True),
+                         name='vencimiento_pendiente_idx'),
+            models.Index(fields=['fecha_vencimiento']),
+            models.Index(fields=['equipo_tipo', 'equipo_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.plan} → {self.equipo_tipo} {self.equipo_id}: {self.fecha_vencimiento}"
+
+
 class Proveedor(models.Model):
     ESPECIALIDAD_CHOICES = [
         ('electrico', 'Eléctrico'),
@@ -448,6 +531,7 @@ class HistorialCambioOrden(models.Model):
     TIPO_CAMBIO_CHOICES = [
         ('descripcion', 'Descripción'),
         ('estado', 'Estado'),
+        ('asignacion', 'Asignación'),
         ('equipo', 'Equipo'),
         ('imagen', 'Imagen'),
     ]
@@ -490,6 +574,7 @@ class Evento(models.Model):
         ('variador', 'Variador'),
         ('orden', 'Orden de Mantenimiento'),
         ('reparacion', 'Reparación'),
+        ('linea', 'Línea de Producción'),
     ]
     
     tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
@@ -604,11 +689,130 @@ class VariableInspeccion(models.Model):
     def __str__(self):
         return f"{self.ruta.nombre} → {self.nombre}"
 
+
+class EstadisticaVariable(models.Model):
+    """
+    Estadísticas acumuladas de una variable, actualizadas en O(1) por resultado:
+    media/varianza (Welford), EWMA y los últimos VENTANA valores.
+    """
+    VENTANA = 5
+    ALFA_EWMA = 0.3
+
+    variable = models.OneToOneField(
+        VariableInspeccion, on_delete=models.CASCADE, primary_key=True, related_name='estadistica'
+    )
+    cantidad = models.PositiveIntegerField(default=0)
+    media = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)  # Suma de cuadrados de desvíos (Welford)
+    ewma = models.FloatField(null=True, blank=True)
+    ultimos = models.JSONField(default=list, blank=True)  # Más reciente al final
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Estadística {self.variable_id} (n={self.cantidad})"
+
+    @property
+    def varianza(self):
+        return self.m2 / (self.cantidad - 1) if self.cantidad > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        return self.varianza ** 0.5
+
+    @property
+    def promedio_movil(self):
+        return sum(self.ultimos) / len(self.ultimos) if self.ultimos else None
+
+    def agregar(self, valor):
+        """Incorpora un valor nuevo sin consultar el historial"""
+        self.cantidad += 1
+        delta = valor - self.media
+        self.media += delta / self.cantidad
+        self.m2 += delta * (valor - self.media)
+        self.ewma = valor if self.ewma is None else self.ALFA_EWMA * valor + (1 - self.ALFA_EWMA) * self.ewma
+        self.ultimos = (list(self.ultimos) + [valor])[-self.VENTANA:]
+
+    @classmethod
+    def registrar(cls, variable_id, valor):
+        """Actualiza la estadística de la variable bloqueando su fila"""
+        return cls.registrar_lote({variable_id: [valor]})[variable_id]
+
+    @classmethod
+    def registrar_lote(cls, valores_por_variable):
+        """
+        Incorpora {variable_id: [valores en orden]} con una lectura y una
+        escritura para todo el lote. Devuelve {variable_id: estadistica}.
+        """
+        ids = list(valores_por_variable)
+        with transaction.atomic():
+            existentes = set(cls.objects.filter(variable_id__in=ids).values_list('variable_id', flat=True))
+            cls.objects.bulk_create(
+                [cls(variable_id=i) for i in ids if i not in existentes], ignore_conflicts=True
+            )
+            estadisticas = {e.variable_id: e for e in cls.objects.select_for_update().filter(variable_id__in=ids)}
+            ahora = timezone.now()  # bulk_update no aplica auto_now
+            for variable_id, valores in valores_por_variable.items():
+                for valor in valores:
+                    estadisticas[variable_id].agregar(valor)
+                estadisticas[variable_id].actualizado = ahora
+            cls.objects.bulk_update(
+                estadisticas.values(), ['cantidad', 'media', 'm2', 'ewma', 'ultimos', 'actualizado']
+            )
+        return estadisticas
+
+class CapacidadVariable(models.Model):
+    """Resumen SPC (X-bar/R, Cp/Cpk, reglas Western Electric) materializado por spc_service"""
+    variable = models.OneToOneField(
+        VariableInspeccion, on_delete=models.CASCADE, primary_key=True, related_name='capacidad'
+    )
+    muestras = models.PositiveIntegerField(default=0)
+    subgrupos = models.PositiveIntegerField(default=0)
+    media = models.FloatField(null=True, blank=True)
+    rango_medio = models.FloatField(null=True, blank=True)
+    sigma = models.FloatField(null=True, blank=True)
+    lcl_x = models.FloatField(null=True, blank=True)
+    ucl_x = models.FloatField(null=True, blank=True)
+    lcl_r = models.FloatField(null=True, blank=True)
+    ucl_r = models.FloatField(null=True, blank=True)
+    cp = models.FloatField(null=True, blank=True)
+    cpk = models.FloatField(null=True, blank=True)
+    violaciones = models.JSONField(default=dict, blank=True)  # {regla: cantidad}
+    total_violaciones = models.PositiveIntegerField(default=0)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['cpk']),
+        ]
+
+    def __str__(self):
+        return f"SPC {self.variable_id} - Cpk {self.cpk}"
+
+class PrediccionVariable(models.Model):
+    """Último puntaje del modelo predictivo por variable (calculado por predictivo_service)"""
+    variable = models.OneToOneField(
+        VariableInspeccion, on_delete=models.CASCADE, primary_key=True, related_name='prediccion'
+    )
+    muestras = models.PositiveIntegerField(default=0)
+    anomalias = models.PositiveIntegerField(default=0)
+    score = models.FloatField(null=True, blank=True, help_text="Proporción de lecturas anómalas en la ventana")
+    en_alerta = models.BooleanField(default=False)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['en_alerta', 'score'])]
+
+    def __str__(self):
+        return f"Predicción {self.variable_id}: {self.score}"
+
+
 class InspeccionEjecucion(models.Model):
     ruta = models.ForeignKey(RutaInspeccion, on_delete=models.CASCADE, related_name='ejecuciones')
     tecnico = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     fecha = models.DateTimeField(auto_now_add=True)
     observaciones = models.TextField(blank=True, null=True)
+    # Identificador generado por la app móvil para reintentos offline idempotentes
+    uuid_cliente = models.UUIDField(null=True, blank=True, unique=True)
 
     def __str__(self):
         return f"{self.ruta.nombre} ejecutada por {self.tecnico} en {self.fecha.strftime('%Y-%m-%d %H:%M')}"
@@ -619,39 +823,58 @@ class ResultadoInspeccion(models.Model):
     valor_medido = models.FloatField()
     fecha = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def desvio(self):
+        return abs(self.valor_medido - self.variable.valor_referencia)
+
+    @property
+    def severidad(self):
+        """None si está dentro de tolerancia; si no 'leve', 'moderado' o 'crítico'"""
+        desvio, tolerancia = self.desvio, self.variable.tolerancia
+        if desvio <= tolerancia:
+            return None
+        if desvio > tolerancia * 2:
+            return 'crítico'
+        if desvio < tolerancia * 1.2:
+            return 'leve'
+        return 'moderado'
+
     def save(self, *args, **kwargs):
+        creado = self._state.adding
+        # Variable y ruta en una sola consulta si el llamador no las dejó en caché.
+        # Se cargan antes de guardar para que los receptores de post_save las reutilicen.
+        if not self.__class__.variable.is_cached(self):
+            self.variable = VariableInspeccion.objects.get(pk=self.variable_id)
+        if not self.__class__.ejecucion.is_cached(self):
+            self.ejecucion = InspeccionEjecucion.objects.select_related('ruta').get(pk=self.ejecucion_id)
         super().save(*args, **kwargs)
+        variable, ruta = self.variable, self.ejecucion.ruta
 
         # Lógica automática de verificación y alerta
-        desvio = abs(self.valor_medido - self.variable.valor_referencia)
-        if desvio > self.variable.tolerancia:
-            severidad = 'moderado'
-            if desvio > self.variable.tolerancia * 2:
-                severidad = 'crítico'
-            elif desvio < self.variable.tolerancia * 1.2:
-                severidad = 'leve'
-
+        severidad = self.severidad
+        if severidad:
             Evento.objects.create(
-                tipo=self.ejecucion.ruta.activo_tipo,
-                descripcion=f"Alerta [{severidad}]: {self.variable.nombre} fuera de rango. "
-                            f"Medido: {self.valor_medido} (Ref: {self.variable.valor_referencia} ±{self.variable.tolerancia})",
-                usuario=self.ejecucion.tecnico,
-                objeto_id=self.ejecucion.ruta.activo_id
+                tipo=ruta.activo_tipo,
+                descripcion=f"Alerta [{severidad}]: {variable.nombre} fuera de rango. "
+                            f"Medido: {self.valor_medido} (Ref: {variable.valor_referencia} ±{variable.tolerancia})",
+                usuario_id=self.ejecucion.tecnico_id,
+                objeto_id=ruta.activo_id
             )
-        ultimos = ResultadoInspeccion.objects.filter(
-            variable=self.variable
-        ).order_by('-fecha')[:5]
-
-        if ultimos.count() >= 3:
-            valores = [r.valor_medido for r in ultimos]
-            promedio = sum(valores) / len(valores)
-            if abs(promedio - self.variable.valor_referencia) > self.variable.tolerancia:
+
+        if not creado:
+            return
+
+        # Tendencia a partir de las estadísticas acumuladas (sin leer el historial)
+        estadistica = EstadisticaVariable.registrar(self.variable_id, self.valor_medido)
+        if len(estadistica.ultimos) >= 3:
+            promedio = estadistica.promedio_movil
+            if abs(promedio - variable.valor_referencia) > variable.tolerancia:
                 Evento.objects.create(
-                    tipo=self.ejecucion.ruta.activo_tipo,
-                    descripcion=f"Predicción: tendencia anómala detectada en {self.variable.nombre}. "
-                                f"Promedio móvil: {promedio:.2f}",
-                    usuario=self.ejecucion.tecnico,
-                    objeto_id=self.ejecucion.ruta.activo_id
+                    tipo=ruta.activo_tipo,
+                    descripcion=f"Predicción: tendencia anómala detectada en {variable.nombre}. "
+                                f"Promedio móvil: {promedio:.2f} (EWMA: {estadistica.ewma:.2f})",
+                    usuario_id=self.ejecucion.tecnico_id,
+                    objeto_id=ruta.activo_id
                 )
 
 
@@ -698,6 +921,7 @@ class NotificacionApp(models.Model):
     enviada_push = models.BooleanField(default=False)
     intentos_envio = models.IntegerField(default=0)
     error_envio = models.TextField(blank=True)
+    proximo_intento = models.DateTimeField(null=True, blank=True)  # Backoff exponencial de reintentos
     
     class Meta:
         db_table = 'app_notificaciones'
@@ -705,6 +929,8 @@ class NotificacionApp(models.Model):
         indexes = [
             models.Index(fields=['usuario_id', 'leida']),
             models.Index(fields=['fecha_creacion']),
+            models.Index(fields=['proximo_intento'], condition=models.Q(enviada_push=False),
+                         name='notificacion_reintento_idx'),
         ]
     
     def __str__(self):
@@ -724,10 +950,33 @@ class DispositivoApp(models.Model):
     
     class Meta:
         db_table = 'app_dispositivos'
+        indexes = [
+            models.Index(fields=['esta_activo', 'ultima_actualizacion'], name='dispositivo_retencion_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario_nombre} - {self.plataforma}"
 
+
+class ResumenNotificacionArchivada(models.Model):
+    """Conteo mensual por usuario y tipo de las notificaciones eliminadas por la retención"""
+    usuario_id = models.IntegerField()
+    mes = models.DateField()  # Primer día del mes de creación
+    tipo = models.CharField(max_length=20)
+    cantidad = models.PositiveIntegerField(default=0)
+    leidas = models.PositiveIntegerField(default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'app_notificaciones_archivadas'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario_id', 'mes', 'tipo'], name='resumen_notificacion_unico'),
+        ]
+        ordering = ['-mes', 'usuario_id', 'tipo']
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.mes:%Y-%m} {self.tipo}: {self.cantidad}"
+
 # Modelos para datos de Node-RED
 class Produccion(models.Model):
     fecha = models.DateField()
@@ -765,6 +1014,54 @@ class Produccion(models.Model):
         if self.meta_produccion and self.meta_produccion > 0:
             self.eficiencia = (self.fabricacion_toneladas / self.meta_produccion) * 100
         super().save(*args, **kwargs)
+        self.sincronizar_componentes()
+
+    def sincronizar_componentes(self):
+        """Mantiene ProduccionComponente alineado con el código de producto"""
+        nuevos = ProduccionComponente.parsear(self.producto)
+        actuales = list(self.componentes.order_by('id').values_list('producto', 'porcentaje'))
+        if actuales == nuevos:
+            return
+        self.componentes.all().delete()
+        ProduccionComponente.objects.bulk_create([
+            ProduccionComponente(produccion=self, producto=producto, porcentaje=porcentaje)
+            for producto, porcentaje in nuevos
+        ])
+
+
+class ProduccionComponente(models.Model):
+    """Producto individual dentro de un código compuesto ("18x18x33|20&20x20x40|25")"""
+    produccion = models.ForeignKey(Produccion, on_delete=models.CASCADE, related_name='componentes')
+    producto = models.CharField(max_length=100)
+    porcentaje = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['producto', 'produccion']),
+        ]
+
+    def __str__(self):
+        return f"{self.producto} ({self.porcentaje}%)" if self.porcentaje is not None else self.producto
+
+    @staticmethod
+    def parsear(codigo):
+        """
+        Devuelve [(producto, porcentaje)] a partir del código de producción.
+        Los componentes se separan con '&' y el porcentaje con '|'; un producto
+        simple no tiene porcentaje.
+        """
+        componentes = []
+        for parte in (codigo or '').split('&'):
+            producto, _, porcentaje = parte.partition('|')
+            producto = producto.strip()
+            if not producto:
+                continue
+            try:
+                porcentaje = float(porcentaje) if porcentaje.strip() else None
+            except ValueError:
+                porcentaje = None
+            componentes.append((producto, porcentaje))
+        return componentes
 
 class ProduccionTiempoReal(models.Model):
     timestamp = models.DateTimeField(auto_now_add=False)  # Timestamp específico de Node-Red
@@ -930,6 +1227,40 @@ class ParadaTurno(models.Model):
         return f"Parada {self.linea} - {self.fecha} - {self.motivo}"
 
 
+# Cubo precalculado de paradas y fallas por turno (Pareto / gráficos)
+class ResumenDetencion(models.Model):
+    ORIGEN_CHOICES = [
+        ('parada', 'Parada'),
+        ('falla', 'Falla'),
+    ]
+
+    DIMENSION_CHOICES = [
+        ('motivo', 'Motivo'),
+        ('tipo', 'Tipo'),
+        ('gravedad', 'Gravedad'),
+    ]
+
+    fecha = models.DateField()
+    turno = models.ForeignKey(Turno, on_delete=models.CASCADE)
+    linea = models.ForeignKey(LineaProduccion, on_delete=models.CASCADE)
+    origen = models.CharField(max_length=10, choices=ORIGEN_CHOICES)
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    valor = models.CharField(max_length=20)
+    registros = models.PositiveIntegerField(default=0)
+    minutos = models.PositiveIntegerField(default=0)
+    cantidad = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [['fecha', 'turno', 'linea', 'origen', 'dimension', 'valor']]
+        indexes = [
+            models.Index(fields=['origen', 'dimension', 'fecha']),
+            models.Index(fields=['linea', 'origen', 'dimension', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.origen} {self.dimension}={self.valor} - {self.linea} - {self.fecha}"
+
+
 # Modelo para registro de recepción de datos desde Node-RED
 class NodeRedLog(models.Model):
     TIPO_DATO_CHOICES = [
@@ -959,3 +1290,70 @@ class NodeRedLog(models.Model):
 
     def __str__(self):
         return f"Log {self.tipo_dato} - {self.fecha_recepcion}"
+
+
+# Resumen de confiabilidad por activo (MTBF/MTTR), recalculado por Celery
+class IndicadorConfiabilidad(models.Model):
+    ACTIVO_TIPO_CHOICES = [
+        ('equipo', 'Equipo'),
+        ('motor', 'Motor'),
+        ('variador', 'Variador'),
+    ]
+
+    activo_tipo = models.CharField(max_length=20, choices=ACTIVO_TIPO_CHOICES)
+    activo_id = models.IntegerField()
+    activo_nombre = models.CharField(max_length=150, blank=True)
+    linea = models.ForeignKey(
+        LineaProduccion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='indicadores_confiabilidad'
+    )
+    cantidad_fallas = models.PositiveIntegerField(default=0)
+    inicio_observacion = models.DateTimeField()
+    ultima_falla = models.DateTimeField(null=True, blank=True)
+    horas_observadas = models.FloatField(default=0)
+    horas_reparacion = models.FloatField(default=0)
+    mtbf_horas = models.FloatField(null=True, blank=True)
+    mttr_horas = models.FloatField(null=True, blank=True)
+    tasa_fallas = models.FloatField(default=0, help_text="Fallas cada 1000 horas de operación")
+    disponibilidad = models.FloatField(null=True, blank=True)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [['activo_tipo', 'activo_id']]
+        verbose_name = 'Indicador de confiabilidad'
+        verbose_name_plural = 'Indicadores de confiabilidad'
+        indexes = [
+            models.Index(fields=['tasa_fallas']),
+            models.Index(fields=['linea', 'tasa_fallas']),
+            models.Index(fields=['actualizado']),
+        ]
+
+    def __str__(self):
+        return f"{self.activo_tipo} #{self.activo_id} - MTBF {self.mtbf_horas}"
+
+
+# Índice desnormalizado para la búsqueda global (ver busqueda_service)
+class SearchDocument(models.Model):
+    TIPO_CHOICES = [
+        ('motor', 'Motor'),
+        ('variador', 'Variador'),
+        ('plc', 'PLC'),
+        ('entrada_salida', 'Entrada/Salida PLC'),
+        ('orden', 'Orden de Mantenimiento'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveIntegerField()
+    titulo = models.CharField(max_length=255, blank=True, default='')
+    contenido = models.TextField(blank=True, default='')
+    datos = models.JSONField(default=dict)  # Payload que devuelve la búsqueda
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['tipo', 'objeto_id']]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.objeto_id} - {self.titulo}"
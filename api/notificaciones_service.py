@@ -1,62 +1,55 @@
 # services/notificaciones_service.py
-import firebase_admin
-from firebase_admin import messaging
-from django.conf import settings
+import logging
+
+from django.utils import timezone
+
+from .models import NotificacionApp, DispositivoApp
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
 
 class ServicioNotificaciones:
     def __init__(self):
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app()
+        # Mismo camino de envío que NotificationService: tokens inválidos y cola de reintentos
+        self.servicio = NotificationService()
     
     def enviar_notificacion_push(self, notificacion):
-        """Enviar notificación push a través de FCM"""
+        """Enviar notificación push a todos los dispositivos del usuario en un solo despacho concurrente"""
+        tokens = list(
+            DispositivoApp.objects.filter(usuario_id=notificacion.usuario_id, esta_activo=True)
+            .values_list('token_fcm', flat=True)
+        )
+        if not tokens:
+            return
+
         try:
-            # Buscar dispositivos del usuario
-            dispositivos = DispositivoApp.objects.filter(
-                usuario_id=notificacion.usuario_id,
-                esta_activo=True
+            entregados, invalidos = self.servicio._enviar_multicast(
+                tokens,
+                notificacion.titulo,
+                notificacion.mensaje,
+                {
+                    'tipo': notificacion.tipo,
+                    'prioridad': notificacion.prioridad,
+                    'relacion_id': str(notificacion.relacion_id or ''),
+                    'relacion_tipo': notificacion.relacion_tipo or '',
+                    'fecha_creacion': notificacion.fecha_creacion.isoformat(),
+                    **notificacion.data_adicional
+                },
             )
-            
-            for dispositivo in dispositivos:
-                message = messaging.Message(
-                    notification=messaging.Notification(
-                        title=notificacion.titulo,
-                        body=notificacion.mensaje,
-                    ),
-                    data={
-                        'tipo': notificacion.tipo,
-                        'prioridad': notificacion.prioridad,
-                        'relacion_id': str(notificacion.relacion_id or ''),
-                        'relacion_tipo': notificacion.relacion_tipo or '',
-                        'fecha_creacion': notificacion.fecha_creacion.isoformat(),
-                        **notificacion.data_adicional
-                    },
-                    token=dispositivo.token_fcm,
-                    android=messaging.AndroidConfig(
-                        priority='high' if notificacion.prioridad in ['alta', 'critica'] else 'normal'
-                    ),
-                    apns=messaging.APNSConfig(
-                        payload=messaging.APNSPayload(
-                            aps=messaging.Aps(
-                                sound='default',
-                                badge=1,
-                                content_available=True
-                            )
-                        )
-                    )
-                )
-                
-                response = messaging.send(message)
-                notificacion.enviada_push = True
-                notificacion.save()
-                
-                logger.info(f"Notificación enviada: {response}")
-                
         except Exception as e:
-            notificacion.intentos_envio += 1
-            notificacion.error_envio = str(e)
-            notificacion.save()
+            self.servicio._registrar_fallos([notificacion], str(e))
             logger.error(f"Error enviando notificación: {e}")
+            return
+
+        self.servicio._desactivar_tokens(invalidos)
+        if not entregados:
+            self.servicio._registrar_fallos([notificacion], "FCM rechazó todos los dispositivos")
+            logger.error(f"FCM rechazó los {len(tokens)} dispositivos del usuario {notificacion.usuario_id}")
+            return
+
+        notificacion.enviada_push = True
+        notificacion.save(update_fields=['enviada_push'])
+        logger.info(f"Notificación enviada a {len(entregados)} dispositivos")
 
     def crear_notificacion_revision(self, usuario_id, usuario_nombre, activo, fecha_limite):
         """Crear notificación de próxima revisión"""
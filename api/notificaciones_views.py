@@ -7,6 +7,7 @@ from django.utils import timezone
 from .models import NotificacionApp, DispositivoApp
 from .serializers import NotificacionAppSerializer, DispositivoRequestSerializer
 from .notification_service import NotificationService
+from . import bandeja_service, contadores_service
 
 class NotificacionesViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificacionAppSerializer
@@ -17,22 +18,51 @@ class NotificacionesViewSet(viewsets.ReadOnlyModelViewSet):
             usuario_id=self.request.user.id
         ).order_by('-fecha_creacion')
 
+    def _cursor(self, request):
+        try:
+            return max(int(request.query_params.get('since', 0)), 0)
+        except ValueError:
+            return None
+
     @action(detail=False, methods=['get'])
     def no_leidas(self, request):
-        notificaciones = self.get_queryset().filter(leida=False)
+        """No leídas del usuario; con ?since=<id> solo las posteriores a ese id"""
+        since = self._cursor(request)
+        if since is None:
+            return Response({'error': 'since debe ser un id entero'}, status=status.HTTP_400_BAD_REQUEST)
+        if 'since' in request.query_params:
+            notificaciones = bandeja_service.nuevas(request.user.id, since)
+        else:
+            notificaciones = self.get_queryset().filter(leida=False)
         serializer = self.get_serializer(notificaciones, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def esperar(self, request):
+        """
+        Long-poll: devuelve las no leídas con id > since en cuanto existan, o una lista
+        vacía tras ?timeout= segundos (máx. NOTIFICACIONES_LONG_POLL_MAX).
+        El cursor devuelto se envía como since en la siguiente llamada.
+        """
+        since = self._cursor(request)
+        if since is None:
+            return Response({'error': 'since debe ser un id entero'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            timeout = float(request.query_params.get('timeout', bandeja_service.TIMEOUT_MAXIMO))
+        except ValueError:
+            return Response({'error': 'timeout debe ser numérico'}, status=status.HTTP_400_BAD_REQUEST)
+
+        notificaciones = bandeja_service.esperar(request.user.id, since, timeout)
+        return Response({
+            'cursor': notificaciones[-1].id if notificaciones else since,
+            'notificaciones': self.get_serializer(notificaciones, many=True).data,
+        })
     
     @action(detail=False, methods=['get'])
     def conteo_no_leidas(self, request):
-        """Retorna el conteo de notificaciones no leídas para el usuario actual"""
-        conteo = NotificacionApp.objects.filter(
-            usuario_id=request.user.id,
-            leida=False
-        ).count()
-        
+        """Retorna el conteo de notificaciones no leídas para el usuario actual (contador en caché)"""
         return Response({
-            'conteo': conteo,
+            'conteo': contadores_service.conteo(request.user.id),
             'usuario_id': request.user.id,
             'usuario_nombre': request.user.get_full_name() or request.user.username
         })
@@ -46,9 +76,12 @@ class NotificacionesViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        notificacion.leida = True
-        notificacion.fecha_lectura = timezone.now()
-        notificacion.save()
+        # Update condicional: con dos peticiones simultáneas solo una descuenta
+        marcadas = NotificacionApp.objects.filter(pk=notificacion.pk, leida=False).update(
+            leida=True, fecha_lectura=timezone.now()
+        )
+        if marcadas == 1:
+            contadores_service.decrementar(request.user.id)
         
         return Response({'status': 'success'})
 
@@ -61,6 +94,7 @@ class NotificacionesViewSet(viewsets.ReadOnlyModelViewSet):
             leida=True,
             fecha_lectura=timezone.now()
         )
+        contadores_service.reiniciar(request.user.id)
         
         return Response({'status': 'success'})
 
@@ -1,17 +1,33 @@
 # services/notification_service.py
-from pyfcm import FCMNotification
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import F
 from datetime import timedelta
-from .models import NotificacionApp, DispositivoApp, OrdenMantenimiento, Evento, User, ResultadoInspeccion
+import random
+from .push_gateway import obtener_gateway
+from . import bandeja_service, contadores_service
+from .models import NotificacionApp, DispositivoApp, OrdenMantenimiento, Evento, User, ResultadoInspeccion, Motor, Variador
 import logging
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
+    TOKENS_POR_ENVIO = 500  # Límite de destinatarios por envío multicast de FCM
+    EQUIPOS_EN_RESUMEN = 10
+
+    # Reintentos: 5 min, 10 min, 20 min, 40 min (con jitter) y se abandona al 5º fallo
+    MAX_INTENTOS = 5
+    BACKOFF_BASE = timedelta(minutes=5)
+    BACKOFF_MAXIMO = timedelta(hours=6)
+    ERRORES_TOKEN_INVALIDO = {
+        'NotRegistered', 'InvalidRegistration', 'MismatchSenderId',  # API legacy
+        'UNREGISTERED', 'SENDER_ID_MISMATCH',                        # API HTTP v1
+    }
+
     def __init__(self):
-        # self.push_service = FCMNotification(api_key=settings.FCM_SERVER_KEY)
-        self.push_service = FCMNotification(settings.FCM_SERVER_KEY)
+        # Cliente FCM compartido por el proceso (pool de conexiones y envío concurrente)
+        self.push_service = obtener_gateway()
 
     
     def _crear_notificacion_db(self, usuario_id, titulo, mensaje, tipo, prioridad, data_adicional=None, relacion_id=None, relacion_tipo=None):
@@ -27,7 +43,7 @@ class NotificationService:
                 prioridad=prioridad,
                 data_adicional=data_adicional or {},
                 relacion_id=relacion_id,
-                relacion_tipo=relacion_tipo
+                relacion_tipo=relacion_tipo or ''
             )
             return notificacion
         except User.DoesNotExist:
@@ -37,56 +53,262 @@ class NotificationService:
             logger.error(f"Error creando notificación: {str(e)}")
             return None
     
+    @classmethod
+    def calcular_proximo_intento(cls, intentos, ahora=None):
+        """Backoff exponencial con jitter (50-100% del retardo); None si se agotaron los intentos"""
+        if intentos >= cls.MAX_INTENTOS:
+            return None
+        retardo = min(cls.BACKOFF_BASE * (2 ** max(intentos - 1, 0)), cls.BACKOFF_MAXIMO)
+        return (ahora or timezone.now()) + retardo * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _data_message(notificacion, incluir_id=True):
+        data = {
+            "tipo": notificacion.tipo,
+            "prioridad": notificacion.prioridad,
+            "titulo": notificacion.titulo,
+            "mensaje": notificacion.mensaje,
+            "relacion_id": str(notificacion.relacion_id) if notificacion.relacion_id else "",
+            "relacion_tipo": notificacion.relacion_tipo or "",
+            "timestamp": str(timezone.now().timestamp()),
+            **(notificacion.data_adicional or {})
+        }
+        if incluir_id:
+            data["notificacion_id"] = str(notificacion.id)
+        return data
+
+    @classmethod
+    def _analizar_respuesta(cls, tokens, respuesta):
+        """(tokens entregados, tokens inválidos) a partir de la respuesta multicast de FCM"""
+        resultados = respuesta.get('results') if isinstance(respuesta, dict) else None
+        if not resultados:
+            return list(tokens), []
+        entregados, invalidos = [], []
+        for token, resultado in zip(tokens, resultados):
+            error = resultado.get('error') if isinstance(resultado, dict) else None
+            if not error:
+                entregados.append(token)
+            elif error in cls.ERRORES_TOKEN_INVALIDO:
+                invalidos.append(token)
+            elif error == 'INVALID_ARGUMENT' and 'registration token' in resultado.get('detalle', ''):
+                # INVALID_ARGUMENT también cubre payloads mal formados: solo cuenta si apunta al token
+                invalidos.append(token)
+        return entregados, invalidos
+
+    def _enviar_multicast(self, tokens, titulo, mensaje, data_message):
+        """
+        Envía a los tokens en bloques; devuelve (tokens entregados, tokens inválidos).
+        Los tokens con errores transitorios no aparecen en ninguna de las dos listas.
+        Lanza la excepción del transporte si falla el envío completo.
+        """
+        entregados, invalidos = [], []
+        for inicio in range(0, len(tokens), self.TOKENS_POR_ENVIO):
+            bloque = tokens[inicio:inicio + self.TOKENS_POR_ENVIO]
+            respuesta = self.push_service.notify_multiple_devices(
+                registration_ids=bloque,
+                message_title=titulo,
+                message_body=mensaje,
+                data_message=data_message,
+                sound="default",
+                badge=1
+            )
+            ok, malos = self._analizar_respuesta(bloque, respuesta)
+            entregados.extend(ok)
+            invalidos.extend(malos)
+        return entregados, invalidos
+
+    @staticmethod
+    def _desactivar_tokens(tokens):
+        """Los tokens que FCM rechaza dejan de recibir envíos"""
+        if tokens:
+            # update() no aplica auto_now: la retención cuenta los días desde la desactivación
+            DispositivoApp.objects.filter(token_fcm__in=tokens).update(
+                esta_activo=False, ultima_actualizacion=timezone.now()
+            )
+            logger.warning(f"Desactivados {len(tokens)} dispositivos con token FCM inválido")
+
+    def _registrar_fallos(self, notificaciones, error):
+        ahora = timezone.now()
+        for notificacion in notificaciones:
+            notificacion.intentos_envio += 1
+            notificacion.error_envio = error
+            notificacion.proximo_intento = self.calcular_proximo_intento(notificacion.intentos_envio, ahora)
+        NotificacionApp.objects.bulk_update(notificaciones, ['intentos_envio', 'error_envio', 'proximo_intento'])
+
     def enviar_notificacion_individual(self, usuario_id, titulo, mensaje, tipo, prioridad='media', data_adicional=None, relacion_id=None, relacion_tipo=None):
         """Envía notificación a un usuario específico"""
         notificacion = self._crear_notificacion_db(usuario_id, titulo, mensaje, tipo, prioridad, data_adicional, relacion_id, relacion_tipo)
         if not notificacion:
             return False
         
-        dispositivos = DispositivoApp.objects.filter(usuario_id=usuario_id, esta_activo=True)
-        if not dispositivos.exists():
+        registration_ids = list(
+            DispositivoApp.objects.filter(usuario_id=usuario_id, esta_activo=True).values_list('token_fcm', flat=True)
+        )
+        if not registration_ids:
             logger.warning(f"Usuario {usuario_id} no tiene dispositivos activos")
             return False
         
-        registration_ids = [d.token_fcm for d in dispositivos]
-        
-        # Datos para la app
-        data_message = {
-            "tipo": tipo,
-            "prioridad": prioridad,
-            "notificacion_id": str(notificacion.id),
-            "titulo": titulo,
-            "mensaje": mensaje,
-            "relacion_id": str(relacion_id) if relacion_id else "",
-            "relacion_tipo": relacion_tipo or "",
-            "timestamp": str(timezone.now().timestamp()),
-            **(data_adicional or {})
-        }
-        
         try:
-            result = self.push_service.notify_multiple_devices(
-                registration_ids=registration_ids,
-                message_title=titulo,
-                message_body=mensaje,
-                data_message=data_message,
-                sound="default",
-                badge=1
+            entregados, invalidos = self._enviar_multicast(
+                registration_ids, titulo, mensaje, self._data_message(notificacion)
             )
-            
-            # Actualizar estado de envío
-            notificacion.enviada_push = True
-            notificacion.save()
-            
-            logger.info(f"Notificación enviada a usuario {usuario_id}: {titulo}")
-            return result
-            
         except Exception as e:
-            notificacion.intentos_envio += 1
-            notificacion.error_envio = str(e)
-            notificacion.save()
+            self._registrar_fallos([notificacion], str(e))
             logger.error(f"Error enviando notificación: {str(e)}")
             return False
-    
+
+        self._desactivar_tokens(invalidos)
+        if not entregados:
+            self._registrar_fallos([notificacion], "FCM rechazó todos los dispositivos")
+            return False
+
+        # Actualizar estado de envío
+        notificacion.enviada_push = True
+        notificacion.save(update_fields=['enviada_push'])
+        
+        logger.info(f"Notificación enviada a usuario {usuario_id}: {titulo}")
+        return True
+
+    def reintentar_fallidas(self, limite=500):
+        """
+        Reenvía las notificaciones cuyo próximo intento ya venció (índice parcial sobre
+        proximo_intento). Los tokens se cargan en una consulta y se agrupan por usuario;
+        un token rechazado se desactiva y no se vuelve a usar en la misma pasada.
+        """
+        ahora = timezone.now()
+        pendientes = list(
+            NotificacionApp.objects.filter(enviada_push=False, proximo_intento__lte=ahora)
+            .order_by('proximo_intento')[:limite]
+        )
+        if not pendientes:
+            return {'reintentadas': 0, 'enviadas': 0, 'tokens_invalidos': 0}
+
+        tokens = {}
+        for usuario_id, token in DispositivoApp.objects.filter(
+            usuario_id__in={n.usuario_id for n in pendientes}, esta_activo=True
+        ).values_list('usuario_id', 'token_fcm'):
+            tokens.setdefault(usuario_id, []).append(token)
+
+        enviadas, fallidas, sin_destino, invalidos_total = [], {}, [], []
+        for notificacion in pendientes:
+            vivos = tokens.get(notificacion.usuario_id)
+            if not vivos:
+                sin_destino.append(notificacion.pk)
+                continue
+            try:
+                entregados, invalidos = self._enviar_multicast(
+                    vivos, notificacion.titulo, notificacion.mensaje, self._data_message(notificacion)
+                )
+            except Exception as e:
+                fallidas.setdefault(str(e), []).append(notificacion)
+                continue
+            if invalidos:
+                invalidos_total.extend(invalidos)
+                tokens[notificacion.usuario_id] = [t for t in vivos if t not in invalidos]
+            if entregados:
+                enviadas.append(notificacion.pk)
+            else:
+                fallidas.setdefault("FCM rechazó todos los dispositivos", []).append(notificacion)
+
+        self._desactivar_tokens(invalidos_total)
+        NotificacionApp.objects.filter(pk__in=enviadas).update(enviada_push=True, proximo_intento=None, error_envio='')
+        NotificacionApp.objects.filter(pk__in=sin_destino).update(proximo_intento=None, error_envio='Sin dispositivos activos')
+        for error, notificaciones in fallidas.items():
+            self._registrar_fallos(notificaciones, error)
+
+        resumen = {'reintentadas': len(pendientes), 'enviadas': len(enviadas), 'tokens_invalidos': len(invalidos_total)}
+        logger.info(f"Reintento de notificaciones: {resumen}")
+        return resumen
+
+    def enviar_notificacion_masiva(self, usuarios, titulo, mensaje, tipo, prioridad='media', data_adicional=None, relacion_tipo=None):
+        """
+        Envía el mismo mensaje a varios usuarios: un bulk_create de NotificacionApp,
+        una consulta de dispositivos y un envío FCM por cada bloque de tokens.
+        """
+        usuarios = list(usuarios)
+        if not usuarios:
+            return 0
+
+        notificaciones = NotificacionApp.objects.bulk_create([
+            NotificacionApp(
+                usuario_id=usuario.id,
+                usuario_nombre=usuario.get_full_name() or usuario.username,
+                titulo=titulo,
+                mensaje=mensaje,
+                tipo=tipo,
+                prioridad=prioridad,
+                data_adicional=data_adicional or {},
+                relacion_tipo=relacion_tipo or ''
+            )
+            for usuario in usuarios
+        ])
+        # bulk_create no dispara post_save: contador y long-poll se actualizan aquí
+        def contar_y_publicar():
+            for usuario in usuarios:
+                contadores_service.incrementar(usuario.id)
+            bandeja_service.publicar([u.id for u in usuarios])
+        transaction.on_commit(contar_y_publicar)
+
+        usuario_por_token = dict(DispositivoApp.objects.filter(
+            usuario_id__in=[u.id for u in usuarios], esta_activo=True
+        ).values_list('token_fcm', 'usuario_id'))
+        if not usuario_por_token:
+            logger.warning(f"Ningún destinatario de '{titulo}' tiene dispositivos activos")
+            return 0
+
+        con_dispositivo = [n for n in notificaciones if n.usuario_id in usuario_por_token.values()]
+
+        try:
+            entregados, invalidos = self._enviar_multicast(
+                list(usuario_por_token), titulo, mensaje, self._data_message(notificaciones[0], incluir_id=False)
+            )
+        except Exception as e:
+            self._registrar_fallos(con_dispositivo, str(e))
+            logger.error(f"Error enviando notificación masiva: {str(e)}")
+            return 0
+
+        self._desactivar_tokens(invalidos)
+        # Solo cuenta como enviada si al menos un dispositivo del usuario la recibió;
+        # el resto entra en la cola de reintentos igual que un envío individual
+        recibieron = {usuario_por_token[token] for token in entregados}
+        enviadas = [n for n in con_dispositivo if n.usuario_id in recibieron]
+        fallidas = [n for n in con_dispositivo if n.usuario_id not in recibieron]
+        NotificacionApp.objects.filter(pk__in=[n.pk for n in enviadas]).update(enviada_push=True)
+        if fallidas:
+            self._registrar_fallos(fallidas, "FCM rechazó todos los dispositivos")
+
+        logger.info(f"Notificación '{titulo}' enviada a {len(enviadas)} usuarios ({len(entregados)} dispositivos)")
+        return len(enviadas)
+
+    def notificar_resumen_preventivo(self, equipos, dias_ventana=7):
+        """
+        Un único resumen por técnico con todos los equipos por vencer.
+        `equipos`: [{'equipo_tipo', 'equipo_id', 'codigo', 'dias_restantes'}] ordenados por vencimiento.
+        """
+        if not equipos:
+            return 0
+
+        def plazo(dias):
+            return "hoy" if dias == 0 else "mañana" if dias == 1 else f"{dias} días"
+
+        detalle = ', '.join(f"{e['codigo']} ({plazo(e['dias_restantes'])})" for e in equipos[:self.EQUIPOS_EN_RESUMEN])
+        if len(equipos) > self.EQUIPOS_EN_RESUMEN:
+            detalle += f" y {len(equipos) - self.EQUIPOS_EN_RESUMEN} más"
+        urgente = min(e['dias_restantes'] for e in equipos) <= 3
+
+        return self.enviar_notificacion_masiva(
+            User.objects.filter(role='tecnico', is_active=True),
+            titulo="🛠️ Mantenimiento Preventivo",
+            mensaje=f"{len(equipos)} equipo(s) con mantenimiento en los próximos {dias_ventana} días: {detalle}",
+            tipo="mantenimiento",
+            prioridad="alta" if urgente else "media",
+            data_adicional={
+                "equipos": ','.join(f"{e['equipo_tipo']}:{e['equipo_id']}" for e in equipos),
+                "cantidad": str(len(equipos)),
+            },
+            relacion_tipo="mantenimiento_preventivo"
+        )
+
     def notificar_nueva_orden(self, orden_id):
         """Notifica nueva orden de trabajo"""
         try:
@@ -121,6 +343,23 @@ class NotificationService:
             logger.error(f"Orden {orden_id} no existe")
             return False
     
+    def notificar_asignacion_lote(self, usuario_id, orden_ids):
+        """Notifica en un solo mensaje las órdenes asignadas automáticamente a un técnico"""
+        if len(orden_ids) == 1:
+            return self.notificar_nueva_orden(orden_ids[0])
+
+        ordenes = OrdenMantenimiento.objects.filter(id__in=orden_ids).order_by('id')
+        criticas = sum(1 for orden in ordenes if orden.prioridad in ('alta', 'critica'))
+        return self.enviar_notificacion_individual(
+            usuario_id=usuario_id,
+            titulo="📋 Nuevas Órdenes de Trabajo",
+            mensaje=f"Se te asignaron {len(orden_ids)} órdenes" + (f" ({criticas} de prioridad alta)" if criticas else ""),
+            tipo="orden_trabajo",
+            prioridad="alta" if criticas else "media",
+            data_adicional={"ordenes": ','.join(str(orden.id) for orden in ordenes)},
+            relacion_tipo="orden"
+        )
+
     def notificar_cambio_estado_orden(self, orden_id, usuario_cambio_id):
         """Notifica cambio de estado de orden"""
         try:
@@ -217,7 +456,71 @@ class NotificationService:
         except ResultadoInspeccion.DoesNotExist:
             logger.error(f"ResultadoInspeccion {resultado_inspeccion_id} no existe")
             return False
-    
+
+    def notificar_alertas_ejecucion(self, ejecucion_id, alertas):
+        """Notifica en un único mensaje todas las alertas de una ejecución cargada en lote"""
+        from .models import InspeccionEjecucion
+
+        try:
+            ejecucion = InspeccionEjecucion.objects.select_related('ruta', 'tecnico').get(id=ejecucion_id)
+        except InspeccionEjecucion.DoesNotExist:
+            logger.error(f"InspeccionEjecucion {ejecucion_id} no existe")
+            return False
+
+        severidades = {a['severidad'] for a in alertas}
+        prioridad = 'critica' if 'crítico' in severidades else 'alta' if 'moderado' in severidades else 'media'
+        titulo = "⚠️ Alerta de Inspección"
+        mensaje = f"{ejecucion.ruta.nombre}: {len(alertas)} variable(s) fuera de rango - " + ', '.join(
+            f"{a['variable']} {a['valor_medido']}" for a in alertas
+        )
+        data_adicional = {
+            "ejecucion_id": str(ejecucion.id),
+            "variables": ', '.join(a['variable'] for a in alertas),
+        }
+
+        destinatarios = list(User.objects.filter(role='supervisor', is_active=True).values_list('id', flat=True))
+        if ejecucion.tecnico_id and ejecucion.tecnico_id not in destinatarios:
+            destinatarios.insert(0, ejecucion.tecnico_id)
+
+        tecnico = ejecucion.tecnico.get_full_name() if ejecucion.tecnico else ''
+        for usuario_id in destinatarios:
+            self.enviar_notificacion_individual(
+                usuario_id=usuario_id,
+                titulo=titulo,
+                mensaje=mensaje if usuario_id == ejecucion.tecnico_id else f"{mensaje} - Reportado por: {tecnico}",
+                tipo="alerta_inspeccion",
+                prioridad=prioridad,
+                data_adicional=data_adicional,
+                relacion_id=ejecucion.ruta.activo_id,
+                relacion_tipo=ejecucion.ruta.activo_tipo
+            )
+        return True
+
+    def notificar_anomalia_produccion(self, linea_id, descripcion, alertas, supervisor_id=None):
+        """Notifica caída o detención de producción detectada en tiempo real"""
+        detencion = any(a['tipo'] == 'detencion' for a in alertas)
+        titulo = "⛔ Línea Detenida" if detencion else "📉 Caída de Producción"
+
+        destinatarios = list(User.objects.filter(role='supervisor', is_active=True).values_list('id', flat=True))
+        if supervisor_id and supervisor_id not in destinatarios:
+            destinatarios.insert(0, supervisor_id)
+
+        for usuario_id in destinatarios:
+            self.enviar_notificacion_individual(
+                usuario_id=usuario_id,
+                titulo=titulo,
+                mensaje=descripcion,
+                tipo="anomalia_produccion",
+                prioridad="alta" if detencion else "media",
+                data_adicional={
+                    "linea_id": str(linea_id),
+                    "metricas": ', '.join(a['metrica'] for a in alertas),
+                },
+                relacion_id=linea_id,
+                relacion_tipo="linea"
+            )
+        return True
+
     def notificar_mantenimiento_preventivo(self, equipo_tipo, equipo_id, dias_restantes):
         """Notifica mantenimiento preventivo próximo"""
         try:
@@ -0,0 +1,238 @@
+# api/oee_service.py
+"""
+Motor de OEE (Disponibilidad × Rendimiento × Calidad) por línea, turno y día.
+
+Carga ProduccionTurno, ParadaTurno y FallaTurno con una consulta cada una para
+el rango pedido y calcula los componentes con group-bys de pandas.
+
+Definiciones usadas:
+- tiempo_turno: duración del Turno (hora_inicio → hora_fin, admite cruce de medianoche)
+- tiempo_planificado: tiempo_turno - paradas programadas
+- tiempo_operativo: tiempo_planificado - paradas no programadas
+- disponibilidad = tiempo_operativo / tiempo_planificado
+- rendimiento = cantidad / (meta_produccion * tiempo_operativo / tiempo_planificado)
+- calidad = (cantidad - rechazos) / cantidad, con rechazos = FallaTurno tipo 'calidad'
+- oee = disponibilidad * rendimiento * calidad  (equivale a piezas buenas / meta)
+"""
+from datetime import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.conf import settings
+
+from .models import ProduccionTurno, ParadaTurno, FallaTurno, Turno, LineaProduccion
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION_KEY = 'kpi:oee:version'
+CACHE_PREFIX = 'kpi:oee'
+
+CLAVE = ['fecha', 'linea_id', 'turno_id']
+
+
+def minutos_turno(hora_inicio, hora_fin):
+    """Duración del turno en minutos (soporta turnos nocturnos)"""
+    inicio = hora_inicio.hour * 60 + hora_inicio.minute
+    fin = hora_fin.hour * 60 + hora_fin.minute
+    duracion = fin - inicio
+    if duracion <= 0:
+        duracion += 24 * 60
+    return duracion
+
+
+def cargar_datos(fecha_desde, fecha_hasta, linea_id=None):
+    """Carga las tres tablas de hechos del rango (una consulta por tabla)"""
+    filtros = {'fecha__range': (fecha_desde, fecha_hasta)}
+    if linea_id:
+        filtros['linea_id'] = linea_id
+
+    produccion = pd.DataFrame.from_records(
+        ProduccionTurno.objects.filter(**filtros).values_list(
+            'fecha', 'linea_id', 'turno_id', 'cantidad', 'meta_produccion'
+        ).iterator(),
+        columns=CLAVE + ['cantidad', 'meta_produccion'],
+    )
+    paradas = pd.DataFrame.from_records(
+        ParadaTurno.objects.filter(**filtros).values_list(
+            'fecha', 'linea_id', 'turno_id', 'tipo', 'duracion_minutos'
+        ).iterator(),
+        columns=CLAVE + ['tipo', 'duracion_minutos'],
+    )
+    fallas = pd.DataFrame.from_records(
+        FallaTurno.objects.filter(tipo='calidad', **filtros).values_list(
+            'fecha', 'linea_id', 'turno_id', 'cantidad'
+        ).iterator(),
+        columns=CLAVE + ['rechazos'],
+    )
+    return produccion, paradas, fallas
+
+
+def calcular_detalle(produccion, paradas, fallas, minutos_por_turno):
+    """
+    Calcula los componentes de OEE por (fecha, linea, turno).
+
+    `minutos_por_turno` es un dict {turno_id: minutos}. Solo se consideran los
+    turnos con registro de producción (turnos efectivamente planificados).
+    """
+    columnas = CLAVE + [
+        'tiempo_planificado', 'tiempo_operativo', 'cantidad', 'meta_ajustada',
+        'rechazos', 'disponibilidad', 'rendimiento', 'calidad', 'oee',
+    ]
+    if produccion.empty:
+        return pd.DataFrame(columns=columnas)
+
+    # Producción: puede haber un solo registro por clave (unique_together)
+    df = produccion.groupby(CLAVE, sort=False).agg(
+        cantidad=('cantidad', 'sum'),
+        meta_produccion=('meta_produccion', 'sum'),
+    )
+
+    # Paradas separadas por tipo en una sola pasada (pivot sobre 'tipo')
+    if not paradas.empty:
+        por_tipo = paradas.pivot_table(
+            index=CLAVE, columns='tipo', values='duracion_minutos',
+            aggfunc='sum', fill_value=0,
+        )
+        df = df.join(por_tipo.reindex(columns=['programada', 'no_programada'], fill_value=0))
+    else:
+        df['programada'] = 0
+        df['no_programada'] = 0
+    df[['programada', 'no_programada']] = df[['programada', 'no_programada']].fillna(0)
+
+    if not fallas.empty:
+        df = df.join(fallas.groupby(CLAVE).agg(rechazos=('rechazos', 'sum')))
+    else:
+        df['rechazos'] = 0
+    df['rechazos'] = df['rechazos'].fillna(0)
+
+    df = df.reset_index()
+
+    tiempo_turno = df['turno_id'].map(minutos_por_turno).astype(float).to_numpy()
+    programada = df['programada'].to_numpy(dtype=float)
+    no_programada = df['no_programada'].to_numpy(dtype=float)
+    cantidad = df['cantidad'].to_numpy(dtype=float)
+    meta = df['meta_produccion'].to_numpy(dtype=float)
+    meta[meta <= 0] = np.nan
+    rechazos = np.minimum(df['rechazos'].to_numpy(dtype=float), cantidad)
+
+    planificado = np.clip(tiempo_turno - programada, 0, None)
+    operativo = np.clip(planificado - no_programada, 0, None)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disponibilidad = np.where(planificado > 0, operativo / planificado, np.nan)
+        meta_ajustada = meta * disponibilidad
+        rendimiento = np.where(meta_ajustada > 0, cantidad / meta_ajustada, np.nan)
+        calidad = np.where(cantidad > 0, (cantidad - rechazos) / cantidad, np.nan)
+
+    df['tiempo_planificado'] = planificado
+    df['tiempo_operativo'] = operativo
+    df['meta_ajustada'] = meta_ajustada
+    df['rechazos'] = rechazos
+    df['disponibilidad'] = disponibilidad
+    df['rendimiento'] = rendimiento
+    df['calidad'] = calidad
+    df['oee'] = disponibilidad * rendimiento * calidad
+
+    return df[columnas].sort_values(CLAVE, ignore_index=True)
+
+
+def agregar(detalle, por=None):
+    """
+    Agrega el detalle recalculando los ratios a partir de los totales
+    (no promedia ratios, que sesgaría hacia los turnos cortos).
+    """
+    sumas = ['tiempo_planificado', 'tiempo_operativo', 'cantidad', 'meta_ajustada', 'rechazos']
+    if por:
+        totales = detalle.groupby(por, sort=True)[sumas].sum(min_count=1).reset_index()
+    else:
+        totales = detalle[sumas].sum(min_count=1).to_frame().T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        planificado = totales['tiempo_planificado'].to_numpy(dtype=float)
+        operativo = totales['tiempo_operativo'].to_numpy(dtype=float)
+        cantidad = totales['cantidad'].to_numpy(dtype=float)
+        meta_ajustada = totales['meta_ajustada'].to_numpy(dtype=float)
+        rechazos = totales['rechazos'].to_numpy(dtype=float)
+
+        totales['disponibilidad'] = np.where(planificado > 0, operativo / planificado, np.nan)
+        totales['rendimiento'] = np.where(meta_ajustada > 0, cantidad / meta_ajustada, np.nan)
+        totales['calidad'] = np.where(cantidad > 0, (cantidad - rechazos) / cantidad, np.nan)
+    totales['oee'] = totales['disponibilidad'] * totales['rendimiento'] * totales['calidad']
+    return totales
+
+
+def _a_registros(df, nombres_linea, nombres_turno):
+    """Convierte un DataFrame en lista de dicts JSON-serializable"""
+    if df.empty:
+        return []
+    df = df.copy()
+    if 'linea_id' in df:
+        df['linea_nombre'] = df['linea_id'].map(nombres_linea)
+    if 'turno_id' in df:
+        df['turno_nombre'] = df['turno_id'].map(nombres_turno)
+    if 'fecha' in df:
+        df['fecha'] = df['fecha'].map(lambda f: f.isoformat())
+    flotantes = df.select_dtypes(include='number').columns.difference(['linea_id', 'turno_id'])
+    df[flotantes] = df[flotantes].astype(float).round(4)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def calcular_oee(fecha_desde, fecha_hasta, linea_id=None):
+    """Calcula detalle, resumen por línea y global para el rango"""
+    produccion, paradas, fallas = cargar_datos(fecha_desde, fecha_hasta, linea_id)
+
+    minutos_por_turno = {
+        pk: minutos_turno(inicio, fin)
+        for pk, inicio, fin in Turno.objects.values_list('id', 'hora_inicio', 'hora_fin')
+    }
+    nombres_turno = dict(Turno.objects.values_list('id', 'nombre'))
+    nombres_linea = dict(LineaProduccion.objects.values_list('id', 'nombre'))
+
+    detalle = calcular_detalle(produccion, paradas, fallas, minutos_por_turno)
+    global_ = _a_registros(agregar(detalle), {}, {}) if not detalle.empty else []
+
+    return {
+        'fecha_desde': fecha_desde.isoformat(),
+        'fecha_hasta': fecha_hasta.isoformat(),
+        'global': global_[0] if global_ else None,
+        'por_linea': _a_registros(agregar(detalle, ['linea_id']), nombres_linea, nombres_turno),
+        'por_turno': _a_registros(agregar(detalle, ['linea_id', 'turno_id']), nombres_linea, nombres_turno),
+        'detalle': _a_registros(detalle, nombres_linea, nombres_turno),
+    }
+
+
+# ==================== CACHÉ ====================
+
+def _version_cache():
+    version = cache.get(CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(CACHE_VERSION_KEY, 1, None)
+        version = cache.get(CACHE_VERSION_KEY, 1)
+    return version
+
+
+def invalidar_cache_oee():
+    """Invalida los resultados cacheados incrementando la versión"""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, None)
+    except Exception as e:
+        logger.warning(f"No se pudo invalidar caché de OEE: {e}")
+
+
+def obtener_oee(fecha_desde, fecha_hasta, linea_id=None):
+    """Devuelve el OEE del rango desde caché o lo calcula"""
+    if isinstance(fecha_desde, datetime):
+        fecha_desde = fecha_desde.date()
+    if isinstance(fecha_hasta, datetime):
+        fecha_hasta = fecha_hasta.date()
+
+    clave = f"{CACHE_PREFIX}:{_version_cache()}:{fecha_desde}:{fecha_hasta}:{linea_id or 'all'}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular_oee(fecha_desde, fecha_hasta, linea_id)
+        cache.set(clave, resultado, getattr(settings, 'CACHE_TTL', 60 * 15))
+    return resultado
@@ -0,0 +1,22 @@
+# api/parsers.py
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser sobre orjson (rechaza NaN/Infinity igual que el parser estricto de DRF)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            contenido = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                contenido = contenido.decode(encoding)
+            return orjson.loads(contenido)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
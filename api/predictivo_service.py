@@ -0,0 +1,147 @@
+# api/predictivo_service.py
+"""
+Motor de mantenimiento predictivo sobre ResultadoInspeccion.
+
+Reemplaza al comando correr_predictivo de la raíz (importaba la app inexistente
+`inspecciones` y filtraba el DataFrame y consultaba la variable una vez por
+variable):
+
+- El modelo (pickle con .predict, -1 = anomalía) se carga una vez por worker y
+  solo se vuelve a leer si cambia el archivo.
+- La ventana se carga con una consulta, se puntúa con un único predict sobre
+  todas las lecturas y se agrega con un groupby por variable.
+- Solo se recalculan las variables con resultados nuevos desde su último
+  puntaje (EstadisticaVariable.actualizado > PrediccionVariable.actualizado);
+  la pasada completa diaria cubre las lecturas que salen de la ventana.
+- Los Evento se crean con bulk_create y solo al entrar en alerta, no en cada
+  pasada mientras la variable sigue sobre el umbral.
+"""
+from datetime import timedelta
+import logging
+import os
+import pickle
+import threading
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ResultadoInspeccion, VariableInspeccion, PrediccionVariable, Evento
+
+logger = logging.getLogger(__name__)
+
+MODELO_PATH = getattr(settings, 'MODELO_PREDICTIVO_PATH', settings.BASE_DIR / 'modelo_predictivo.pkl')
+VENTANA_DIAS = getattr(settings, 'PREDICTIVO_VENTANA_DIAS', 30)
+UMBRAL = getattr(settings, 'PREDICTIVO_UMBRAL', 0.3)
+MIN_MUESTRAS = 5
+
+_modelo = {'mtime': None, 'instancia': None}
+_modelo_lock = threading.Lock()
+
+
+def cargar_modelo(path=MODELO_PATH):
+    """Modelo deserializado, cacheado por proceso e invalidado por mtime del archivo"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        logger.warning(f"Modelo predictivo no encontrado en {path}")
+        return None
+
+    with _modelo_lock:
+        if _modelo['mtime'] != mtime:
+            with open(path, 'rb') as f:
+                _modelo['instancia'] = pickle.load(f)
+            _modelo['mtime'] = mtime
+            logger.info(f"Modelo predictivo cargado desde {path}")
+        return _modelo['instancia']
+
+
+def puntuar(df, modelo):
+    """
+    Puntúa todas las lecturas en una sola llamada a predict y agrega por variable.
+    Devuelve un DataFrame indexado por variable_id con muestras, anomalias y score
+    (NaN si no alcanza MIN_MUESTRAS).
+    """
+    anomalas = modelo.predict(df[['valor_medido']].to_numpy(dtype=float)) == -1
+    resumen = df.assign(anomala=anomalas).groupby('variable_id')['anomala'].agg(
+        muestras='size', anomalias='sum'
+    )
+    resumen['score'] = (resumen['anomalias'] / resumen['muestras']).where(resumen['muestras'] >= MIN_MUESTRAS)
+    return resumen
+
+
+def _variables_pendientes():
+    return list(
+        VariableInspeccion.objects.filter(estadistica__isnull=False).filter(
+            Q(prediccion__isnull=True) | Q(estadistica__actualizado__gt=F('prediccion__actualizado'))
+        ).values_list('id', flat=True)
+    )
+
+
+def ejecutar_prediccion(completo=False, variable_ids=None, modelo=None):
+    """
+    Recalcula PrediccionVariable y genera los Evento de las variables que pasan el
+    umbral. Devuelve {'variables': n, 'alertas': n}.
+    """
+    modelo = modelo or cargar_modelo()
+    if modelo is None:
+        return {'variables': 0, 'alertas': 0}
+
+    if variable_ids is None and not completo:
+        variable_ids = _variables_pendientes()
+        if not variable_ids:
+            return {'variables': 0, 'alertas': 0}
+
+    marca = timezone.now()
+    qs = ResultadoInspeccion.objects.filter(fecha__gte=marca - timedelta(days=VENTANA_DIAS))
+    if variable_ids is not None:
+        qs = qs.filter(variable_id__in=variable_ids)
+
+    df = pd.DataFrame.from_records(qs.values_list('variable_id', 'valor_medido'), columns=['variable_id', 'valor_medido'])
+    resumen = puntuar(df, modelo) if not df.empty else pd.DataFrame(columns=['muestras', 'anomalias', 'score'])
+
+    if variable_ids is None:
+        variable_ids = list(VariableInspeccion.objects.values_list('id', flat=True))
+    variables = VariableInspeccion.objects.select_related('ruta').in_bulk(variable_ids)
+    previas = PrediccionVariable.objects.in_bulk(variable_ids)
+
+    predicciones, eventos = [], []
+    for variable_id, variable in variables.items():
+        if variable_id in resumen.index:
+            fila = resumen.loc[variable_id]
+            muestras, anomalias = int(fila['muestras']), int(fila['anomalias'])
+            score = None if pd.isna(fila['score']) else float(fila['score'])
+        else:
+            muestras, anomalias, score = 0, 0, None
+
+        en_alerta = score is not None and score > UMBRAL
+        previa = previas.get(variable_id)
+        if en_alerta and not (previa and previa.en_alerta):
+            eventos.append(Evento(
+                tipo=variable.ruta.activo_tipo,
+                descripcion=(
+                    f"Alerta IA: Variable '{variable.nombre}' muestra {score * 100:.1f}% riesgo de anomalía "
+                    f"({anomalias}/{muestras} lecturas en {VENTANA_DIAS} días)."
+                ),
+                usuario=None,
+                objeto_id=variable.ruta.activo_id,
+            ))
+        predicciones.append(PrediccionVariable(
+            variable_id=variable_id, muestras=muestras, anomalias=anomalias,
+            score=score, en_alerta=en_alerta, actualizado=marca,
+        ))
+
+    with transaction.atomic():
+        PrediccionVariable.objects.bulk_create(
+            predicciones,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['variable'],
+            update_fields=['muestras', 'anomalias', 'score', 'en_alerta', 'actualizado'],
+        )
+        Evento.objects.bulk_create(eventos, batch_size=500)
+
+    logger.info(f"Predicción: {len(predicciones)} variables puntuadas, {len(eventos)} alertas nuevas")
+    return {'variables': len(predicciones), 'alertas': len(eventos)}
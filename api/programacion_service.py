@@ -0,0 +1,213 @@
+# api/programacion_service.py
+"""
+Programación de mantenimiento preventivo por planes (PlanMantenimiento).
+
+Cada plan aplica a una clase de equipo (motor / variador) y vence por
+calendario (intervalo_dias desde el último mantenimiento o la instalación),
+por horas de uso (intervalo_horas desde horas_ultimo_mantenimiento, proyectado
+a fecha con horas_uso_diarias) o por lo que ocurra primero.
+
+VencimientoMantenimiento es el índice (plan, equipo) → fecha. Se actualiza al
+guardar cada equipo, y generar_ordenes_preventivas crea en bloque las órdenes
+de todo lo que entra en su ventana de anticipación con una sola consulta por
+rango sobre el índice parcial de vencimientos sin orden.
+"""
+from datetime import timedelta
+import logging
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    PlanMantenimiento, VencimientoMantenimiento, OrdenMantenimiento, HistorialMantenimiento, Motor, Variador,
+)
+
+logger = logging.getLogger(__name__)
+
+MODELOS_EQUIPO = {'motor': Motor, 'variador': Variador}
+
+
+def calcular_vencimiento(plan, equipo, hoy=None):
+    """(fecha_vencimiento, horas_vencimiento) del equipo para el plan"""
+    hoy = hoy or timezone.localdate()
+    fechas = []
+
+    if plan.intervalo_dias:
+        if equipo.ultimo_mantenimiento:
+            fechas.append(equipo.ultimo_mantenimiento + timedelta(days=plan.intervalo_dias))
+        elif equipo.fecha_instalacion:
+            dias = plan.dias_primer_mantenimiento or plan.intervalo_dias
+            fechas.append(equipo.fecha_instalacion + timedelta(days=dias))
+
+    horas_vencimiento = None
+    if plan.intervalo_horas:
+        horas_vencimiento = equipo.horas_ultimo_mantenimiento + plan.intervalo_horas
+        restantes = max(horas_vencimiento - equipo.horas_uso, 0)
+        fechas.append(hoy + timedelta(days=math.ceil(restantes / plan.horas_uso_diarias)))
+
+    return (min(fechas) if fechas else None), horas_vencimiento
+
+
+def vencimientos_equipo(equipo, hoy=None):
+    """[(plan, fecha, horas)] de los planes activos de la clase del equipo"""
+    planes = PlanMantenimiento.objects.filter(equipo_tipo=equipo.EQUIPO_TIPO, activo=True)
+    return [(plan, *calcular_vencimiento(plan, equipo, hoy)) for plan in planes]
+
+
+def _fila(plan, equipo_tipo, equipo_id, fecha, horas):
+    return VencimientoMantenimiento(
+        plan=plan,
+        equipo_tipo=equipo_tipo,
+        equipo_id=equipo_id,
+        fecha_vencimiento=fecha,
+        fecha_generacion=fecha - timedelta(days=plan.anticipacion_dias),
+        horas_vencimiento=horas,
+    )
+
+
+def _guardar_filas(filas):
+    VencimientoMantenimiento.objects.bulk_create(
+        filas,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['plan', 'equipo_tipo', 'equipo_id'],
+        update_fields=['fecha_vencimiento', 'fecha_generacion', 'horas_vencimiento', 'actualizado'],
+    )
+
+
+def sincronizar_equipo(equipo):
+    """Actualiza las filas del índice de un equipo (usa los vencimientos calculados en save)"""
+    pendientes = VencimientoMantenimiento.objects.filter(
+        equipo_tipo=equipo.EQUIPO_TIPO, equipo_id=equipo.pk, orden__isnull=True
+    )
+    if equipo.estado != 'operativo':
+        pendientes.delete()
+        return
+
+    vencimientos = getattr(equipo, '_vencimientos', None)
+    if vencimientos is None:
+        vencimientos = vencimientos_equipo(equipo)
+    filas = [_fila(plan, equipo.EQUIPO_TIPO, equipo.pk, fecha, horas) for plan, fecha, horas in vencimientos if fecha]
+    pendientes.exclude(plan_id__in=[fila.plan_id for fila in filas]).delete()
+    _guardar_filas(filas)
+
+
+def reconstruir_indice(hoy=None):
+    """Recalcula el índice completo: planes activos × equipos operativos de su clase"""
+    hoy = hoy or timezone.localdate()
+    planes = list(PlanMantenimiento.objects.filter(activo=True))
+    filas = []
+    for equipo_tipo, modelo in MODELOS_EQUIPO.items():
+        planes_clase = [plan for plan in planes if plan.equipo_tipo == equipo_tipo]
+        if not planes_clase:
+            continue
+        equipos = modelo.objects.filter(estado='operativo').only(
+            'id', 'estado', 'fecha_instalacion', 'ultimo_mantenimiento', 'horas_uso', 'horas_ultimo_mantenimiento'
+        )
+        for equipo in equipos.iterator():
+            for plan in planes_clase:
+                fecha, horas = calcular_vencimiento(plan, equipo, hoy)
+                if fecha:
+                    filas.append(_fila(plan, equipo_tipo, equipo.pk, fecha, horas))
+
+    with transaction.atomic():
+        VencimientoMantenimiento.objects.filter(orden__isnull=True).delete()
+        _guardar_filas(filas)
+    logger.info(f"Índice de vencimientos reconstruido: {len(filas)} filas")
+    return len(filas)
+
+
+def generar_ordenes_preventivas(hoy=None, creado_por=None):
+    """Crea en bloque las órdenes de los vencimientos que entraron en su ventana de anticipación"""
+    from . import busqueda_service
+
+    hoy = hoy or timezone.localdate()
+    with transaction.atomic():
+        vencimientos = list(
+            VencimientoMantenimiento.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(orden__isnull=True, fecha_generacion__lte=hoy, plan__activo=True)
+            .select_related('plan')
+            .order_by('fecha_vencimiento')
+        )
+        if not vencimientos:
+            return 0
+
+        codigos = {}
+        for equipo_tipo, modelo in MODELOS_EQUIPO.items():
+            ids = [v.equipo_id for v in vencimientos if v.equipo_tipo == equipo_tipo]
+            if ids:
+                codigos[equipo_tipo] = dict(modelo.objects.filter(pk__in=ids).values_list('id', 'codigo'))
+
+        ordenes = []
+        for vencimiento in vencimientos:
+            plan = vencimiento.plan
+            codigo = codigos.get(vencimiento.equipo_tipo, {}).get(vencimiento.equipo_id, vencimiento.equipo_id)
+            detalle = f"Vence el {vencimiento.fecha_vencimiento:%d/%m/%Y}"
+            if vencimiento.horas_vencimiento is not None:
+                detalle += f" o a las {vencimiento.horas_vencimiento} horas de uso"
+            ordenes.append(OrdenMantenimiento(
+                titulo=f"{plan.nombre} - {codigo}"[:100],
+                descripcion=f"Mantenimiento preventivo del plan '{plan.nombre}' para {vencimiento.equipo_tipo} {codigo}. {detalle}.",
+                tipo='preventivo',
+                prioridad=plan.prioridad,
+                estado='pendiente',
+                tiempo_estimado=plan.tiempo_estimado,
+                checklist=plan.checklist,
+                creado_por=creado_por,
+            ))
+        OrdenMantenimiento.objects.bulk_create(ordenes, batch_size=500)
+
+        relaciones = {'motor': [], 'variador': []}
+        historial = []
+        for vencimiento, orden in zip(vencimientos, ordenes):
+            vencimiento.orden = orden
+            if vencimiento.equipo_tipo == 'motor':
+                relaciones['motor'].append(
+                    OrdenMantenimiento.motores.through(ordenmantenimiento_id=orden.pk, motor_id=vencimiento.equipo_id)
+                )
+            else:
+                relaciones['variador'].append(
+                    OrdenMantenimiento.variadores.through(ordenmantenimiento_id=orden.pk, variador_id=vencimiento.equipo_id)
+                )
+            historial.append(HistorialMantenimiento(
+                equipo_tipo=vencimiento.equipo_tipo,
+                equipo_id=vencimiento.equipo_id,
+                tipo_evento='mantenimiento',
+                descripcion=f"Orden de mantenimiento creada: {orden.titulo}",
+                usuario=creado_por,
+                orden=orden,
+            ))
+        OrdenMantenimiento.motores.through.objects.bulk_create(relaciones['motor'], batch_size=1000)
+        OrdenMantenimiento.variadores.through.objects.bulk_create(relaciones['variador'], batch_size=1000)
+        HistorialMantenimiento.objects.bulk_create(historial, batch_size=1000)
+        VencimientoMantenimiento.objects.bulk_update(vencimientos, ['orden'], batch_size=1000)
+
+        # bulk_create no dispara post_save: se indexan las órdenes para la búsqueda global
+        busqueda_service.indexar_queryset('orden', OrdenMantenimiento.objects.filter(pk__in=[o.pk for o in ordenes]))
+
+    if getattr(settings, 'ASIGNACION_AUTOMATICA_ORDENES', False):
+        from .asignacion_service import asignar_ordenes
+        asignar_ordenes([o.pk for o in ordenes], usuario=creado_por)
+
+    logger.info(f"Órdenes preventivas generadas: {len(ordenes)}")
+    return len(ordenes)
+
+
+def registrar_mantenimiento_realizado(orden):
+    """Al completar una orden preventiva reinicia calendario y horas de sus equipos"""
+    fecha = timezone.localdate(orden.fecha_cierre) if orden.fecha_cierre else timezone.localdate()
+    vencimientos = list(orden.vencimientos_preventivos.all())
+    if not vencimientos:
+        return
+    # Se liberan las filas para que el guardado de cada equipo las recalcule
+    orden.vencimientos_preventivos.update(orden=None)
+
+    for equipo_tipo, modelo in MODELOS_EQUIPO.items():
+        ids = {v.equipo_id for v in vencimientos if v.equipo_tipo == equipo_tipo}
+        for equipo in modelo.objects.filter(pk__in=ids):
+            equipo.ultimo_mantenimiento = fecha
+            equipo.horas_ultimo_mantenimiento = equipo.horas_uso
+            # save() recalcula proximo_mantenimiento y el post_save resincroniza el índice
+            equipo.save()
@@ -0,0 +1,170 @@
+# api/pronostico_service.py
+"""
+Pronóstico de cierre de turno a partir de los snapshots de ProduccionTiempoReal.
+
+Por (línea, turno, fecha) se ajusta por mínimos cuadrados la curva acumulada
+de cada métrica contra las horas transcurridas desde el inicio del turno
+(y = a + b·t, b = tasa horaria) y se proyecta al fin del turno con su
+intervalo de predicción al 95%. La probabilidad de alcanzar meta_produccion
+se compara contra fabricacion_toneladas, igual que la eficiencia del modelo.
+
+El resultado se cachea por (línea, turno, fecha); la señal post_save de
+ProduccionTiempoReal borra la entrada, así que solo se recalcula cuando llegan
+muestras nuevas.
+"""
+from datetime import datetime, timedelta
+import logging
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import ProduccionTiempoReal, Turno
+from .oee_service import minutos_turno
+
+logger = logging.getLogger(__name__)
+
+METRICAS = ('fabricacion_toneladas', 'bandejas')
+METRICA_META = 'fabricacion_toneladas'
+MIN_MUESTRAS = 3
+Z_95 = 1.96
+CACHE_TTL = 60 * 60 * 12
+
+
+def _clave(linea_id, turno_id, fecha):
+    return f"pronostico_turno:{linea_id}:{turno_id}:{fecha}"
+
+
+def invalidar_pronostico(linea_id, turno_id, fecha):
+    cache.delete(_clave(linea_id, turno_id, fecha))
+
+
+def ajustar(t, y, t_fin):
+    """
+    Recta de mínimos cuadrados de y sobre t proyectada a t_fin.
+    Devuelve (tasa, proyeccion, error_estandar) o None si no hay datos suficientes.
+    """
+    mascara = ~np.isnan(y)
+    t, y = t[mascara], y[mascara]
+    n = len(t)
+    if n < MIN_MUESTRAS:
+        return None
+
+    t_media, y_media = t.mean(), y.mean()
+    sxx = np.sum((t - t_media) ** 2)
+    if sxx == 0:
+        return None
+    tasa = np.sum((t - t_media) * (y - y_media)) / sxx
+    ordenada = y_media - tasa * t_media
+
+    residuos = y - (ordenada + tasa * t)
+    s2 = np.sum(residuos ** 2) / (n - 2) if n > 2 else 0.0
+    error = math.sqrt(s2 * (1 + 1 / n + (t_fin - t_media) ** 2 / sxx))
+    return float(tasa), float(ordenada + tasa * t_fin), error
+
+
+def _probabilidad(meta, proyeccion, error):
+    if error == 0:
+        return 1.0 if proyeccion >= meta else 0.0
+    z = (meta - proyeccion) / error
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def inicio_turno(turno, fecha, referencia):
+    """
+    Inicio del turno al que pertenece la hora de referencia.
+
+    En un turno nocturno (22:00-06:00) las muestras posteriores a medianoche
+    pueden traer la fecha del día siguiente: si la referencia cae en esa fecha
+    antes de hora_fin, el turno empezó el día anterior.
+    """
+    inicio = timezone.make_aware(datetime.combine(fecha, turno.hora_inicio))
+    referencia = timezone.localtime(referencia)
+    if (turno.hora_fin <= turno.hora_inicio and referencia.date() == fecha
+            and referencia.time() < turno.hora_fin):
+        inicio -= timedelta(days=1)
+    return inicio
+
+
+def calcular_pronostico(linea_id, turno, fecha):
+    """Pronóstico sin caché (una consulta a ProduccionTiempoReal)"""
+    filas = list(
+        ProduccionTiempoReal.objects.filter(linea_id=linea_id, turno_id=turno.id, fecha=fecha)
+        .order_by('timestamp')
+        .values_list('timestamp', *METRICAS, 'meta_produccion')
+    )
+
+    inicio = inicio_turno(turno, fecha, filas[0][0] if filas else timezone.now())
+    fin = inicio + timedelta(minutes=minutos_turno(turno.hora_inicio, turno.hora_fin))
+    duracion = (fin - inicio).total_seconds() / 3600
+
+    pronostico = {
+        'linea': linea_id,
+        'turno': turno.id,
+        'fecha': str(fecha),
+        'fin_turno': fin.isoformat(),
+        'muestras': len(filas),
+        'ultimo_timestamp': filas[-1][0].isoformat() if filas else None,
+        'avance_turno': None,
+        'meta_produccion': None,
+        'metricas': {},
+        'probabilidad_meta': None,
+        'cumplimiento_proyectado': None,
+    }
+    if not filas:
+        return pronostico
+
+    datos = np.array([[(f[0] - inicio).total_seconds() / 3600] + [np.nan if v is None else v for v in f[1:-1]]
+                      for f in filas], dtype=float)
+    t = datos[:, 0]
+    pronostico['avance_turno'] = round(min(max(t[-1] / duracion, 0.0), 1.0), 4)
+    metas = [f[-1] for f in filas if f[-1]]
+    meta = metas[-1] if metas else None
+    pronostico['meta_produccion'] = meta
+
+    for i, metrica in enumerate(METRICAS, start=1):
+        y = datos[:, i]
+        validos = y[~np.isnan(y)]
+        ajuste = ajustar(t, y, duracion)
+        if ajuste is None:
+            continue
+        tasa, proyeccion, error = ajuste
+        # El acumulado no puede cerrar por debajo de lo ya producido
+        actual = float(validos[-1])
+        proyeccion = max(proyeccion, actual)
+        pronostico['metricas'][metrica] = {
+            'actual': actual,
+            'tasa_hora': round(tasa, 4),
+            'proyeccion': round(proyeccion, 4),
+            'intervalo': [round(max(proyeccion - Z_95 * error, actual), 4), round(proyeccion + Z_95 * error, 4)],
+            'error_estandar': round(error, 4),
+        }
+        if metrica == METRICA_META and meta:
+            pronostico['probabilidad_meta'] = round(_probabilidad(meta, proyeccion, error), 4)
+            pronostico['cumplimiento_proyectado'] = round(proyeccion / meta * 100, 2)
+
+    return pronostico
+
+
+def pronosticar(linea_id, turno, fecha):
+    """Pronóstico cacheado por (línea, turno, fecha)"""
+    clave = _clave(linea_id, turno.id, fecha)
+    pronostico = cache.get(clave)
+    if pronostico is None:
+        pronostico = calcular_pronostico(linea_id, turno, fecha)
+        cache.set(clave, pronostico, CACHE_TTL)
+    return pronostico
+
+
+def pronosticar_turno(turno_id, fecha, linea_id=None):
+    """Pronósticos de todas las líneas con muestras en el turno (o de una sola)"""
+    turno = Turno.objects.get(pk=turno_id)
+    if linea_id:
+        lineas = [int(linea_id)]
+    else:
+        lineas = list(
+            ProduccionTiempoReal.objects.filter(turno_id=turno_id, fecha=fecha)
+            .order_by('linea_id').values_list('linea_id', flat=True).distinct()
+        )
+    return [pronosticar(linea, turno, fecha) for linea in lineas]
@@ -0,0 +1,180 @@
+# api/push_gateway.py
+"""
+Gateway de envío push compartido por todo el proceso.
+
+Antes cada señal y cada tarea creaba su propio NotificationService y con él un
+cliente FCM nuevo (sesión HTTP, handshake TLS y token OAuth por instancia), y
+los envíos se hacían de a un dispositivo y en serie. Ahora:
+
+- obtener_gateway() devuelve un único PushGateway por proceso (se recrea en el
+  hijo tras un fork de Celery/gunicorn).
+- El transporte FCM usa HTTP v1 (pyfcm 2.x: un token por request) con un
+  HTTPAdapter con pool keep-alive; pyfcm guarda una sesión por hilo, así que
+  cada hilo del pool reutiliza su conexión y su token OAuth.
+- notify_multiple_devices reparte los tokens en un ThreadPoolExecutor acotado
+  (FCM_MAX_WORKERS) y devuelve el resultado con la forma multicast
+  {'success', 'failure', 'results': [{'message_id'} | {'error'}]} que ya
+  interpreta NotificationService.
+- FCM_TRANSPORTE='simulado' usa TransporteSimulado: latencia configurable y sin
+  red, para medir el throughput offline (manage.py benchmark_push).
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class TransporteFCM:
+    """Envío individual por la API HTTP v1 de FCM mediante pyfcm"""
+
+    ERRORES = {
+        'FCMNotRegisteredError': 'UNREGISTERED',
+        'FCMSenderIdMismatchError': 'SENDER_ID_MISMATCH',
+        'InvalidDataError': 'INVALID_ARGUMENT',
+        'AuthenticationError': 'UNAUTHENTICATED',
+        'FCMServerError': 'UNAVAILABLE',
+    }
+
+    def __init__(self, service_account_file, project_id=None, pool_maxsize=10, timeout=10):
+        from pyfcm import FCMNotification
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = timeout
+        self.cliente = None
+        if not service_account_file or not os.path.isfile(service_account_file):
+            logger.error(f"Cuenta de servicio FCM no encontrada: {service_account_file}")
+            return
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=2, backoff_factor=0.5, status_forcelist=[502, 503],
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | frozenset(['POST']),
+            ),
+        )
+        self.cliente = FCMNotification(
+            service_account_file=service_account_file, project_id=project_id, adapter=adapter
+        )
+
+    def enviar(self, token, titulo, mensaje, data, prioridad_alta=False):
+        """Devuelve {'message_id': ...} o {'error': código FCM, 'detalle': mensaje de FCM}"""
+        if self.cliente is None:
+            # Sin credenciales falla el envío completo (y se reintenta), no se marcan tokens como inválidos
+            raise ImproperlyConfigured("FCM sin cuenta de servicio configurada")
+        try:
+            respuesta = self.cliente.notify(
+                fcm_token=token,
+                notification_title=titulo,
+                notification_body=mensaje,
+                # HTTP v1 exige que todos los valores de data sean strings
+                data_payload={clave: str(valor) for clave, valor in (data or {}).items()},
+                android_config={'priority': 'high' if prioridad_alta else 'normal'},
+                apns_config={'payload': {'aps': {'sound': 'default', 'badge': 1, 'content-available': 1}}},
+                timeout=self.timeout,
+            )
+            return {'message_id': respuesta.get('name', '')}
+        except Exception as e:
+            codigo = self.ERRORES.get(type(e).__name__, 'UNAVAILABLE')
+            logger.debug(f"FCM rechazó el token {token[:12]}…: {codigo} ({e})")
+            # El detalle permite distinguir un token inválido de un payload inválido
+            return {'error': codigo, 'detalle': str(e)}
+
+
+class TransporteSimulado:
+    """
+    Transporte sin red para pruebas de carga: espera `latencia` segundos por envío.
+    tokens_invalidos responden UNREGISTERED y tokens_no_disponibles UNAVAILABLE (transitorio).
+    """
+
+    def __init__(self, latencia=0.05, tokens_invalidos=(), tokens_no_disponibles=()):
+        self.latencia = latencia
+        self.tokens_invalidos = set(tokens_invalidos)
+        self.tokens_no_disponibles = set(tokens_no_disponibles)
+        self.enviados = 0
+        self._lock = threading.Lock()
+
+    def enviar(self, token, titulo, mensaje, data, prioridad_alta=False):
+        if self.latencia:
+            time.sleep(self.latencia)
+        if token in self.tokens_invalidos:
+            return {'error': 'UNREGISTERED'}
+        if token in self.tokens_no_disponibles:
+            return {'error': 'UNAVAILABLE'}
+        with self._lock:
+            self.enviados += 1
+        return {'message_id': f"simulado/{uuid.uuid4().hex}"}
+
+
+class PushGateway:
+    """Despacho concurrente de push sobre un transporte y un pool de hilos acotado"""
+
+    def __init__(self, transporte, max_workers=8):
+        self.transporte = transporte
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='push')
+
+    def notify_multiple_devices(self, registration_ids, message_title=None, message_body=None,
+                                data_message=None, sound=None, badge=None, prioridad_alta=None):
+        """Envía a todos los tokens en paralelo; conserva el orden de registration_ids en results"""
+        tokens = list(registration_ids)
+        if prioridad_alta is None:
+            prioridad_alta = (data_message or {}).get('prioridad') in ('alta', 'critica')
+
+        def enviar(token):
+            return self.transporte.enviar(token, message_title, message_body, data_message, prioridad_alta)
+
+        if len(tokens) == 1:
+            resultados = [enviar(tokens[0])]
+        else:
+            resultados = list(self._executor.map(enviar, tokens))
+
+        exitosos = sum(1 for r in resultados if 'error' not in r)
+        return {'success': exitosos, 'failure': len(resultados) - exitosos, 'results': resultados}
+
+    def cerrar(self):
+        self._executor.shutdown(wait=True)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def crear_transporte():
+    if getattr(settings, 'FCM_TRANSPORTE', 'fcm') == 'simulado':
+        return TransporteSimulado(latencia=getattr(settings, 'FCM_LATENCIA_SIMULADA', 0.05))
+    return TransporteFCM(
+        service_account_file=settings.FCM_SERVICE_ACCOUNT_FILE,
+        project_id=getattr(settings, 'FCM_PROJECT_ID', None),
+        pool_maxsize=getattr(settings, 'FCM_MAX_WORKERS', 8),
+    )
+
+
+def obtener_gateway():
+    """PushGateway único del proceso (creación perezosa y thread-safe)"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = PushGateway(crear_transporte(), max_workers=getattr(settings, 'FCM_MAX_WORKERS', 8))
+                logger.info(f"Gateway push inicializado ({type(_gateway.transporte).__name__})")
+    return _gateway
+
+
+def reiniciar_gateway():
+    """Descarta el gateway actual (tras un fork los hilos del pool no existen en el hijo)"""
+    global _gateway, _gateway_lock
+    _gateway = None
+    _gateway_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reiniciar_gateway)
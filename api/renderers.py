@@ -0,0 +1,45 @@
+# api/renderers.py
+"""
+Renderer JSON sobre orjson.
+
+Produce la misma salida que rest_framework.renderers.JSONRenderer con la
+configuración del proyecto (UTF-8 sin escapar, sin espacios) pero serializa
+varias veces más rápido las listas grandes.
+
+- datetime/date/UUID los escribe orjson en el mismo formato que DRF (ISO 8601
+  con 'Z' en UTC). Decimal de values()/aggregate() sale como número, igual que
+  con JSONEncoder; lo demás que orjson no conoce (cadenas lazy de
+  gettext_lazy, timedelta, QuerySet) pasa por el JSONEncoder de DRF.
+- "Accept: application/json; indent=N" se respeta con sangría de 2 espacios,
+  la única que soporta orjson.
+"""
+import decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+OPCIONES = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj):
+    # Decimal es el tipo crudo más frecuente: atajo con la misma salida que JSONEncoder
+    if type(obj) is decimal.Decimal:
+        return float(obj)
+    return _encoder.default(obj)
+
+
+def dumps(data, indent=False):
+    return orjson.dumps(data, default=_default, option=OPCIONES | (orjson.OPT_INDENT_2 if indent else 0))
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return dumps(data, indent=bool(indent))
@@ -0,0 +1,127 @@
+# api/retencion_service.py
+"""
+Retención de notificaciones y dispositivos de la app móvil.
+
+app_notificaciones crecía sin límite, y con ella el índice (usuario_id, leida)
+que usan la bandeja y el conteo de no leídas:
+
+- Las leídas con más de RETENCION_NOTIFICACIONES_DIAS y las no leídas con más
+  de RETENCION_NOTIFICACIONES_NO_LEIDAS_DIAS se eliminan en lotes de LOTE ids,
+  recorriendo el índice de fecha_creacion; cada lote va en su propia
+  transacción para no bloquear la tabla.
+- Antes de borrar, cada lote se resume en ResumenNotificacionArchivada
+  (usuario, mes, tipo) para conservar los conteos históricos.
+- Los DispositivoApp desactivados (token rechazado por FCM) se eliminan tras
+  RETENCION_DISPOSITIVOS_INACTIVOS_DIAS y los activos que la app no renovó en
+  RETENCION_DISPOSITIVOS_SIN_USO_DIAS (FCM invalida esos tokens).
+"""
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import NotificacionApp, DispositivoApp, ResumenNotificacionArchivada
+
+logger = logging.getLogger(__name__)
+
+LOTE = 2000
+DIAS_LEIDAS = getattr(settings, 'RETENCION_NOTIFICACIONES_DIAS', 90)
+DIAS_NO_LEIDAS = getattr(settings, 'RETENCION_NOTIFICACIONES_NO_LEIDAS_DIAS', 365)
+DIAS_DISPOSITIVOS_INACTIVOS = getattr(settings, 'RETENCION_DISPOSITIVOS_INACTIVOS_DIAS', 30)
+DIAS_DISPOSITIVOS_SIN_USO = getattr(settings, 'RETENCION_DISPOSITIVOS_SIN_USO_DIAS', 270)
+TRAMOS_ANTIGUEDAD = (7, 30, 90, 365)
+
+
+def _archivar(ids):
+    """Suma los conteos del lote a ResumenNotificacionArchivada (usuario, mes, tipo)"""
+    filas = (
+        NotificacionApp.objects.filter(pk__in=ids)
+        .annotate(mes=TruncMonth('fecha_creacion', output_field=models.DateField()))
+        .values('usuario_id', 'mes', 'tipo')
+        .annotate(cantidad=Count('id'), leidas=Count('id', filter=Q(leida=True)))
+        .order_by()
+    )
+    resumen = {(f['usuario_id'], f['mes'], f['tipo']): [f['cantidad'], f['leidas']] for f in filas}
+    if not resumen:
+        return
+
+    existentes = ResumenNotificacionArchivada.objects.filter(
+        usuario_id__in={clave[0] for clave in resumen}, mes__in={clave[1] for clave in resumen}
+    ).values_list('usuario_id', 'mes', 'tipo', 'cantidad', 'leidas')
+    for usuario_id, mes, tipo, cantidad, leidas in existentes:
+        acumulado = resumen.get((usuario_id, mes, tipo))
+        if acumulado:
+            acumulado[0] += cantidad
+            acumulado[1] += leidas
+
+    ResumenNotificacionArchivada.objects.bulk_create(
+        [
+            ResumenNotificacionArchivada(usuario_id=usuario_id, mes=mes, tipo=tipo, cantidad=cantidad, leidas=leidas)
+            for (usuario_id, mes, tipo), (cantidad, leidas) in resumen.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['usuario_id', 'mes', 'tipo'],
+        update_fields=['cantidad', 'leidas', 'actualizado'],
+    )
+
+
+def purgar_notificaciones(dias=DIAS_LEIDAS, dias_no_leidas=DIAS_NO_LEIDAS, lote=LOTE, ahora=None):
+    """Archiva y elimina en lotes las notificaciones vencidas; devuelve {'leidas': n, 'no_leidas': n}"""
+    ahora = ahora or timezone.now()
+    criterios = {
+        'leidas': Q(leida=True, fecha_creacion__lt=ahora - timedelta(days=dias)),
+        'no_leidas': Q(leida=False, fecha_creacion__lt=ahora - timedelta(days=dias_no_leidas)),
+    }
+    eliminadas = {}
+    for nombre, criterio in criterios.items():
+        eliminadas[nombre] = 0
+        while True:
+            ids = list(
+                NotificacionApp.objects.filter(criterio).order_by('fecha_creacion').values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                _archivar(ids)
+                # delete() dispara post_delete: las no leídas descuentan su contador
+                NotificacionApp.objects.filter(pk__in=ids).delete()
+            eliminadas[nombre] += len(ids)
+
+    logger.info(f"Retención de notificaciones: {eliminadas}")
+    return eliminadas
+
+
+def purgar_dispositivos(dias_inactivos=DIAS_DISPOSITIVOS_INACTIVOS, dias_sin_uso=DIAS_DISPOSITIVOS_SIN_USO, ahora=None):
+    """Elimina dispositivos desactivados o sin renovar; devuelve {'inactivos': n, 'sin_uso': n}"""
+    ahora = ahora or timezone.now()
+    inactivos, _ = DispositivoApp.objects.filter(
+        esta_activo=False, ultima_actualizacion__lt=ahora - timedelta(days=dias_inactivos)
+    ).delete()
+    sin_uso, _ = DispositivoApp.objects.filter(
+        esta_activo=True, ultima_actualizacion__lt=ahora - timedelta(days=dias_sin_uso)
+    ).delete()
+    resultado = {'inactivos': inactivos, 'sin_uso': sin_uso}
+    logger.info(f"Retención de dispositivos: {resultado}")
+    return resultado
+
+
+def resumen_antiguedad(ahora=None):
+    """Notificaciones (leídas / no leídas) por tramo de antigüedad en una sola consulta"""
+    ahora = ahora or timezone.now()
+    agregados = {}
+    desde = None
+    for dias in TRAMOS_ANTIGUEDAD:
+        limite = ahora - timedelta(days=dias)
+        tramo = Q(fecha_creacion__gte=limite) if desde is None else Q(fecha_creacion__gte=limite, fecha_creacion__lt=desde)
+        for leida in (True, False):
+            agregados[f"{'leidas' if leida else 'no_leidas'}_{dias}d"] = Count('id', filter=tramo & Q(leida=leida))
+        desde = limite
+    for leida in (True, False):
+        agregados[f"{'leidas' if leida else 'no_leidas'}_mas_{TRAMOS_ANTIGUEDAD[-1]}d"] = Count(
+            'id', filter=Q(fecha_creacion__lt=desde, leida=leida)
+        )
+    return NotificacionApp.objects.aggregate(**agregados)
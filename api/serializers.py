@@ -5,8 +5,15 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from .campos_dispersos import CamposDinamicosMixin, ValoresListSerializer
+from .authentication import cachear_usuario
 
-class TurnoSerializer(serializers.ModelSerializer):
+
+class BaseModelSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """ModelSerializer con ?fields= / ?omit= (ver campos_dispersos)"""
+
+
+class TurnoSerializer(BaseModelSerializer):
     class Meta:
         model = Turno
         fields = '__all__'
@@ -25,6 +32,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
     def validate(self, attrs):
         data = super().validate(attrs)
+        # Las primeras peticiones con el token nuevo no consultan el usuario
+        cachear_usuario(self.user)
         
         # Agregar datos adicionales a la respuesta
         data['user'] = {
@@ -39,7 +48,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(BaseModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
     class Meta:
         model = User
@@ -56,25 +65,26 @@ class UserSerializer(serializers.ModelSerializer):
         )
         return user
 
-class LineaProduccionSerializer(serializers.ModelSerializer):
+class LineaProduccionSerializer(BaseModelSerializer):
     class Meta:
         model = LineaProduccion
         fields = '__all__'
 
-class SectorSerializer(serializers.ModelSerializer):
+class SectorSerializer(BaseModelSerializer):
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     class Meta:
         model = Sector
         fields = '__all__'
 
-class EquipoSerializer(serializers.ModelSerializer):
+class EquipoSerializer(BaseModelSerializer):
     sector_nombre = serializers.CharField(source='sector.nombre', read_only=True)
     linea_nombre = serializers.CharField(source='sector.linea.nombre', read_only=True)
     class Meta:
         model = Equipo
         fields = '__all__'
+        list_serializer_class = ValoresListSerializer
 
-class DepositoSerializer(serializers.ModelSerializer):
+class DepositoSerializer(BaseModelSerializer):
     class Meta:
         model = Deposito
         fields = '__all__'
@@ -82,7 +92,7 @@ class DepositoSerializer(serializers.ModelSerializer):
 
 
 
-class MotorSerializer(serializers.ModelSerializer):
+class MotorSerializer(BaseModelSerializer):
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     ubicacion_tipo_display = serializers.CharField(source='get_ubicacion_tipo_display', read_only=True)
     creado_por_nombre = serializers.CharField(source='creado_por.username', read_only=True)
@@ -92,6 +102,7 @@ class MotorSerializer(serializers.ModelSerializer):
     sector_nombre = serializers.CharField(source='equipo.sector.nombre', read_only=True)
     linea_nombre = serializers.CharField(source='equipo.sector.linea.nombre', read_only=True)
     deposito_nombre = serializers.CharField(source='deposito.nombre', read_only=True)
+    archivos_url = {'imagen_url': 'imagen', 'plano_url': 'ref_plano'}
 
     def get_imagen_url(self, obj):
         if obj.imagen:
@@ -116,14 +127,16 @@ class MotorSerializer(serializers.ModelSerializer):
         model = Motor
         fields = '__all__'
         extra_kwargs = {'creado_por': {'read_only': True}}
+        list_serializer_class = ValoresListSerializer
 
 
-class VariadorSerializer(serializers.ModelSerializer):
+class VariadorSerializer(BaseModelSerializer):
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     ubicacion_tipo_display = serializers.CharField(source='get_ubicacion_tipo_display', read_only=True)
     creado_por_nombre = serializers.CharField(source='creado_por.username', read_only=True)
     imagen_url = serializers.SerializerMethodField()
     manual_url = serializers.SerializerMethodField()
+    archivos_url = {'imagen_url': 'imagen', 'manual_url': 'manual'}
 
     def get_imagen_url(self, obj):
         if obj.imagen:
@@ -139,8 +152,9 @@ class VariadorSerializer(serializers.ModelSerializer):
         model = Variador
         fields = '__all__'
         extra_kwargs = {'creado_por': {'read_only': True}}
+        list_serializer_class = ValoresListSerializer
 
-class OrdenMantenimientoSerializer(serializers.ModelSerializer):
+class OrdenMantenimientoSerializer(BaseModelSerializer):
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
@@ -164,6 +178,8 @@ class OrdenMantenimientoSerializer(serializers.ModelSerializer):
 
     linea_info = serializers.SerializerMethodField()
     sector_info = serializers.SerializerMethodField()
+    # Leen las relaciones múltiples, no columnas propias
+    dependencias_metodo = {'linea_info': [], 'sector_info': []}
 
     def get_linea_info(self, obj):
         # Obtener línea del primer equipo asociado (prioridad: Equipo > Motor > Variador)
@@ -224,10 +240,11 @@ class OrdenMantenimientoSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {'creado_por': {'read_only': True}}
 
-class PLCSerializer(serializers.ModelSerializer):
+class PLCSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     ubicacion_nombre = serializers.CharField(source='ubicacion.nombre', read_only=True)
     diagrama_url = serializers.SerializerMethodField()
+    archivos_url = {'diagrama_url': 'diagrama'}
 
     def get_diagrama_url(self, obj):
         if obj.diagrama:
@@ -239,7 +256,7 @@ class PLCSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {'creado_por': {'read_only': True}}
 
-class PLCEntradaSalidaSerializer(serializers.ModelSerializer):
+class PLCEntradaSalidaSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     plc_nombre = serializers.CharField(source='plc.nombre', read_only=True)
 
@@ -248,7 +265,7 @@ class PLCEntradaSalidaSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['fecha_actualizacion', 'historico']
 
-class PLCLogSerializer(serializers.ModelSerializer):
+class PLCLogSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     usuario_nombre = serializers.CharField(source='usuario.username', read_only=True)
     entrada_salida_etiqueta = serializers.CharField(source='entrada_salida.etiqueta', read_only=True)
@@ -259,7 +276,7 @@ class PLCLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha']
 
 
-class HistorialCambioOrdenSerializer(serializers.ModelSerializer):
+class HistorialCambioOrdenSerializer(BaseModelSerializer):
     orden_id = serializers.IntegerField(write_only=True)  # Eliminado source='orden'
     usuario_nombre = serializers.CharField(source='usuario.username', read_only=True)
     
@@ -278,7 +295,7 @@ class HistorialCambioOrdenSerializer(serializers.ModelSerializer):
         validated_data['orden'] = OrdenMantenimiento.objects.get(id=orden_id)
         return super().create(validated_data)
 
-class HistorialMantenimientoSerializer(serializers.ModelSerializer):
+class HistorialMantenimientoSerializer(BaseModelSerializer):
     tipo_evento_display = serializers.CharField(source='get_tipo_evento_display', read_only=True)
     usuario_nombre = serializers.CharField(source='usuario.username', read_only=True)
 
@@ -289,7 +306,7 @@ class HistorialMantenimientoSerializer(serializers.ModelSerializer):
 class BusquedaGlobalSerializer(serializers.Serializer):
     termino = serializers.CharField(max_length=100)
 
-class ProveedorSerializer(serializers.ModelSerializer):
+class ProveedorSerializer(BaseModelSerializer):
     reparaciones = serializers.SerializerMethodField()
     especialidad_display = serializers.CharField(source='get_especialidad_display', read_only=True)
     
@@ -320,7 +337,7 @@ class ProveedorSerializer(serializers.ModelSerializer):
         )
         return reparaciones
     
-class ReparacionSerializer(serializers.ModelSerializer):
+class ReparacionSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     proveedor_info = serializers.SerializerMethodField()
     equipo_info = serializers.SerializerMethodField()
@@ -404,7 +421,7 @@ class ReparacionSerializer(serializers.ModelSerializer):
             
         return data
     
-class OrdenMantenimientoSerializer(serializers.ModelSerializer):
+class OrdenMantenimientoSerializer(BaseModelSerializer):
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
@@ -428,6 +445,8 @@ class OrdenMantenimientoSerializer(serializers.ModelSerializer):
 
     linea_info = serializers.SerializerMethodField()
     sector_info = serializers.SerializerMethodField()
+    # Leen las relaciones múltiples, no columnas propias
+    dependencias_metodo = {'linea_info': [], 'sector_info': []}
 
     def get_linea_info(self, obj):
         # Obtener línea del primer equipo asociado (prioridad: Equipo > Motor > Variador)
@@ -488,7 +507,7 @@ class OrdenMantenimientoSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {'creado_por': {'read_only': True}}
     
-class EventoSerializer(serializers.ModelSerializer):
+class EventoSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     usuario_info = serializers.SerializerMethodField()
     objeto_info = serializers.SerializerMethodField()
@@ -560,7 +579,28 @@ class EventoSerializer(serializers.ModelSerializer):
         validated_data['usuario'] = self.context['request'].user
         return super().create(validated_data)
     
-class VariableInspeccionSerializer(serializers.ModelSerializer):
+class EstadisticaVariableSerializer(BaseModelSerializer):
+    varianza = serializers.FloatField(read_only=True)
+    desviacion = serializers.FloatField(read_only=True)
+    promedio_movil = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = EstadisticaVariable
+        exclude = ['m2']
+
+
+class CapacidadVariableSerializer(BaseModelSerializer):
+    variable_nombre = serializers.CharField(source='variable.nombre', read_only=True)
+    unidad = serializers.CharField(source='variable.unidad', read_only=True)
+    ruta = serializers.IntegerField(source='variable.ruta_id', read_only=True)
+    ruta_nombre = serializers.CharField(source='variable.ruta.nombre', read_only=True)
+
+    class Meta:
+        model = CapacidadVariable
+        fields = '__all__'
+
+
+class VariableInspeccionSerializer(BaseModelSerializer):
     class Meta:
         model = VariableInspeccion
         fields = '__all__'
@@ -568,7 +608,7 @@ class VariableInspeccionSerializer(serializers.ModelSerializer):
 
 
 
-class ResultadoInspeccionSerializer(serializers.ModelSerializer):
+class ResultadoInspeccionSerializer(BaseModelSerializer):
     variable_info = VariableInspeccionSerializer(source='variable', read_only=True)
     ejecucion_id = serializers.PrimaryKeyRelatedField(
         queryset=InspeccionEjecucion.objects.all(),
@@ -592,7 +632,7 @@ class ResultadoInspeccionSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha', 'ejecucion']  # Marcar solo como lectura si es necesario
     def get_fecha_formateada(self, obj):
         return obj.fecha.strftime("%d/%m/%Y %H:%M")
-class ResultadoInspeccionSerializer(serializers.ModelSerializer):
+class ResultadoInspeccionSerializer(BaseModelSerializer):
     variable_info = VariableInspeccionSerializer(source='variable', read_only=True)
     ejecucion_id = serializers.PrimaryKeyRelatedField(
         queryset=InspeccionEjecucion.objects.all(),
@@ -637,7 +677,7 @@ class ResultadoInspeccionSerializer(serializers.ModelSerializer):
 
 
 
-class InspeccionEjecucionSerializer(serializers.ModelSerializer):
+class InspeccionEjecucionSerializer(BaseModelSerializer):
     ruta_info = serializers.SerializerMethodField()
     tecnico_info = serializers.SerializerMethodField()
     resultados = ResultadoInspeccionSerializer(many=True, read_only=True)
@@ -652,6 +692,7 @@ class InspeccionEjecucionSerializer(serializers.ModelSerializer):
             'tecnico_info',
             'fecha',
             'observaciones',
+            'uuid_cliente',
             'resultados'
         ]
         read_only_fields = ['fecha', 'tecnico']
@@ -679,7 +720,33 @@ class InspeccionEjecucionSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class RutaInspeccionSerializer(serializers.ModelSerializer):
+class ResultadoLoteSerializer(serializers.Serializer):
+    variable = serializers.IntegerField()
+    valor_medido = serializers.FloatField()
+
+
+class InspeccionLoteSerializer(serializers.Serializer):
+    """Ejecución completa con todos sus resultados (sincronización offline)"""
+    uuid_cliente = serializers.UUIDField(required=False, allow_null=True)
+    ruta = serializers.PrimaryKeyRelatedField(queryset=RutaInspeccion.objects.all())
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    resultados = ResultadoLoteSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        # Una sola consulta para todas las variables del lote
+        ids = {r['variable'] for r in data['resultados']}
+        variables = VariableInspeccion.objects.filter(ruta=data['ruta']).in_bulk(ids)
+        faltantes = ids - set(variables)
+        if faltantes:
+            raise serializers.ValidationError(
+                {'resultados': f"Variables inexistentes o de otra ruta: {sorted(faltantes)}"}
+            )
+        for resultado in data['resultados']:
+            resultado['variable'] = variables[resultado['variable']]
+        return data
+
+
+class RutaInspeccionSerializer(BaseModelSerializer):
     variables = VariableInspeccionSerializer(many=True, read_only=True)
     creado_por_nombre = serializers.CharField(source='creado_por.username', read_only=True)
 
@@ -709,7 +776,7 @@ class KpiInspeccionesResponseSerializer(serializers.Serializer):
     tiempo_promedio = serializers.FloatField()
 
 
-class NotificacionAppSerializer(serializers.ModelSerializer):
+class NotificacionAppSerializer(BaseModelSerializer):
     class Meta:
         model = NotificacionApp
         fields = [
@@ -731,7 +798,7 @@ class DispositivoRequestSerializer(serializers.Serializer):
         return value
 
 
-class ReunionDiariaSerializer(serializers.ModelSerializer):
+class ReunionDiariaSerializer(BaseModelSerializer):
     creada_por_nombre = serializers.CharField(source='creada_por.get_full_name', read_only=True)
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     incidencias_count = serializers.SerializerMethodField()
@@ -745,7 +812,7 @@ class ReunionDiariaSerializer(serializers.ModelSerializer):
         return obj.incidencias.count()
 
 
-class IncidenciaReunionSerializer(serializers.ModelSerializer):
+class IncidenciaReunionSerializer(BaseModelSerializer):
     reunion_fecha = serializers.DateField(source='reunion.fecha', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
@@ -763,7 +830,7 @@ class IncidenciaReunionSerializer(serializers.ModelSerializer):
         return obj.acciones.count()
 
 
-class PlanificacionReunionSerializer(serializers.ModelSerializer):
+class PlanificacionReunionSerializer(BaseModelSerializer):
     reunion_fecha = serializers.DateField(source='reunion.fecha', read_only=True)
     responsable_nombre = serializers.CharField(source='responsable.get_full_name', read_only=True)
     equipo_nombre = serializers.CharField(source='equipo_relacionado.nombre', read_only=True)
@@ -775,7 +842,7 @@ class PlanificacionReunionSerializer(serializers.ModelSerializer):
         read_only_fields = ('creada_en',)
 
 
-class AccionReunionSerializer(serializers.ModelSerializer):
+class AccionReunionSerializer(BaseModelSerializer):
     incidencia_descripcion = serializers.CharField(source='incidencia.descripcion', read_only=True)
     asignada_a_nombre = serializers.CharField(source='asignada_a.get_full_name', read_only=True)
     orden_mantenimiento_titulo = serializers.CharField(source='orden_mantenimiento.titulo', read_only=True)
@@ -787,7 +854,7 @@ class AccionReunionSerializer(serializers.ModelSerializer):
 
 
 # For nested representations
-class IncidenciaReunionNestedSerializer(serializers.ModelSerializer):
+class IncidenciaReunionNestedSerializer(BaseModelSerializer):
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
     reportada_por_nombre = serializers.CharField(source='reportada_por.get_full_name', read_only=True)
@@ -804,7 +871,7 @@ class ReunionDiariaDetailSerializer(ReunionDiariaSerializer):
     planificaciones = PlanificacionReunionSerializer(many=True, read_only=True)
 
 
-class ProduccionTurnoSerializer(serializers.ModelSerializer):
+class ProduccionTurnoSerializer(BaseModelSerializer):
     turno_nombre = serializers.CharField(source='turno.nombre', read_only=True)
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     
@@ -813,7 +880,7 @@ class ProduccionTurnoSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('creado_por', 'fecha_creacion', 'fecha_actualizacion', 'eficiencia')
 
-class FallaTurnoSerializer(serializers.ModelSerializer):
+class FallaTurnoSerializer(BaseModelSerializer):
     turno_nombre = serializers.CharField(source='turno.nombre', read_only=True)
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     equipo_nombre = serializers.CharField(source='equipo.nombre', read_only=True, allow_null=True)
@@ -823,7 +890,7 @@ class FallaTurnoSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('creado_por', 'fecha_creacion', 'fecha_actualizacion')
 
-class ParadaTurnoSerializer(serializers.ModelSerializer):
+class ParadaTurnoSerializer(BaseModelSerializer):
     turno_nombre = serializers.CharField(source='turno.nombre', read_only=True)
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     equipo_nombre = serializers.CharField(source='equipo.nombre', read_only=True, allow_null=True)
@@ -833,16 +900,31 @@ class ParadaTurnoSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('creado_por', 'fecha_creacion', 'fecha_actualizacion')
 
-class NodeRedLogSerializer(serializers.ModelSerializer):
+class IndicadorConfiabilidadSerializer(BaseModelSerializer):
+    activo_tipo_display = serializers.CharField(source='get_activo_tipo_display', read_only=True)
+    linea_nombre = serializers.CharField(source='linea.nombre', read_only=True, allow_null=True)
+
+    class Meta:
+        model = IndicadorConfiabilidad
+        fields = '__all__'
+
+class NodeRedLogSerializer(BaseModelSerializer):
     class Meta:
         model = NodeRedLog
         fields = '__all__'
         read_only_fields = ('fecha_recepcion',)
 
-class ProduccionSerializer(serializers.ModelSerializer):
+class ProduccionComponenteSerializer(BaseModelSerializer):
+    class Meta:
+        model = ProduccionComponente
+        fields = ['producto', 'porcentaje']
+
+
+class ProduccionSerializer(BaseModelSerializer):
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     turno_nombre = serializers.CharField(source='turno.nombre', read_only=True)
     supervisor_username = serializers.CharField(source='supervisor.username', read_only=True)
+    componentes = ProduccionComponenteSerializer(many=True, read_only=True)
 
     class Meta:
         model = Produccion
@@ -852,11 +934,12 @@ class ProduccionSerializer(serializers.ModelSerializer):
             'fabricacion_toneladas', 'fabricacion_scrap', 'apilado_vagones',
             'apilado_toneladas', 'coccion_vagones', 'coccion_toneladas',
             'desapilado_primera', 'desapilado_segunda', 'desapilado_toneladas',
-            'meta_produccion', 'eficiencia', 'fecha_creacion', 'fuente_dato'
+            'meta_produccion', 'eficiencia', 'fecha_creacion', 'fuente_dato',
+            'componentes'
         ]
 
 
-class ProduccionTiempoRealSerializer(serializers.ModelSerializer):
+class ProduccionTiempoRealSerializer(BaseModelSerializer):
     linea_nombre = serializers.CharField(source='linea.nombre', read_only=True)
     turno_nombre = serializers.CharField(source='turno.nombre', read_only=True)
     supervisor_username = serializers.CharField(source='supervisor.username', read_only=True)
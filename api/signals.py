@@ -1,10 +1,22 @@
 # signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 from .models import Motor, Variador, Reparacion, OrdenMantenimiento, HistorialMantenimiento, ResultadoInspeccion
+from .models import VariableInspeccion
+from .models import ProduccionTurno, ParadaTurno, FallaTurno, ProduccionTiempoReal
+from .models import PLC, PLCEntradaSalida, NotificacionApp, Equipo, Sector, LineaProduccion
+from .models import Turno, Deposito, Proveedor, User
 from .notification_service import NotificationService
+from .oee_service import invalidar_cache_oee
+from .detenciones_service import recalcular_turno
+from .tiempo_real_service import registrar_muestra
+from .spc_service import actualizar_capacidades
+from .pronostico_service import invalidar_pronostico
+from .programacion_service import sincronizar_equipo, registrar_mantenimiento_realizado
+from .authentication import invalidar_usuario
+from . import bandeja_service, busqueda_service, contadores_service, jerarquia_service, sincronizacion_service, versiones_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,6 +61,12 @@ def crear_evento_ubicacion(sender, instance, created, **kwargs):
         usuario=instance.creado_por
     )
 
+@receiver(post_save, sender=Motor)
+@receiver(post_save, sender=Variador)
+def sincronizar_vencimientos_equipo(sender, instance, **kwargs):
+    """Mantiene al día el índice de vencimientos preventivos del equipo"""
+    sincronizar_equipo(instance)
+
 @receiver(post_save, sender=Reparacion)
 def crear_evento_reparacion(sender, instance, created, **kwargs):
     descripcion = f"Reparación {instance.get_tipo_display()} iniciada"
@@ -75,7 +93,7 @@ def manejar_notificaciones_orden(sender, instance, created, **kwargs):
         )
     else:
         # Orden modificada - verificar cambio de estado
-        if 'estado' in kwargs.get('update_fields', []):
+        if 'estado' in (kwargs.get('update_fields') or []):
             # Obtener usuario que hizo el cambio
             usuario_cambio_id = getattr(instance, '_current_user_id', None)
             if usuario_cambio_id:
@@ -118,18 +136,36 @@ def manejar_notificaciones_orden(sender, instance, created, **kwargs):
                 orden=instance
             )
 
+@receiver(post_save, sender=OrdenMantenimiento)
+def reprogramar_preventivo_completado(sender, instance, **kwargs):
+    """Una orden preventiva completada reinicia el plan de sus equipos"""
+    if instance.tipo == 'preventivo' and instance.estado == 'completada':
+        registrar_mantenimiento_realizado(instance)
+
 @receiver(post_save, sender=ResultadoInspeccion)
 def manejar_alerta_inspeccion(sender, instance, created, **kwargs):
     """Maneja alertas automáticas de inspecciones"""
-    if created:
+    # Solo notificar si está fuera de tolerancia (save ya dejó la variable en caché)
+    if created and instance.severidad:
         service = NotificationService()
-        desvio = abs(instance.valor_medido - instance.variable.valor_referencia)
-        
-        # Solo notificar si está fuera de tolerancia
-        if desvio > instance.variable.tolerancia:
-            transaction.on_commit(
-                lambda: service.notificar_alerta_inspeccion(instance.id)
-            )
+        transaction.on_commit(
+            lambda: service.notificar_alerta_inspeccion(instance.id)
+        )
+
+@receiver(pre_save, sender=VariableInspeccion)
+def track_especificacion_variable(sender, instance, **kwargs):
+    instance._old_especificacion = None
+    if instance.pk:
+        instance._old_especificacion = sender.objects.filter(pk=instance.pk).values_list(
+            'valor_referencia', 'tolerancia'
+        ).first()
+
+@receiver(post_save, sender=VariableInspeccion)
+def recalcular_capacidad_variable(sender, instance, created, **kwargs):
+    """Cp/Cpk dependen de los límites de especificación: se recalculan si cambian"""
+    anterior = getattr(instance, '_old_especificacion', None)
+    if anterior and tuple(anterior) != (instance.valor_referencia, instance.tolerancia):
+        transaction.on_commit(lambda: actualizar_capacidades(variable_ids=[instance.pk]))
 
 # ✅ AGREGAR ESTA SEÑAL PARA INCIDENCIAS CRÍTICAS
 @receiver(post_save, sender='api.IncidenciaReunion')  # Usar string reference para evitar importación circular
@@ -142,4 +178,171 @@ def manejar_incidencia_critica(sender, instance, created, **kwargs):
         
         # Ejecutar como tarea Celery para mejor performance
         crear_orden_desde_incidencia_critica.delay(instance.id)
-        logger.info(f"📋 Tarea programada para crear orden desde incidencia crítica: {instance.id}")
\ No newline at end of file
+        logger.info(f"📋 Tarea programada para crear orden desde incidencia crítica: {instance.id}")
+
+@receiver(post_save, sender=ProduccionTiempoReal)
+def detectar_anomalia_tiempo_real(sender, instance, created, **kwargs):
+    """Evalúa cada snapshot nuevo contra la tasa de producción reciente de la línea"""
+    if created:
+        registrar_muestra(instance)
+
+
+@receiver(post_save, sender=ProduccionTiempoReal)
+@receiver(post_delete, sender=ProduccionTiempoReal)
+def invalidar_pronostico_turno(sender, instance, **kwargs):
+    """El pronóstico de cierre se recalcula solo cuando cambian las muestras del turno"""
+    invalidar_pronostico(instance.linea_id, instance.turno_id, instance.fecha)
+
+
+@receiver(post_save, sender=ProduccionTurno)
+@receiver(post_save, sender=ParadaTurno)
+@receiver(post_save, sender=FallaTurno)
+@receiver(post_delete, sender=ProduccionTurno)
+@receiver(post_delete, sender=ParadaTurno)
+@receiver(post_delete, sender=FallaTurno)
+def invalidar_kpi_oee(sender, instance, **kwargs):
+    """Invalida el OEE cacheado cuando cambian los datos de turno"""
+    transaction.on_commit(invalidar_cache_oee)
+
+
+@receiver(pre_save, sender=ParadaTurno)
+@receiver(pre_save, sender=FallaTurno)
+def track_turno_detencion(sender, instance, **kwargs):
+    instance._old_celda = None
+    if instance.pk:
+        instance._old_celda = sender.objects.filter(pk=instance.pk).values_list(
+            'fecha', 'linea_id', 'turno_id'
+        ).first()
+
+@receiver(post_save, sender=ParadaTurno)
+@receiver(post_save, sender=FallaTurno)
+@receiver(post_delete, sender=ParadaTurno)
+@receiver(post_delete, sender=FallaTurno)
+def actualizar_cubo_detenciones(sender, instance, **kwargs):
+    """Mantiene ResumenDetencion al día para el turno afectado"""
+    origen = 'parada' if sender == ParadaTurno else 'falla'
+    celda = (instance.fecha, instance.linea_id, instance.turno_id)
+    recalcular_turno(origen, *celda)
+
+    # Si el registro cambió de turno/línea/fecha también se recalcula el anterior
+    anterior = getattr(instance, '_old_celda', None)
+    if anterior and tuple(anterior) != celda:
+        recalcular_turno(origen, *anterior)
+
+
+@receiver(post_save, sender=Motor)
+@receiver(post_save, sender=Variador)
+@receiver(post_save, sender=PLC)
+@receiver(post_save, sender=PLCEntradaSalida)
+@receiver(post_save, sender=OrdenMantenimiento)
+def indexar_busqueda(sender, instance, raw=False, **kwargs):
+    """Mantiene SearchDocument al día para la búsqueda global"""
+    if raw:
+        return
+    busqueda_service.indexar(instance)
+    # Las entradas/salidas muestran el nombre del PLC
+    if sender == PLC:
+        busqueda_service.indexar_queryset('entrada_salida', instance.entradas_salidas.all())
+
+@receiver(post_delete, sender=Motor)
+@receiver(post_delete, sender=Variador)
+@receiver(post_delete, sender=PLC)
+@receiver(post_delete, sender=PLCEntradaSalida)
+@receiver(post_delete, sender=OrdenMantenimiento)
+def eliminar_de_busqueda(sender, instance, **kwargs):
+    busqueda_service.eliminar(instance)
+
+
+@receiver(post_save, sender=NotificacionApp)
+def contar_notificacion_nueva(sender, instance, created, raw=False, **kwargs):
+    """Mantiene el contador de no leídas del destinatario (bulk_create se cuenta en el servicio)"""
+    # Tras el commit: si la transacción se revierte el contador no debe moverse, y los
+    # long-poll de la bandeja ya ven la fila al despertar (cualquier origen de la notificación)
+    if created and not raw and not instance.leida:
+        usuario_id = instance.usuario_id
+
+        def contar_y_publicar():
+            contadores_service.incrementar(usuario_id)
+            bandeja_service.publicar([usuario_id])
+        transaction.on_commit(contar_y_publicar)
+
+@receiver(post_delete, sender=NotificacionApp)
+def descontar_notificacion_eliminada(sender, instance, **kwargs):
+    if not instance.leida:
+        usuario_id = instance.usuario_id
+        transaction.on_commit(lambda: contadores_service.decrementar(usuario_id))
+
+
+@receiver(post_delete, sender=Motor)
+@receiver(post_delete, sender=Variador)
+@receiver(post_delete, sender=Equipo)
+def registrar_tombstone(sender, instance, **kwargs):
+    """La sincronización delta de la app informa los activos eliminados"""
+    sincronizacion_service.registrar_eliminacion(sender, instance.pk)
+
+@receiver(post_save, sender=LineaProduccion)
+@receiver(post_save, sender=Sector)
+@receiver(post_save, sender=Equipo)
+@receiver(post_save, sender=Deposito)
+@receiver(pre_delete, sender=LineaProduccion)
+@receiver(pre_delete, sender=Sector)
+@receiver(pre_delete, sender=Equipo)
+@receiver(pre_delete, sender=Deposito)
+def propagar_cambio_ubicacion(sender, instance, created=False, raw=False, **kwargs):
+    """Los catálogos muestran nombres de ubicación: sus activos cuentan como modificados"""
+    if created or raw:
+        return
+    sincronizacion_service.tocar_dependientes(instance)
+
+
+@receiver(post_save, sender=Turno)
+@receiver(post_save, sender=LineaProduccion)
+@receiver(post_save, sender=Sector)
+@receiver(post_save, sender=Equipo)
+@receiver(post_save, sender=Deposito)
+@receiver(post_save, sender=PLC)
+@receiver(post_save, sender=Proveedor)
+@receiver(post_save, sender=Reparacion)
+@receiver(post_save, sender=Motor)
+@receiver(post_save, sender=Variador)
+@receiver(post_delete, sender=Turno)
+@receiver(post_delete, sender=LineaProduccion)
+@receiver(post_delete, sender=Sector)
+@receiver(post_delete, sender=Equipo)
+@receiver(post_delete, sender=Deposito)
+@receiver(post_delete, sender=PLC)
+@receiver(post_delete, sender=Proveedor)
+@receiver(post_delete, sender=Reparacion)
+@receiver(post_delete, sender=Motor)
+@receiver(post_delete, sender=Variador)
+def incrementar_version_tabla(sender, raw=False, **kwargs):
+    """Invalida los ETag de los catálogos que muestran esta tabla (CondicionalGetMixin)"""
+    if raw:
+        return
+    versiones_service.registrar_cambio(sender)
+
+
+@receiver(post_save, sender=LineaProduccion)
+@receiver(post_save, sender=Sector)
+@receiver(post_save, sender=Equipo)
+@receiver(post_save, sender=Motor)
+@receiver(post_save, sender=Variador)
+@receiver(post_delete, sender=LineaProduccion)
+@receiver(post_delete, sender=Sector)
+@receiver(post_delete, sender=Equipo)
+@receiver(post_delete, sender=Motor)
+@receiver(post_delete, sender=Variador)
+def invalidar_jerarquia(sender, raw=False, **kwargs):
+    """El árbol de activos en caché muestra estas cinco tablas"""
+    if raw:
+        return
+    jerarquia_service.invalidar()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_autenticado(sender, instance, raw=False, **kwargs):
+    """El usuario en caché de CachedUserJWTAuthentication debe reflejar rol y activación"""
+    if raw:
+        return
+    invalidar_usuario(instance.pk)
@@ -0,0 +1,98 @@
+# api/sincronizacion_service.py
+"""
+Sincronización delta de los catálogos de activos de la app móvil.
+
+Motor, Variador y Equipo llevan updated_at (auto_now, indexado) y cada
+eliminación deja un RegistroEliminado. Con ?since=<cursor> la app recibe solo
+las filas modificadas y los ids eliminados desde ese cursor, más el cursor
+nuevo; sin since recibe la lista completa como GET condicional
+(mixins.SincronizacionDeltaMixin, versiones por tabla de versiones_service).
+
+- El cursor es el instante del servidor al empezar la consulta (epoch en µs).
+  La consulta siguiente se solapa MARGEN hacia atrás para no perder filas de
+  transacciones que confirmaron después de su updated_at; la app aplica los
+  cambios como upsert, así que repetir filas es inocuo.
+- Si el cursor es anterior a la retención de tombstones la respuesta pide una
+  resincronización completa (completo=True).
+- Los catálogos muestran nombres de equipo/sector/línea/depósito: renombrar o
+  eliminar uno de esos toca updated_at de los activos que lo referencian.
+- El delta no admite filtros de ubicación: un activo que sale del filtro no
+  aparecería como cambio ni como eliminado, así que la app filtra localmente.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+import logging
+
+from django.utils import timezone
+
+from .models import Motor, Variador, Equipo, RegistroEliminado
+from . import versiones_service
+
+logger = logging.getLogger(__name__)
+
+MODELOS = {'motor': Motor, 'variador': Variador, 'equipo': Equipo}
+MARGEN = timedelta(seconds=5)
+RETENCION_TOMBSTONES = timedelta(days=30)
+
+
+def modelo_sincronizable(modelo):
+    """Nombre de sincronización del modelo (None si no tiene tombstones)"""
+    for nombre, clase in MODELOS.items():
+        if clase is modelo:
+            return nombre
+    return None
+
+
+def codificar_cursor(instante):
+    return str(int(instante.timestamp() * 1_000_000))
+
+
+def decodificar_cursor(cursor):
+    """Instante del cursor; ValueError si no es válido"""
+    return datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+
+
+def registrar_eliminacion(modelo, objeto_id):
+    nombre = modelo_sincronizable(modelo)
+    if nombre:
+        RegistroEliminado.objects.create(modelo=nombre, objeto_id=objeto_id)
+
+
+def tocar_dependientes(instancia):
+    """Marca como modificados los activos que muestran el nombre de la ubicación `instancia`"""
+    ahora = timezone.now()
+    campo = {
+        'LineaProduccion': 'linea', 'Sector': 'sector', 'Equipo': 'equipo', 'Deposito': 'deposito',
+    }[type(instancia).__name__]
+    for modelo in (Motor, Variador):
+        if modelo.objects.filter(**{campo: instancia}).update(updated_at=ahora):
+            versiones_service.registrar_cambio(modelo)
+    if campo in ('linea', 'sector'):
+        filtro = {'sector': instancia} if campo == 'sector' else {'sector__linea': instancia}
+        if Equipo.objects.filter(**filtro).update(updated_at=ahora):
+            versiones_service.registrar_cambio(Equipo)
+
+
+def cambios_desde(nombre, queryset, since):
+    """
+    Delta del catálogo desde el cursor `since` (instante).
+    Devuelve (filas_modificadas_qs, ids_eliminados, cursor_nuevo, completo).
+    """
+    ahora = timezone.now()
+    cursor = codificar_cursor(ahora)
+    if since < ahora - RETENCION_TOMBSTONES:
+        return queryset, [], cursor, True
+
+    desde = since - MARGEN
+    modificadas = queryset.filter(updated_at__gte=desde)
+    eliminados = list(
+        RegistroEliminado.objects.filter(modelo=nombre, eliminado_en__gte=desde)
+        .values_list('objeto_id', flat=True).distinct()
+    )
+    return modificadas, eliminados, cursor, False
+
+
+def purgar_tombstones(ahora=None):
+    ahora = ahora or timezone.now()
+    eliminados, _ = RegistroEliminado.objects.filter(eliminado_en__lt=ahora - RETENCION_TOMBSTONES).delete()
+    logger.info(f"Tombstones de sincronización eliminados: {eliminados}")
+    return eliminados
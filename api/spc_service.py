@@ -0,0 +1,199 @@
+# api/spc_service.py
+"""
+Control estadístico de procesos (SPC) para VariableInspeccion.
+
+Por variable se toman los últimos VENTANA resultados en orden cronológico y se
+agrupan en subgrupos consecutivos de TAMANO_SUBGRUPO lecturas:
+
+- Gráfico X-bar/R: X̿ ± A2·R̄ y [D3·R̄, D4·R̄]
+- Capacidad: σ = R̄/d2, límites de especificación valor_referencia ± tolerancia
+  Cp = (LSE - LIE) / 6σ,  Cpk = min(LSE - X̿, X̿ - LIE) / 3σ
+- Reglas Western Electric sobre las medias de subgrupo (zonas de 1, 2 y 3 σ_x̄)
+
+Los historiales se leen en bloque (una consulta con ROW_NUMBER por variable) y
+se calculan con NumPy; el resultado queda en CapacidadVariable y solo se
+recalculan las variables con resultados nuevos desde la última pasada.
+"""
+import logging
+
+import numpy as np
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import ResultadoInspeccion, VariableInspeccion, CapacidadVariable
+
+logger = logging.getLogger(__name__)
+
+TAMANO_SUBGRUPO = 5
+VENTANA = 125  # 25 subgrupos
+MIN_SUBGRUPOS = 2
+
+# Constantes de gráficos de control para n = 5
+A2, D3, D4, d2 = 0.577, 0.0, 2.114, 2.326
+
+REGLAS = ('regla_1', 'regla_2', 'regla_3', 'regla_4')
+
+
+def _ventanas(valores, n):
+    if len(valores) < n:
+        return np.empty((0, n))
+    return np.lib.stride_tricks.sliding_window_view(valores, n)
+
+
+def reglas_western_electric(medias, centro, sigma_x):
+    """
+    Devuelve {regla: índices de subgrupo donde se detecta la violación}.
+
+    1: un punto fuera de 3σ
+    2: 2 de 3 consecutivos fuera de 2σ del mismo lado
+    3: 4 de 5 consecutivos fuera de 1σ del mismo lado
+    4: 8 consecutivos del mismo lado de la línea central
+    """
+    if sigma_x <= 0:
+        return {regla: [] for regla in REGLAS}
+    z = (np.asarray(medias, dtype=float) - centro) / sigma_x
+
+    def racha(condicion_alta, condicion_baja, ventana, minimo):
+        altas = _ventanas(condicion_alta.astype(int), ventana).sum(axis=1) >= minimo
+        bajas = _ventanas(condicion_baja.astype(int), ventana).sum(axis=1) >= minimo
+        # Se informa el último punto de cada ventana que dispara la regla
+        return (np.flatnonzero(altas | bajas) + ventana - 1).tolist()
+
+    return {
+        'regla_1': np.flatnonzero(np.abs(z) > 3).tolist(),
+        'regla_2': racha(z > 2, z < -2, 3, 2),
+        'regla_3': racha(z > 1, z < -1, 5, 4),
+        'regla_4': racha(z > 0, z < 0, 8, 8),
+    }
+
+
+def calcular_capacidad(valores, valor_referencia, tolerancia):
+    """Indicadores SPC para una serie cronológica de valores (None si no alcanza)"""
+    valores = np.asarray(valores, dtype=float)
+    cantidad_subgrupos = len(valores) // TAMANO_SUBGRUPO
+    if cantidad_subgrupos < MIN_SUBGRUPOS:
+        return None
+
+    # Subgrupos completos más recientes
+    subgrupos = valores[len(valores) - cantidad_subgrupos * TAMANO_SUBGRUPO:].reshape(-1, TAMANO_SUBGRUPO)
+    medias = subgrupos.mean(axis=1)
+    rangos = subgrupos.max(axis=1) - subgrupos.min(axis=1)
+
+    centro = float(medias.mean())
+    rango_medio = float(rangos.mean())
+    sigma = rango_medio / d2
+    lie, lse = valor_referencia - tolerancia, valor_referencia + tolerancia
+
+    if sigma > 0:
+        cp = (lse - lie) / (6 * sigma)
+        cpk = min(lse - centro, centro - lie) / (3 * sigma)
+    else:
+        cp = cpk = None
+
+    violaciones = reglas_western_electric(medias, centro, A2 * rango_medio / 3)
+    return {
+        'muestras': int(len(valores)),
+        'subgrupos': int(cantidad_subgrupos),
+        'media': centro,
+        'rango_medio': rango_medio,
+        'sigma': sigma,
+        'lcl_x': centro - A2 * rango_medio,
+        'ucl_x': centro + A2 * rango_medio,
+        'lcl_r': D3 * rango_medio,
+        'ucl_r': D4 * rango_medio,
+        'cp': cp,
+        'cpk': cpk,
+        'medias': medias.tolist(),
+        'rangos': rangos.tolist(),
+        'violaciones': violaciones,
+    }
+
+
+def cargar_historiales(variable_ids):
+    """{variable_id: np.array de los últimos VENTANA valores en orden cronológico}"""
+    filas = ResultadoInspeccion.objects.filter(variable_id__in=variable_ids).annotate(
+        n=Window(RowNumber(), partition_by=[F('variable_id')], order_by=[F('fecha').desc(), F('id').desc()])
+    ).filter(n__lte=VENTANA).values_list('variable_id', 'valor_medido', 'n')
+
+    if not filas:
+        return {}
+    datos = np.array(list(filas), dtype=float)
+    # Orden por variable y cronológico (n descendente = más antiguo primero)
+    datos = datos[np.lexsort((-datos[:, 2], datos[:, 0]))]
+    ids, inicios = np.unique(datos[:, 0], return_index=True)
+    return {
+        int(variable_id): serie
+        for variable_id, serie in zip(ids, np.split(datos[:, 1], inicios[1:]))
+    }
+
+
+def _variables_pendientes():
+    """Variables con resultados registrados después de su último cálculo"""
+    return list(
+        VariableInspeccion.objects.filter(estadistica__isnull=False).filter(
+            Q(capacidad__isnull=True) | Q(estadistica__actualizado__gt=F('capacidad__actualizado'))
+        ).values_list('id', flat=True)
+    )
+
+
+def actualizar_capacidades(completo=False, variable_ids=None):
+    """Recalcula CapacidadVariable (todas, las indicadas o solo las pendientes)"""
+    if variable_ids is None:
+        variable_ids = (
+            list(VariableInspeccion.objects.values_list('id', flat=True)) if completo
+            else _variables_pendientes()
+        )
+    if not variable_ids:
+        return 0
+
+    marca = timezone.now()
+    historiales = cargar_historiales(variable_ids)
+    variables = VariableInspeccion.objects.in_bulk(variable_ids)
+
+    capacidades = []
+    for variable_id, variable in variables.items():
+        serie = historiales.get(variable_id, np.empty(0))
+        resultado = calcular_capacidad(serie, variable.valor_referencia, variable.tolerancia)
+        capacidad = CapacidadVariable(variable_id=variable_id, muestras=len(serie), actualizado=marca)
+        if resultado:
+            conteo = {regla: len(indices) for regla, indices in resultado['violaciones'].items()}
+            for campo in ('subgrupos', 'media', 'rango_medio', 'sigma', 'lcl_x', 'ucl_x',
+                          'lcl_r', 'ucl_r', 'cp', 'cpk'):
+                setattr(capacidad, campo, resultado[campo])
+            capacidad.violaciones = conteo
+            capacidad.total_violaciones = sum(conteo.values())
+        capacidades.append(capacidad)
+
+    CapacidadVariable.objects.bulk_create(
+        capacidades,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['variable'],
+        update_fields=[
+            'muestras', 'subgrupos', 'media', 'rango_medio', 'sigma', 'lcl_x', 'ucl_x',
+            'lcl_r', 'ucl_r', 'cp', 'cpk', 'violaciones', 'total_violaciones', 'actualizado',
+        ],
+    )
+    logger.info(f"Capacidad SPC actualizada para {len(capacidades)} variables")
+    return len(capacidades)
+
+
+def ranking_capacidad(ruta_id=None, limite=10):
+    """Variables con peor Cpk primero (las que no tienen datos suficientes quedan fuera)"""
+    qs = CapacidadVariable.objects.filter(cpk__isnull=False).select_related('variable__ruta')
+    if ruta_id:
+        qs = qs.filter(variable__ruta_id=ruta_id)
+    return qs.order_by('cpk', '-total_violaciones')[:limite]
+
+
+def grafico_control(variable):
+    """Datos del gráfico X-bar/R de una variable (consulta acotada a VENTANA resultados)"""
+    serie = cargar_historiales([variable.id]).get(variable.id, np.empty(0))
+    resultado = calcular_capacidad(serie, variable.valor_referencia, variable.tolerancia)
+    if resultado is None:
+        return {'variable': variable.id, 'muestras': len(serie), 'subgrupos': 0}
+    resultado['variable'] = variable.id
+    resultado['lie'] = variable.valor_referencia - variable.tolerancia
+    resultado['lse'] = variable.valor_referencia + variable.tolerancia
+    return resultado
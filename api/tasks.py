@@ -15,33 +15,62 @@ logger = logging.getLogger(__name__)
 # ==================== TAREAS PRINCIPALES ====================
 
 @shared_task
-def verificar_mantenimientos_preventivos():
-    """Verifica y notifica mantenimientos preventivos próximos"""
+def verificar_mantenimientos_preventivos(dias=7):
+    """Envía a cada técnico un resumen de los equipos con mantenimiento próximo"""
     try:
         service = NotificationService()
         hoy = timezone.now().date()
         
-        # Verificar motores
-        motores = Motor.objects.filter(proximo_mantenimiento__isnull=False, estado='operativo')
-        for motor in motores:
-            dias_restantes = (motor.proximo_mantenimiento - hoy).days
-            if 0 <= dias_restantes <= 7:
-                service.notificar_mantenimiento_preventivo('motor', motor.pk, dias_restantes)
+        # Una consulta por rango (indexada) sobre proximo_mantenimiento por clase de equipo
+        equipos = []
+        for equipo_tipo, modelo in (('motor', Motor), ('variador', Variador)):
+            filas = modelo.objects.filter(
+                estado='operativo', proximo_mantenimiento__range=(hoy, hoy + timedelta(days=dias))
+            ).values_list('id', 'codigo', 'proximo_mantenimiento')
+            equipos.extend(
+                {'equipo_tipo': equipo_tipo, 'equipo_id': pk, 'codigo': codigo,
+                 'dias_restantes': (proximo - hoy).days}
+                for pk, codigo, proximo in filas
+            )
+        equipos.sort(key=lambda e: (e['dias_restantes'], e['codigo']))
         
-        # Verificar variadores
-        variadores = Variador.objects.filter(proximo_mantenimiento__isnull=False, estado='operativo')
-        for variador in variadores:
-            dias_restantes = (variador.proximo_mantenimiento - hoy).days
-            if 0 <= dias_restantes <= 7:
-                service.notificar_mantenimiento_preventivo('variador', variador.pk, dias_restantes)
+        tecnicos = service.notificar_resumen_preventivo(equipos, dias_ventana=dias)
         
-        logger.info(f"✅ Mantenimientos preventivos verificados: {len(motores)} motores, {len(variadores)} variadores")
-        return f"Procesados {len(motores)} motores y {len(variadores)} variadores"
+        logger.info(f"✅ Mantenimientos preventivos verificados: {len(equipos)} equipos por vencer, {tecnicos} técnicos notificados")
+        return f"{len(equipos)} equipos por vencer, {tecnicos} técnicos notificados"
     
     except Exception as e:
         logger.error(f"❌ Error en verificar_mantenimientos_preventivos: {e}")
         raise
 
+@shared_task
+def generar_ordenes_preventivas():
+    """Genera en bloque las órdenes de los planes preventivos que entran en su ventana"""
+    try:
+        from .programacion_service import generar_ordenes_preventivas as generar
+
+        total = generar()
+        logger.info(f"✅ Órdenes preventivas generadas: {total}")
+        return f"Generadas {total} órdenes"
+
+    except Exception as e:
+        logger.error(f"❌ Error en generar_ordenes_preventivas: {e}")
+        raise
+
+@shared_task
+def reconciliar_contadores_notificaciones():
+    """Corrige la deriva de los contadores de notificaciones no leídas en caché"""
+    try:
+        from .contadores_service import reconciliar
+
+        corregidos = reconciliar()
+        logger.info(f"✅ Contadores de no leídas reconciliados: {corregidos} corregidos")
+        return f"Corregidos {corregidos} contadores"
+
+    except Exception as e:
+        logger.error(f"❌ Error en reconciliar_contadores_notificaciones: {e}")
+        raise
+
 @shared_task
 def recordatorios_ordenes_pendientes():
     """Envía recordatorios de órdenes pendientes"""
@@ -72,57 +101,60 @@ def recordatorios_ordenes_pendientes():
         logger.error(f"❌ Error en recordatorios_ordenes_pendientes: {e}")
         raise
 
-#@shared_task
-#def reintentar_notificaciones_fallidas():
-#    """Reintenta enviar notificaciones que fallaron anteriormente"""
-#    try:
-#        service = NotificationService()
-#        notificaciones_fallidas = NotificacionApp.objects.filter(
-#            enviada_push=False,
-#            intentos_envio__lt=3,
-#            fecha_creacion__gte=timezone.now() - timedelta(hours=24)
-#        )
-#        for notificacion in notificaciones_fallidas:
- #           service.enviar_notificacion_individual(
-  #              usuario_id=notificacion.usuario_id,
-   #             titulo=notificacion.titulo,
-    #            mensaje=notificacion.mensaje,
-     #           tipo=notificacion.tipo,
-      #          prioridad=notificacion.prioridad,
-       #         data_adicional=notificacion.data_adicional,
-        #        relacion_id=notificacion.relacion_id,
-         #       relacion_tipo=notificacion.relacion_tipo
-          #  )
-        #
-#        logger.info(f"✅ Reintentadas {len(notificaciones_fallidas)} notificaciones")
- #       return f"Reintentadas {len(notificaciones_fallidas)} notificaciones"
-    
-  #  except Exception as e:
-   #     logger.error(f"❌ Error en reintentar_notificaciones_fallidas: {e}")
-    #    raise
+@shared_task
+def reintentar_notificaciones_fallidas():
+    """Reenvía las notificaciones push cuyo próximo intento (backoff exponencial) ya venció"""
+    try:
+        resumen = NotificationService().reintentar_fallidas()
+        logger.info(f"✅ Reintentadas {resumen['reintentadas']} notificaciones ({resumen['enviadas']} enviadas)")
+        return resumen
+
+    except Exception as e:
+        logger.error(f"❌ Error en reintentar_notificaciones_fallidas: {e}")
+        raise
 
 @shared_task
 def limpiar_dispositivos_inactivos():
-    """Limpia dispositivos marcados como inactivos por mucho tiempo"""
+    """Elimina los DispositivoApp desactivados o que la app dejó de renovar"""
     try:
-        from .models import Dispositivo
-        limite_tiempo = timezone.now() - timedelta(days=30)
-        
-        dispositivos_inactivos = Dispositivo.objects.filter(
-            estado='inactivo',
-            updated_at__lte=limite_tiempo
-        )
-        
-        count = dispositivos_inactivos.count()
-        dispositivos_inactivos.delete()
-        
-        logger.info(f"✅ Limpiados {count} dispositivos inactivos")
-        return f"Eliminados {count} dispositivos inactivos"
+        from .retencion_service import purgar_dispositivos
+
+        resultado = purgar_dispositivos()
+        logger.info(f"✅ Limpiados {resultado['inactivos'] + resultado['sin_uso']} dispositivos")
+        return resultado
     
     except Exception as e:
         logger.error(f"❌ Error en limpiar_dispositivos_inactivos: {e}")
         raise
 
+@shared_task
+def purgar_notificaciones_antiguas():
+    """Archiva y elimina en lotes las notificaciones fuera del período de retención"""
+    try:
+        from .retencion_service import purgar_notificaciones
+
+        resultado = purgar_notificaciones()
+        logger.info(f"✅ Notificaciones eliminadas: {resultado['leidas']} leídas, {resultado['no_leidas']} no leídas")
+        return resultado
+
+    except Exception as e:
+        logger.error(f"❌ Error en purgar_notificaciones_antiguas: {e}")
+        raise
+
+@shared_task
+def purgar_registros_eliminados():
+    """Elimina los tombstones de sincronización más antiguos que su retención"""
+    try:
+        from .sincronizacion_service import purgar_tombstones
+
+        total = purgar_tombstones()
+        logger.info(f"✅ Tombstones de sincronización eliminados: {total}")
+        return f"Eliminados {total} tombstones"
+
+    except Exception as e:
+        logger.error(f"❌ Error en purgar_registros_eliminados: {e}")
+        raise
+
 @shared_task
 def crear_reunion_diaria():
     """Crea la reunión diaria automáticamente"""
@@ -222,6 +254,50 @@ def crear_orden_desde_incidencia_critica(incidencia_id):
         logger.error(f"❌ Error creando orden desde incidencia {incidencia_id}: {e}")
         raise
 
+@shared_task
+def actualizar_indicadores_confiabilidad(completo=False):
+    """Recalcula MTBF/MTTR de los activos con eventos nuevos (o de todos si completo)"""
+    try:
+        from .confiabilidad_service import actualizar_indicadores
+
+        total = actualizar_indicadores(completo=completo)
+        logger.info(f"✅ Indicadores de confiabilidad actualizados: {total} activos")
+        return f"Actualizados {total} activos"
+
+    except Exception as e:
+        logger.error(f"❌ Error en actualizar_indicadores_confiabilidad: {e}")
+        raise
+
+@shared_task
+def actualizar_capacidad_spc(completo=False):
+    """Recalcula Cp/Cpk y límites de control de las variables con resultados nuevos"""
+    try:
+        from .spc_service import actualizar_capacidades
+
+        total = actualizar_capacidades(completo=completo)
+        logger.info(f"✅ Capacidad SPC actualizada: {total} variables")
+        return f"Actualizadas {total} variables"
+
+    except Exception as e:
+        logger.error(f"❌ Error en actualizar_capacidad_spc: {e}")
+        raise
+
+@shared_task
+def ejecutar_mantenimiento_predictivo(completo=False):
+    """Puntúa con el modelo predictivo las variables con resultados nuevos (o todas)"""
+    try:
+        from .predictivo_service import ejecutar_prediccion
+
+        resultado = ejecutar_prediccion(completo=completo)
+        logger.info(
+            f"✅ Predictivo: {resultado['variables']} variables puntuadas, {resultado['alertas']} alertas"
+        )
+        return resultado
+
+    except Exception as e:
+        logger.error(f"❌ Error en ejecutar_mantenimiento_predictivo: {e}")
+        raise
+
 # ==================== TAREAS DE PRUEBA ====================
 
 @shared_task(bind=True, max_retries=3)
@@ -0,0 +1,163 @@
+# api/tiempo_real_service.py
+"""
+Detección en línea de caídas y detenciones de producción sobre ProduccionTiempoReal.
+
+Los snapshots de Node-RED traen métricas acumuladas del turno. Por cada línea se
+guarda en caché (Redis) el último snapshot y, por métrica, una línea base EWMA
+de la tasa horaria. Cada muestra nueva hace O(1) trabajo y ninguna lectura de la
+base de datos:
+
+- tasa = Δvalor / Δt del snapshot anterior (por hora)
+- caída: CONSECUTIVAS muestras con tasa < UMBRAL_CAIDA × base
+- detención: sin avance del acumulado durante MINUTOS_DETENCION
+- recuperación: tasa >= RECUPERACION × base (sin alerta, rearma la detección)
+
+El estado se reinicia al cambiar turno/fecha o si el acumulado retrocede.
+Las alertas generan un Evento tipo 'linea' y una notificación a supervisores.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Evento, ProduccionTiempoReal
+
+logger = logging.getLogger(__name__)
+
+METRICAS = {
+    'bandejas': 'bandejas',
+    'fabricacion_toneladas': 'toneladas fabricadas',
+}
+ALFA = 0.2
+MIN_MUESTRAS = 3
+UMBRAL_CAIDA = 0.5
+CONSECUTIVAS = 2
+RECUPERACION = 0.8
+MINUTOS_DETENCION = 10
+ESTADO_TTL = 60 * 60 * 12
+
+
+def _clave(linea_id):
+    return f"tiempo_real:detector:{linea_id}"
+
+
+def _evaluar_metrica(estado, valor, anterior, ts, dt):
+    """Actualiza el estado de una métrica y devuelve el tipo de alerta (o None)"""
+    if anterior is None or valor < anterior:
+        estado.update(base=None, n=0, bajas=0, ultimo_avance=ts, condicion='normal')
+        return None
+
+    if valor > anterior:
+        estado['ultimo_avance'] = ts
+    tasa = (valor - anterior) / dt * 3600
+    estado['tasa'] = tasa
+
+    base = estado['base']
+    if estado['n'] < MIN_MUESTRAS or not base:
+        # Calentamiento: solo se aprende la línea base
+        estado['base'] = tasa if base is None else ALFA * tasa + (1 - ALFA) * base
+        estado['n'] += 1
+        return None
+
+    if tasa < base * UMBRAL_CAIDA:
+        estado['bajas'] += 1
+    else:
+        estado['bajas'] = 0
+        estado['base'] = ALFA * tasa + (1 - ALFA) * base
+
+    if ts - estado['ultimo_avance'] >= MINUTOS_DETENCION * 60:
+        if estado['condicion'] != 'detenida':
+            estado['condicion'] = 'detenida'
+            return 'detencion'
+    elif estado['bajas'] >= CONSECUTIVAS:
+        if estado['condicion'] == 'normal':
+            estado['condicion'] = 'caida'
+            return 'caida'
+    elif estado['condicion'] != 'normal' and tasa >= base * RECUPERACION:
+        estado['condicion'] = 'normal'
+    return None
+
+
+def procesar_muestra(linea_id, turno_id, fecha, timestamp, valores):
+    """
+    Incorpora un snapshot acumulado de la línea y devuelve las alertas disparadas:
+    [{'metrica', 'tipo', 'tasa', 'base'}]
+    """
+    clave = _clave(linea_id)
+    ts = timestamp.timestamp()
+    periodo = [turno_id, str(fecha)]
+    estado = cache.get(clave)
+
+    if not estado or estado['periodo'] != periodo:
+        estado = {'periodo': periodo, 'ts': None, 'valores': {}, 'metricas': {}}
+    elif ts <= estado['ts']:
+        # Muestra repetida o fuera de orden
+        return []
+
+    alertas = []
+    dt = ts - estado['ts'] if estado['ts'] is not None else None
+    for metrica in METRICAS:
+        valor = valores.get(metrica)
+        if valor is None:
+            continue
+        metrica_estado = estado['metricas'].setdefault(metrica, {})
+        anterior = estado['valores'].get(metrica) if dt else None
+        tipo = _evaluar_metrica(metrica_estado, valor, anterior, ts, dt)
+        estado['valores'][metrica] = valor
+        if tipo:
+            alertas.append({
+                'metrica': metrica,
+                'tipo': tipo,
+                'tasa': metrica_estado['tasa'],
+                'base': metrica_estado['base'],
+            })
+
+    estado['ts'] = ts
+    cache.set(clave, estado, ESTADO_TTL)
+    return alertas
+
+
+def _descripcion(nombre_linea, alertas):
+    partes = []
+    for alerta in alertas:
+        metrica = METRICAS[alerta['metrica']]
+        if alerta['tipo'] == 'detencion':
+            partes.append(f"sin avance de {metrica} en {MINUTOS_DETENCION} min")
+        else:
+            partes.append(
+                f"caída de {metrica}: {alerta['tasa']:.1f}/h (base {alerta['base']:.1f}/h)"
+            )
+    return f"Producción en tiempo real, línea {nombre_linea}: " + '; '.join(partes)
+
+
+def registrar_muestra(instancia):
+    """Procesa un ProduccionTiempoReal recién creado; crea Evento y notifica si hay alertas"""
+    try:
+        alertas = procesar_muestra(
+            instancia.linea_id,
+            instancia.turno_id,
+            instancia.fecha,
+            instancia.timestamp,
+            {metrica: getattr(instancia, metrica) for metrica in METRICAS},
+        )
+    except Exception as e:
+        # Si la caché no responde se pierde la detección, nunca la muestra
+        logger.error(f"Error en detector de tiempo real (línea {instancia.linea_id}): {e}")
+        return []
+
+    if not alertas:
+        return []
+
+    nombre = instancia.linea.nombre if ProduccionTiempoReal.linea.is_cached(instancia) else f"#{instancia.linea_id}"
+    descripcion = _descripcion(nombre, alertas)
+    Evento.objects.create(tipo='linea', descripcion=descripcion, usuario=None, objeto_id=instancia.linea_id)
+
+    def notificar():
+        from .notification_service import NotificationService
+        NotificationService().notificar_anomalia_produccion(
+            instancia.linea_id, descripcion, alertas, supervisor_id=instancia.supervisor_id
+        )
+    transaction.on_commit(notificar)
+
+    logger.warning(f"⚠️ {descripcion}")
+    return alertas
@@ -40,12 +40,14 @@ router.register(r'fallas-turno', FallaTurnoViewSet, basename='fallaturno')
 router.register(r'paradas-turno', ParadaTurnoViewSet, basename='paradaturno') 
 router.register(r'node-red-logs', NodeRedLogViewSet)
 urlpatterns = [
+    # Antes del router: si no, notificaciones/<pk>/ captura 'conteo-no-leidas'
+    path('notificaciones/conteo-no-leidas/', NotificacionesViewSet.as_view({'get': 'conteo_no_leidas'}), name='notificaciones-conteo-no-leidas'),
     path('', include(router.urls)),
     path('user-info/', views.user_info, name='user-info'),
-    path('notificaciones/conteo-no-leidas/', NotificacionesViewSet.as_view({'get': 'conteo_no_leidas'}), name='notificaciones-conteo-no-leidas'),
     path('buscar/', BusquedaGlobalView.as_view()),
     path('upload/<str:model_type>/<int:pk>/', UploadFileView.as_view()),
     path('mobile/motores/', MobileMotorList.as_view()),
+    path('jerarquia/', JerarquiaActivosView.as_view(), name='jerarquia-activos'),
     path('mobile/mis-ordenes/', MobileOrdenesAsignadas.as_view()),
     #path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('simple-login/', SimpleLoginView.as_view(), name='simple_login'),
@@ -59,9 +61,14 @@ urlpatterns = [
          name='finalizar-inspeccion'),
     path('dashboard/supervisor/', DashboardSupervisorView.as_view(), name='dashboard-supervisor'),
     path('dashboard/supervisor/variables-top/', DashboardSupervisorVariablesTopView.as_view(), name='dashboard-variables-top'),
+    path('dashboard/supervisor/capacidad/', DashboardSupervisorCapacidadView.as_view(), name='dashboard-capacidad'),
     path('dashboard/supervisor/activos-criticos/', DashboardSupervisorActivosCriticosView.as_view(), name='dashboard-activos-criticos'),
+    path('dashboard/supervisor/confiabilidad/', ConfiabilidadActivosView.as_view(), name='dashboard-confiabilidad'),
+    path('dashboard/supervisor/confiabilidad/lineas/', ConfiabilidadLineasView.as_view(), name='dashboard-confiabilidad-lineas'),
     path('dashboard/supervisor/alertas-recientes/', DashboardSupervisorAlertasRecientesView.as_view(), name='dashboard-alertas-recientes'),
     path('dashboard/kpi-inspecciones/', KpiInspeccionesView.as_view(), name='kpi-inspecciones'),
+    path('kpi/oee/', KpiOEEView.as_view(), name='kpi-oee'),
+    path('kpi/detenciones/', KpiDetencionesView.as_view(), name='kpi-detenciones'),
 
 
     path('api/node-red/produccion/', views.node_red_produccion, name='node_red_produccion'),
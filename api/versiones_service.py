@@ -0,0 +1,87 @@
+# api/versiones_service.py
+"""
+Versión por tabla en caché (Redis) para GET condicionales.
+
+Cada modelo de catálogo tiene un contador que las señales post_save /
+post_delete incrementan; el ETag de una vista es el hash de las versiones de
+las tablas que muestra más la URL pedida, así que responder 304 cuesta una
+lectura de caché y ninguna consulta.
+
+- El contador se incrementa al guardar y otra vez al confirmar la transacción:
+  un lector que tome la versión nueva antes del commit todavía vería los datos
+  viejos, y el segundo incremento invalida ese ETag.
+- Un contador que falta (Redis reiniciado) arranca en el instante actual en
+  ms, de modo que no vuelve a producir un ETag ya entregado.
+- Los update()/bulk_* no disparan señales: quien los use sobre estas tablas
+  debe llamar a registrar_cambio.
+- Si la caché no responde el guardado sigue adelante y las vistas responden
+  sin ETag (etag() devuelve None).
+"""
+from datetime import datetime, timezone as dt_timezone
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _clave(modelo):
+    return f"version_tabla:{modelo._meta.label_lower}"
+
+
+def _clave_marca(modelo):
+    return f"version_tabla:{modelo._meta.label_lower}:marca"
+
+
+def _inicial():
+    return int(time.time() * 1000)
+
+
+def incrementar(modelo):
+    try:
+        try:
+            cache.incr(_clave(modelo))
+        except ValueError:
+            cache.add(_clave(modelo), _inicial(), timeout=None)
+        cache.set(_clave_marca(modelo), time.time(), timeout=None)
+    except Exception as e:
+        logger.warning(f"No se pudo incrementar la versión de {modelo._meta.label_lower}: {e}")
+
+
+def registrar_cambio(modelo):
+    incrementar(modelo)
+    transaction.on_commit(lambda: incrementar(modelo))
+
+
+def versiones(modelos):
+    """{label: versión} en una lectura de caché (inicializa las que falten)"""
+    claves = {_clave(modelo): modelo for modelo in modelos}
+    valores = cache.get_many(list(claves))
+    for clave in set(claves) - set(valores):
+        cache.add(clave, _inicial(), timeout=None)
+        valores[clave] = cache.get(clave)
+    return {claves[clave]._meta.label_lower: valor for clave, valor in valores.items()}
+
+
+def ultima_modificacion(modelos):
+    """Instante del último cambio registrado en cualquiera de las tablas (None si no hay)"""
+    try:
+        marcas = [m for m in cache.get_many([_clave_marca(modelo) for modelo in modelos]).values() if m]
+    except Exception:
+        return None
+    return datetime.fromtimestamp(max(marcas), tz=dt_timezone.utc) if marcas else None
+
+
+def etag(modelos, *variantes):
+    """ETag de la combinación de versiones y variantes (None si la caché no responde)"""
+    try:
+        actuales = versiones(modelos)
+    except Exception as e:
+        logger.warning(f"Versiones de tabla no disponibles: {e}")
+        return None
+    firma = ':'.join(f"{label}={valor}" for label, valor in sorted(actuales.items()))
+    firma += '|' + '|'.join(str(v) for v in variantes)
+    return f'"{hashlib.md5(firma.encode()).hexdigest()}"'
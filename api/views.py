@@ -2,6 +2,7 @@ import os
 import logging
 import re
 from .filters import OrdenMantenimientoFilter
+from .mixins import CamposDispersosMixin, CondicionalGetMixin, SincronizacionDeltaMixin
 
 from rest_framework import viewsets, status, filters, mixins
 from rest_framework.response import Response
@@ -17,11 +18,14 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework.parsers import MultiPartParser, JSONParser
+from rest_framework.parsers import MultiPartParser
+from .parsers import ORJSONParser
+from .authentication import cachear_usuario
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import F, Count, Avg
 from django.db.models.functions import Abs
 from django.utils import timezone
+from django.conf import settings
 from datetime import timedelta
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.permissions import AllowAny
@@ -94,7 +98,8 @@ def node_red_auth(request):
     
     user = authenticate(username=username, password=password)
     if user:
-        token = AccessToken.for_user(user)
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        cachear_usuario(user)
         return Response({
             'access_token': str(token),
             'user_id': user.id,
@@ -130,8 +135,9 @@ class SimpleLoginView(APIView):
         user = authenticate(username=username, password=password)
         
         if user is not None and user.is_active:
-            # Generar tokens JWT
-            refresh = RefreshToken.for_user(user)
+            # Generar tokens JWT (con username/role/email como claims)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
+            cachear_usuario(user)
             
             return Response({
                 'success': True,
@@ -164,37 +170,42 @@ class FirstAccessView(APIView):
     def get(self, request):
         return Response({"message": "Primer acceso exitoso"})
 
-class LineaProduccionViewSet(viewsets.ModelViewSet):
+class LineaProduccionViewSet(CondicionalGetMixin, viewsets.ModelViewSet):
     queryset = LineaProduccion.objects.all()
     serializer_class = LineaProduccionSerializer
     filter_backends = [DjangoFilterBackend]
     
 
-class SectorViewSet(viewsets.ModelViewSet):
+class SectorViewSet(CondicionalGetMixin, viewsets.ModelViewSet):
     queryset = Sector.objects.all()
+    tablas_version = [Sector, LineaProduccion]
     serializer_class = SectorSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['linea']  # Filtra por el campo 'linea' (ForeignKey)
     
 
-class EquipoViewSet(viewsets.ModelViewSet):
+class EquipoViewSet(CamposDispersosMixin, SincronizacionDeltaMixin, viewsets.ModelViewSet):
+    sincronizacion_modelo = 'equipo'
     queryset = Equipo.objects.all()
+    tablas_version = [Equipo, Sector, LineaProduccion]
     serializer_class = EquipoSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['sector']  # Filtra por el campo 'sector' (ForeignKey)
     
 
-class DepositoViewSet(viewsets.ModelViewSet):
+class DepositoViewSet(CondicionalGetMixin, viewsets.ModelViewSet):
     queryset = Deposito.objects.all()
     serializer_class = DepositoSerializer
     filter_backends = [DjangoFilterBackend]
     
 
-class MotorViewSet(viewsets.ModelViewSet):
+class MotorViewSet(CamposDispersosMixin, SincronizacionDeltaMixin, viewsets.ModelViewSet):
+    sincronizacion_modelo = 'motor'
     queryset = Motor.objects.all()
+    tablas_version = [Motor, Equipo, Sector, LineaProduccion, Deposito]
     serializer_class = MotorSerializer
     filterset_fields = ['ubicacion_tipo', 'linea', 'sector', 'equipo']
-    parser_classes = [JSONParser, MultiPartParser]
+    parser_classes = [ORJSONParser, MultiPartParser]
 
     def perform_create(self, serializer):
         serializer.save(creado_por=self.request.user)
@@ -288,7 +299,8 @@ class MotorViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Error interno del servidor'},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-class VariadorViewSet(viewsets.ModelViewSet):
+class VariadorViewSet(CamposDispersosMixin, SincronizacionDeltaMixin, viewsets.ModelViewSet):
+    sincronizacion_modelo = 'variador'
     queryset = Variador.objects.all()
     serializer_class = VariadorSerializer
     permission_classes = [IsAuthenticated, IsTecnicoOrReadOnly]
@@ -310,8 +322,9 @@ class VariadorViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(creado_por=self.request.user)
 
-class ProveedorViewSet(viewsets.ModelViewSet):
+class ProveedorViewSet(CamposDispersosMixin, CondicionalGetMixin, viewsets.ModelViewSet):
     queryset = Proveedor.objects.all().prefetch_related('reparacion_set')
+    tablas_version = [Proveedor, Reparacion]
     serializer_class = ProveedorSerializer
     permission_classes = [IsAuthenticated, IsSupervisorOrAdmin]
     filterset_fields = ['especialidad']
@@ -320,7 +333,7 @@ class ProveedorViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class ReparacionViewSet(viewsets.ModelViewSet):
+class ReparacionViewSet(CamposDispersosMixin, viewsets.ModelViewSet):
     queryset = Reparacion.objects.all().select_related('proveedor', 'creado_por')
     serializer_class = ReparacionSerializer
     permission_classes = [IsAuthenticated, IsTecnicoOrReadOnly]
@@ -342,7 +355,7 @@ class ReparacionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(creado_por=self.request.user)
 
-class OrdenMantenimientoViewSet(viewsets.ModelViewSet):
+class OrdenMantenimientoViewSet(CamposDispersosMixin, viewsets.ModelViewSet):
     queryset = OrdenMantenimiento.objects.all()
     serializer_class = OrdenMantenimientoSerializer
     permission_classes = [IsAuthenticated]
@@ -352,7 +365,34 @@ class OrdenMantenimientoViewSet(viewsets.ModelViewSet):
     filterset_class = OrdenMantenimientoFilter  # Usar el filtro personalizado
 
     def perform_create(self, serializer):
-        serializer.save(creado_por=self.request.user)
+        extra = {}
+        if getattr(settings, 'ASIGNACION_AUTOMATICA_ORDENES', False) and not serializer.validated_data.get('operario_asignado'):
+            from .asignacion_service import elegir_tecnico
+            tecnico_id = elegir_tecnico(serializer.validated_data.get('tiempo_estimado'))
+            if tecnico_id:
+                extra = {'operario_asignado_id': tecnico_id, 'estado': 'asignada'}
+        serializer.save(creado_por=self.request.user, **extra)
+
+    @action(detail=False, methods=['post'], url_path='auto-asignar',
+            permission_classes=[IsAuthenticated, IsSupervisorOrAdmin])
+    def auto_asignar(self, request):
+        """Asigna en lote las órdenes pendientes al técnico con menor carga abierta"""
+        from .asignacion_service import asignar_ordenes
+
+        orden_ids = request.data.get('ordenes')
+        tecnico_ids = request.data.get('tecnicos')
+        for ids in (orden_ids, tecnico_ids):
+            if ids is not None and (not isinstance(ids, list) or
+                                    not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+                return Response({'error': 'ordenes y tecnicos deben ser listas de IDs'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        asignaciones, cola = asignar_ordenes(orden_ids, tecnico_ids, usuario=request.user)
+        return Response({
+            'asignadas': len(asignaciones),
+            'asignaciones': [{'orden': orden.id, 'operario_asignado': tecnico_id} for orden, tecnico_id in asignaciones],
+            'cargas': cola.cargas(),
+        })
     
     def perform_update(self, serializer):
         instance = serializer.save()
@@ -432,9 +472,10 @@ class EventoViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(usuario=self.request.user)
 
-class PLCViewSet(viewsets.ModelViewSet):
+class PLCViewSet(CamposDispersosMixin, CondicionalGetMixin, viewsets.ModelViewSet):
     
     queryset = PLC.objects.all().select_related('ubicacion', 'creado_por')
+    tablas_version = [PLC, Equipo]
     serializer_class = PLCSerializer
     permission_classes = [IsAuthenticated, IsTecnicoOrReadOnly]
     filterset_fields = ['tipo', 'ubicacion']
@@ -474,39 +515,10 @@ class PLCLogViewSet(viewsets.ReadOnlyModelViewSet):
 class BusquedaGlobalView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
+        from .busqueda_service import buscar
+
         query = request.query_params.get('q', '')
-        
-        resultados = {
-            'motores': Motor.objects.filter(
-                Q(codigo__icontains=query) | 
-                Q(tipo__icontains=query))
-                .values('id', 'codigo', 'tipo', 'estado')[:10],
-            
-            'variadores': Variador.objects.filter(
-                Q(codigo__icontains=query) | 
-                Q(marca__icontains=query) |
-                Q(modelo__icontains=query))
-                .values('id', 'codigo', 'marca', 'modelo', 'estado')[:10],
-            
-            'plcs': PLC.objects.filter(
-                Q(nombre__icontains=query) |
-                Q(modelo__icontains=query))
-                .values('id', 'nombre', 'modelo', 'tipo')[:10],
-            
-            'entradas_salidas': PLCEntradaSalida.objects.filter(
-                Q(etiqueta__icontains=query) |
-                Q(direccion__icontains=query) |
-                Q(descripcion__icontains=query))
-                .select_related('plc')
-                .values('id', 'direccion', 'etiqueta', 'tipo', 'plc__nombre')[:20],
-            
-            'ordenes': OrdenMantenimiento.objects.filter(
-                Q(titulo__icontains=query) |
-                Q(descripcion__icontains=query))
-                .values('id', 'titulo', 'estado', 'prioridad')[:10]
-        }
-        
-        return Response(resultados)
+        return Response(buscar(query))
 
 class UploadFileView(APIView):
     parser_classes = [MultiPartParser]
@@ -536,11 +548,13 @@ class UploadFileView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=400)
 
-class MobileMotorList(APIView):
+class MobileMotorList(SincronizacionDeltaMixin, APIView):
     permission_classes = [IsAuthenticated]
-    
-    def get(self, request):
-        motores = Motor.objects.all().values(
+    sincronizacion_modelo = 'motor'
+    tablas_version = [Motor, LineaProduccion, Sector, Equipo]
+
+    def serializar_sincronizacion(self, queryset):
+        return list(queryset.values(
             'id', 
             'codigo', 
             'estado', 
@@ -548,8 +562,32 @@ class MobileMotorList(APIView):
             'linea__nombre',
             'sector__nombre',
             'equipo__nombre'
-        )
-        return Response(list(motores))
+        ))
+    
+    def get(self, request):
+        # ?since=<cursor> devuelve solo cambios y eliminados; sin since, la lista con ETag
+        return self.respuesta_sincronizada(request, Motor.objects.all())
+
+class JerarquiaActivosView(CondicionalGetMixin, APIView):
+    """
+    Árbol Línea → Sector → Equipo → Motor/Variador en una sola respuesta.
+    ?nodo=linea:3 | sector:5 | equipo:7 devuelve solo ese subárbol.
+    """
+    permission_classes = [IsAuthenticated]
+    tablas_version = [LineaProduccion, Sector, Equipo, Motor, Variador]
+
+    def get(self, request):
+        from .jerarquia_service import obtener
+        return self.respuesta_condicional(request, lambda: self._arbol(request.query_params.get('nodo'), obtener))
+
+    @staticmethod
+    def _arbol(nodo, obtener):
+        try:
+            return Response(obtener(nodo))
+        except ValueError:
+            return Response({'error': 'Nodo inválido, usar linea:<id>, sector:<id> o equipo:<id>'}, status=400)
+        except KeyError:
+            return Response({'error': 'Nodo no encontrado'}, status=404)
 
 class MobileOrdenesAsignadas(APIView):
     permission_classes = [IsAuthenticated]
@@ -598,6 +636,21 @@ class VariableInspeccionViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(ruta_id=ruta_id)
         return queryset
 
+    @action(detail=True, methods=['get'])
+    def estadistica(self, request, pk=None):
+        """Estadísticas acumuladas de la variable (media, desvío, EWMA, últimos valores)"""
+        variable = self.get_object()
+        estadistica = EstadisticaVariable.objects.filter(variable=variable).first()
+        if estadistica is None:
+            return Response({'variable': variable.id, 'cantidad': 0})
+        return Response(EstadisticaVariableSerializer(estadistica).data)
+
+    @action(detail=True, methods=['get'])
+    def spc(self, request, pk=None):
+        """Gráfico X-bar/R, Cp/Cpk y violaciones de reglas Western Electric"""
+        from .spc_service import grafico_control
+        return Response(grafico_control(self.get_object()))
+
 class InspeccionEjecucionViewSet(viewsets.ModelViewSet):
     queryset = InspeccionEjecucion.objects.all()
     serializer_class = InspeccionEjecucionSerializer
@@ -618,6 +671,33 @@ class InspeccionEjecucionViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'Inspección finalizada'})
 
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """Registra una ejecución con todos sus resultados en una sola llamada (idempotente por uuid_cliente)"""
+        from .inspeccion_service import registrar_ejecucion
+
+        serializer = InspeccionLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+
+        ejecucion, resumen, creada = registrar_ejecucion(
+            tecnico=request.user,
+            ruta=datos['ruta'],
+            resultados=datos['resultados'],
+            uuid_cliente=datos.get('uuid_cliente'),
+            observaciones=datos.get('observaciones'),
+        )
+        ejecucion = InspeccionEjecucion.objects.select_related('ruta', 'tecnico').prefetch_related(
+            'resultados__variable', 'resultados__ejecucion__tecnico'
+        ).get(pk=ejecucion.pk)
+
+        respuesta = InspeccionEjecucionSerializer(ejecucion, context={'request': request}).data
+        respuesta['duplicado'] = not creada
+        if resumen:
+            respuesta['alertas'] = resumen['alertas']
+            respuesta['tendencias'] = resumen['tendencias']
+        return Response(respuesta, status=status.HTTP_201_CREATED if creada else status.HTTP_200_OK)
+
 class ResultadoInspeccionViewSet(viewsets.ModelViewSet):
     queryset = ResultadoInspeccion.objects.all()
     serializer_class = ResultadoInspeccionSerializer
@@ -721,6 +801,27 @@ class DashboardSupervisorVariablesTopView(APIView):
         return Response(list(resultados))
 
 
+class DashboardSupervisorCapacidadView(APIView):
+    """Ranking de capacidad de proceso (peor Cpk primero) desde CapacidadVariable"""
+    permission_classes = [IsAuthenticated, IsSupervisorOrAdmin]
+
+    def get(self, request):
+        from .spc_service import ranking_capacidad
+
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            ruta_id = request.query_params.get('ruta_id')
+            ruta_id = int(ruta_id) if ruta_id else None
+        except ValueError:
+            return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or (ruta_id is not None and ruta_id < 1):
+            return Response({'error': 'ruta_id y limit deben ser enteros positivos'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        capacidades = ranking_capacidad(ruta_id=ruta_id, limite=limit)
+        return Response(CapacidadVariableSerializer(capacidades, many=True).data)
+
+
 class DashboardSupervisorActivosCriticosView(APIView):
     permission_classes = [IsAuthenticated, IsSupervisorOrAdmin]
 
@@ -787,6 +888,93 @@ class KpiInspeccionesView(APIView):
         }
         return Response(data)
 
+class KpiOEEView(APIView):
+    """OEE por línea/turno/día calculado por oee_service (cacheado)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from django.utils.dateparse import parse_date
+        from .oee_service import obtener_oee
+
+        try:
+            days = int(request.query_params.get('days', 30))
+            fecha_hasta = parse_date(request.query_params.get('fecha_hasta', '')) or timezone.now().date()
+            fecha_desde = parse_date(request.query_params.get('fecha_desde', '')) or fecha_hasta - timedelta(days=days)
+            linea_id = request.query_params.get('linea')
+            linea_id = int(linea_id) if linea_id else None
+        except ValueError:
+            return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if fecha_desde > fecha_hasta:
+            return Response({'error': 'fecha_desde no puede ser posterior a fecha_hasta'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(obtener_oee(fecha_desde, fecha_hasta, linea_id))
+
+class KpiDetencionesView(APIView):
+    """Pareto de paradas/fallas por motivo, tipo o gravedad (desde ResumenDetencion)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from django.utils.dateparse import parse_date
+        from .detenciones_service import ORIGENES, MEDIDAS, pareto
+
+        origen = request.query_params.get('origen', 'parada')
+        if origen not in ORIGENES:
+            return Response({'error': 'origen inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        dimensiones = ORIGENES[origen][1]
+        dimension = request.query_params.get('dimension', dimensiones[0])
+        medida = request.query_params.get('medida', 'minutos')
+        if dimension not in dimensiones or medida not in MEDIDAS:
+            return Response({'error': 'dimension o medida inválida'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            filtros = {
+                'fecha': parse_date(request.query_params.get('fecha', '')),
+                'fecha_desde': parse_date(request.query_params.get('fecha_desde', '')),
+                'fecha_hasta': parse_date(request.query_params.get('fecha_hasta', '')),
+                'linea_id': int(request.query_params.get('linea') or 0) or None,
+                'turno_id': int(request.query_params.get('turno') or 0) or None,
+            }
+        except ValueError:
+            return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(pareto(origen, dimension, medida, **filtros))
+
+class ConfiabilidadActivosView(APIView):
+    """Ranking de activos críticos por MTBF/MTTR/tasa de fallas"""
+    permission_classes = [IsAuthenticated, IsSupervisorOrAdmin]
+
+    def get(self, request):
+        from .confiabilidad_service import ranking_activos
+
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            linea_id = request.query_params.get('linea')
+            linea_id = int(linea_id) if linea_id else None
+        except ValueError:
+            return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or (linea_id is not None and linea_id < 1):
+            return Response({'error': 'linea y limit deben ser enteros positivos'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        indicadores = ranking_activos(
+            orden=request.query_params.get('orden', 'tasa_fallas'),
+            activo_tipo=request.query_params.get('activo_tipo'),
+            linea_id=linea_id,
+            limite=limit,
+        )
+        return Response(IndicadorConfiabilidadSerializer(indicadores, many=True).data)
+
+
+class ConfiabilidadLineasView(APIView):
+    """MTBF/MTTR agregados por línea de producción"""
+    permission_classes = [IsAuthenticated, IsSupervisorOrAdmin]
+
+    def get(self, request):
+        from .confiabilidad_service import resumen_por_linea
+        return Response(resumen_por_linea())
+
 class ReunionDiariaViewSet(viewsets.ModelViewSet):
     queryset = ReunionDiaria.objects.all().order_by('-fecha')
     serializer_class = ReunionDiariaSerializer
@@ -951,17 +1139,18 @@ class AccionReunionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(acciones, many=True)
         return Response(serializer.data)
 
-class TurnoViewSet(viewsets.ModelViewSet):
+class TurnoViewSet(CondicionalGetMixin, viewsets.ModelViewSet):
     queryset = Turno.objects.all()
     serializer_class = TurnoSerializer
     permission_classes = [IsAuthenticated]
 
 class ProduccionViewSet(viewsets.ModelViewSet):
-    queryset = Produccion.objects.select_related('turno', 'linea', 'supervisor').all()
+    queryset = Produccion.objects.select_related('turno', 'linea', 'supervisor').prefetch_related('componentes')
     serializer_class = ProduccionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['fecha', 'linea', 'turno', 'supervisor', 'producto']
+    # 'producto' se filtra en get_queryset (componentes), no por igualdad exacta
+    filterset_fields = ['fecha', 'linea', 'turno', 'supervisor']
     search_fields = ['producto']  
     
     def get_queryset(self):
@@ -1007,32 +1196,34 @@ class ProduccionViewSet(viewsets.ModelViewSet):
         Filtra por producto, manejando tanto productos simples como códigos compuestos
         Formato compuesto: "18x18x33|20&20x20x40|25"
         """
-        from django.db.models import Q
-        
+        from django.db.models import Exists, OuterRef
+
         # Si el producto buscado es un código compuesto, buscar exactamente
         if '|' in producto_buscado or '&' in producto_buscado:
             return queryset.filter(producto=producto_buscado)
-        
-        # Si es un producto simple, buscar en diferentes posiciones del código compuesto
-        condiciones = Q()
-        
-        # 1. Producto exacto (caso simple)
-        condiciones |= Q(producto=producto_buscado)
-        
-        # 2. Producto al inicio del código compuesto: "PRODUCTO|..."
-        condiciones |= Q(producto__startswith=f"{producto_buscado}|")
-        
-        # 3. Producto en medio del código compuesto: "...&PRODUCTO|..."
-        condiciones |= Q(producto__contains=f"&{producto_buscado}|")
-        
-        # 4. Producto al final del código compuesto: "...&PRODUCTO"
-        condiciones |= Q(producto__endswith=f"&{producto_buscado}")
-        
-        # 5. Producto como parte de un código más complejo
-        condiciones |= Q(producto__regex=rf'\b{producto_buscado}\b')
-        
-        return queryset.filter(condiciones)
-    
+
+        # Producto simple: join indexado contra los componentes ya descompuestos
+        return queryset.filter(Exists(
+            ProduccionComponente.objects.filter(produccion=OuterRef('pk'), producto=producto_buscado)
+        ))
+
+    @action(detail=False, methods=['get'])
+    def totales_por_producto(self, request):
+        """Totales por producto individual, repartiendo los códigos compuestos por porcentaje"""
+        from django.db.models import FloatField
+        from django.db.models.functions import Coalesce
+
+        proporcion = Coalesce(F('porcentaje'), 100.0, output_field=FloatField()) / 100.0
+        totales = ProduccionComponente.objects.filter(
+            produccion__in=self.get_queryset().order_by().values('pk')
+        ).values('producto').annotate(
+            registros=Count('produccion', distinct=True),
+            bandejas=Sum(F('produccion__bandejas') * proporcion, output_field=FloatField()),
+            fabricacion_toneladas=Sum(F('produccion__fabricacion_toneladas') * proporcion, output_field=FloatField()),
+        ).order_by('-fabricacion_toneladas', 'producto')
+
+        return Response(list(totales))
+
 class ProduccionTiempoRealViewSet(viewsets.ModelViewSet):
     queryset = ProduccionTiempoReal.objects.select_related('turno', 'linea', 'supervisor').all()
     serializer_class = ProduccionTiempoRealSerializer
@@ -1087,6 +1278,26 @@ class ProduccionTiempoRealViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by('-timestamp', '-fecha_creacion')
 
+    @action(detail=False, methods=['get'])
+    def pronostico(self, request):
+        """Proyección de cierre de turno por línea y probabilidad de alcanzar la meta"""
+        from django.utils.dateparse import parse_date
+        from .pronostico_service import pronosticar_turno
+
+        try:
+            turno_id = int(request.query_params.get('turno') or 0)
+            linea_id = int(request.query_params.get('linea') or 0) or None
+            fecha = parse_date(request.query_params.get('fecha', '')) or timezone.localdate()
+        except ValueError:
+            return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        if not turno_id:
+            return Response({'error': 'El parámetro turno es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return Response(pronosticar_turno(turno_id, fecha, linea_id))
+        except Turno.DoesNotExist:
+            return Response({'error': 'Turno no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
 class ProduccionTurnoViewSet(viewsets.ModelViewSet):
     queryset = ProduccionTurno.objects.all()
     serializer_class = ProduccionTurnoSerializer
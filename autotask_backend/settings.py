@@ -173,16 +173,16 @@ AUTH_USER_MODEL = 'api.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedUserJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'api.parsers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ),
@@ -262,7 +262,7 @@ CELERY_BEAT_SCHEDULE = {
     },
     'reintentar-notificaciones-fallidas': {
         'task': 'api.tasks.reintentar_notificaciones_fallidas',
-        'schedule': timedelta(hours=1),  # Cada hora
+        'schedule': timedelta(minutes=5),  # Cada 5 minutos (el backoff decide qué se reenvía)
         'options': {'queue': 'periodic_tasks'}
     },
     'limpiar-dispositivos-inactivos': {
@@ -270,6 +270,53 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': timedelta(days=7),  # Cada 7 días
         'options': {'queue': 'periodic_tasks'}
     },
+    'confiabilidad-incremental': {
+        'task': 'api.tasks.actualizar_indicadores_confiabilidad',
+        'schedule': timedelta(minutes=30),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'confiabilidad-completa': {
+        'task': 'api.tasks.actualizar_indicadores_confiabilidad',
+        'schedule': timedelta(hours=24),
+        'kwargs': {'completo': True},
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'capacidad-spc-incremental': {
+        'task': 'api.tasks.actualizar_capacidad_spc',
+        'schedule': timedelta(minutes=15),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'predictivo-incremental': {
+        'task': 'api.tasks.ejecutar_mantenimiento_predictivo',
+        'schedule': timedelta(minutes=30),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'predictivo-completo': {
+        'task': 'api.tasks.ejecutar_mantenimiento_predictivo',
+        'schedule': timedelta(hours=24),
+        'kwargs': {'completo': True},
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'generar-ordenes-preventivas': {
+        'task': 'api.tasks.generar_ordenes_preventivas',
+        'schedule': timedelta(hours=24),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'reconciliar-contadores-notificaciones': {
+        'task': 'api.tasks.reconciliar_contadores_notificaciones',
+        'schedule': timedelta(minutes=15),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'purgar-notificaciones-antiguas': {
+        'task': 'api.tasks.purgar_notificaciones_antiguas',
+        'schedule': timedelta(hours=24),
+        'options': {'queue': 'periodic_tasks'}
+    },
+    'purgar-registros-eliminados': {
+        'task': 'api.tasks.purgar_registros_eliminados',
+        'schedule': timedelta(hours=24),
+        'options': {'queue': 'periodic_tasks'}
+    },
     'tarea-prueba-celery': {
         'task': 'api.tasks.tarea_prueba_celery',
         'schedule': timedelta(minutes=5),
@@ -300,11 +347,38 @@ if 'RENDER' in os.environ:
     # En producción, deshabilitar eager execution
     CELERY_TASK_ALWAYS_EAGER = False
 
+# Segundos máximos que una petición de long-poll de la bandeja de notificaciones queda abierta
+# (requiere workers con hilos: ver gunicorn.conf.py)
+NOTIFICACIONES_LONG_POLL_MAX = int(os.environ.get('NOTIFICACIONES_LONG_POLL_MAX', 25))
+
+# Retención (días) de notificaciones y dispositivos de la app móvil
+RETENCION_NOTIFICACIONES_DIAS = int(os.environ.get('RETENCION_NOTIFICACIONES_DIAS', 90))
+RETENCION_NOTIFICACIONES_NO_LEIDAS_DIAS = int(os.environ.get('RETENCION_NOTIFICACIONES_NO_LEIDAS_DIAS', 365))
+RETENCION_DISPOSITIVOS_INACTIVOS_DIAS = int(os.environ.get('RETENCION_DISPOSITIVOS_INACTIVOS_DIAS', 30))
+RETENCION_DISPOSITIVOS_SIN_USO_DIAS = int(os.environ.get('RETENCION_DISPOSITIVOS_SIN_USO_DIAS', 270))
+
+# Segundos que el árbol de activos (/api/jerarquia/) queda en caché si ninguna señal lo invalida
+JERARQUIA_CACHE_TTL = int(os.environ.get('JERARQUIA_CACHE_TTL', 60 * 60))
+
+# Segundos que la autenticación JWT reutiliza los datos del usuario sin consultar la base
+AUTH_USUARIO_CACHE_TTL = int(os.environ.get('AUTH_USUARIO_CACHE_TTL', 300))
+
+# Asignación automática de órdenes nuevas al técnico con menor carga abierta
+ASIGNACION_AUTOMATICA_ORDENES = os.environ.get('ASIGNACION_AUTOMATICA_ORDENES', 'False') == 'True'
+
 # ==================== FIREBASE CONFIGURATION ====================
 
 # Firebase Cloud Messaging
 FCM_SERVER_KEY = os.environ.get('FCM_SERVER_KEY', 'foGrVmvHTP0b8RE3Es7YosOhV35Zygk6O1q35joXhNM')
 
+# API HTTP v1: cuenta de servicio de Firebase y proyecto
+FCM_SERVICE_ACCOUNT_FILE = os.environ.get('FCM_SERVICE_ACCOUNT_FILE', str(BASE_DIR / 'firebase-service-account.json'))
+FCM_PROJECT_ID = os.environ.get('FCM_PROJECT_ID') or None
+# Envíos concurrentes por proceso (tamaño del pool de hilos y de conexiones keep-alive)
+FCM_MAX_WORKERS = int(os.environ.get('FCM_MAX_WORKERS', 8))
+# 'fcm' o 'simulado' (sin red, para pruebas de carga)
+FCM_TRANSPORTE = os.environ.get('FCM_TRANSPORTE', 'fcm')
+
 # ==================== LOGGING CONFIGURATION ====================
 
 LOGGING = {
@@ -5,6 +5,15 @@ from django.db.models import Count, Sum, Q
 from api.models import *
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from api.detenciones_service import consultar
+
+
+def _totales_fallas(dimension, filtros):
+    """[{dimension: valor, 'total': registros}] ordenado de mayor a menor"""
+    return [
+        {dimension: fila['valor'], 'total': fila['registros']}
+        for fila in consultar('falla', dimension, **filtros)
+    ]
 
 
 def index(request):
@@ -13,38 +22,11 @@ def index(request):
     turno_id = request.GET.get('turno', '')
     fecha = request.GET.get('fecha', '')
     
-   
-    # Fallas por tipo (con filtros)
-    fallas_tipo_query = FallaTurno.objects.all()
-    
-    if linea_id:
-        fallas_tipo_query = fallas_tipo_query.filter(linea_id=linea_id)
-    if turno_id:
-        fallas_tipo_query = fallas_tipo_query.filter(turno_id=turno_id)
-    if fecha:
-        fallas_tipo_query = fallas_tipo_query.filter(fecha=fecha)
-    
-    fallas_tipo = (
-        fallas_tipo_query.values("tipo")
-        .annotate(total=Count("id"))
-        .order_by("-total")
-    )
 
-    # Fallas por gravedad (con filtros)
-    fallas_gravedad_query = FallaTurno.objects.all()
-    
-    if linea_id:
-        fallas_gravedad_query = fallas_gravedad_query.filter(linea_id=linea_id)
-    if turno_id:
-        fallas_gravedad_query = fallas_gravedad_query.filter(turno_id=turno_id)
-    if fecha:
-        fallas_gravedad_query = fallas_gravedad_query.filter(fecha=fecha)
-    
-    fallas_gravedad = (
-        fallas_gravedad_query.values("gravedad")
-        .annotate(total=Count("id"))
-        .order_by("-total")
-    )
+    # Fallas por tipo y gravedad desde el cubo precalculado
+    filtros = {'linea_id': linea_id, 'turno_id': turno_id, 'fecha': fecha}
+    fallas_tipo = _totales_fallas('tipo', filtros)
+    fallas_gravedad = _totales_fallas('gravedad', filtros)
 
     # Próximos mantenimientos (con filtros)
     mantenimientos_query = Motor.objects.filter(proximo_mantenimiento__isnull=False)
@@ -80,32 +62,30 @@ def dashboard_data(request):
     turno = request.GET.get('turno')
     fecha = request.GET.get('fecha')
 
-  
 
-    fallas = FallaTurno.objects.all()
+    filtros = {}
 
     # Solo filtrar si el parámetro existe y no está vacío
     if linea:
         try:
-            fallas = fallas.filter(linea_id=int(linea))
+            filtros['linea_id'] = int(linea)
         except ValueError:
             pass  # ignorar si no es un número válido
 
     if turno:
         try:
-            fallas = fallas.filter(turno_id=int(turno))
+            filtros['turno_id'] = int(turno)
         except ValueError:
             pass
 
     if fecha:
         try:
-            fecha_obj = datetime.strptime(fecha, "%Y-%m-%d").date()
-            fallas = fallas.filter(fecha=fecha_obj)
+            filtros['fecha'] = datetime.strptime(fecha, "%Y-%m-%d").date()
         except ValueError:
             pass
 
-    fallas_tipo = fallas.values("tipo").annotate(total=Count("id"))
-    fallas_gravedad = fallas.values("gravedad").annotate(total=Count("id"))
+    fallas_tipo = _totales_fallas('tipo', filtros)
+    fallas_gravedad = _totales_fallas('gravedad', filtros)
 
     # Mantenimientos con filtros
     mantenimientos_query = Motor.objects.filter(proximo_mantenimiento__isnull=False)
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+"""
+Configuración de gunicorn para el proceso web (Procfile).
+
+GET /api/notificaciones/esperar/ (long-poll de la bandeja) deja la petición
+abierta hasta NOTIFICACIONES_LONG_POLL_MAX segundos. Con workers síncronos
+cada espera ocupa un proceso entero y unas pocas apps en primer plano dejan
+sin workers al resto de la API, por eso se usan workers gthread:
+
+- Peticiones simultáneas = workers × threads. Cada app móvil abierta ocupa un
+  hilo mientras espera; threads se dimensiona para las apps conectadas a la
+  vez por worker más margen para el resto de la API.
+- workers (WEB_CONCURRENCY): 2-4 por CPU; los hilos en espera no consumen CPU.
+- Cada hilo en espera retiene una conexión de Redis (pub/sub) y su conexión a
+  la base de datos: el pool de Redis y max_connections de PostgreSQL deben
+  cubrir workers × threads.
+- timeout supera con margen el long-poll para que el arbiter no reinicie
+  workers con esperas legítimas en curso.
+"""
+import os
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+timeout = int(os.environ.get('NOTIFICACIONES_LONG_POLL_MAX', 25)) + 35
+graceful_timeout = timeout
@@ -0,0 +1,99 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, OrdenMantenimiento, HistorialCambioOrden, SearchDocument
+from api.asignacion_service import ColaTecnicos, asignar_ordenes, cargas_tecnicos
+
+
+def test_cola_toma_siempre_al_menos_cargado():
+    cola = ColaTecnicos({1: (120, 2), 2: (0, 0), 3: (60, 1)})
+
+    asignados = [cola.asignar(minutos) for minutos in (90, 30, 30, 60)]
+
+    assert asignados == [2, 3, 2, 3]
+    assert cola.cargas() == {
+        1: {'carga_minutos': 120, 'ordenes_abiertas': 2},
+        2: {'carga_minutos': 120, 'ordenes_abiertas': 2},
+        3: {'carga_minutos': 150, 'ordenes_abiertas': 3},
+    }
+
+
+@pytest.mark.django_db
+class TestAsignacionOrdenes:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.supervisor = User.objects.create_user(username='supervisor', password='pass', role='supervisor')
+        self.client.force_authenticate(user=self.supervisor)
+        self.ana = User.objects.create_user(username='ana', password='pass', role='tecnico')
+        self.beto = User.objects.create_user(username='beto', password='pass', role='tecnico')
+        User.objects.create_user(username='inactivo', password='pass', role='tecnico', is_active=False)
+
+        # Ana ya tiene 3 horas abiertas; las completadas no cuentan
+        OrdenMantenimiento.objects.create(
+            titulo='Abierta', descripcion='-', estado='en_proceso', operario_asignado=self.ana, tiempo_estimado=180
+        )
+        OrdenMantenimiento.objects.create(
+            titulo='Cerrada', descripcion='-', estado='completada', operario_asignado=self.beto, tiempo_estimado=500
+        )
+
+    def _orden(self, titulo, prioridad='media', tiempo=60):
+        return OrdenMantenimiento.objects.create(
+            titulo=titulo, descripcion='-', prioridad=prioridad, tiempo_estimado=tiempo
+        )
+
+    def test_cargas_en_una_consulta(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            cargas = cargas_tecnicos()
+        assert cargas == {self.ana.id: (180, 1), self.beto.id: (0, 0)}
+
+    def test_lote_por_prioridad_y_carga(self, django_capture_on_commit_callbacks):
+        baja = self._orden('Baja', prioridad='baja', tiempo=30)
+        critica = self._orden('Crítica', prioridad='critica', tiempo=120)
+        media = self._orden('Media', tiempo=90)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            asignaciones, cola = asignar_ordenes(usuario=self.supervisor)
+
+        assert [(orden.id, tecnico) for orden, tecnico in asignaciones] == [
+            (critica.id, self.beto.id),  # beto 0 → 120
+            (media.id, self.beto.id),    # beto 120 → 210 (ana 180)
+            (baja.id, self.ana.id),      # ana 180 → 210
+        ]
+        assert OrdenMantenimiento.objects.filter(estado='asignada').count() == 3
+        assert HistorialCambioOrden.objects.filter(campo_afectado='operario_asignado').count() == 3
+        historial = HistorialCambioOrden.objects.filter(orden=critica)
+        assert set(historial.values_list('campo_afectado', 'valor_anterior', 'valor_nuevo')) == {
+            ('estado', 'pendiente', 'asignada'),
+            ('operario_asignado', None, str(self.beto.id)),
+        }
+        # El índice de búsqueda refleja el estado nuevo
+        assert SearchDocument.objects.get(tipo='orden', objeto_id=critica.id).datos['estado'] == 'asignada'
+        # Una notificación agrupada por lote
+        assert len(callbacks) == 1
+
+    def test_accion_auto_asignar(self):
+        orden = self._orden('Nueva')
+
+        respuesta = self.client.post(
+            reverse('ordenmantenimiento-auto-asignar'), {'ordenes': [orden.id]}, format='json'
+        )
+
+        assert respuesta.status_code == status.HTTP_200_OK
+        assert respuesta.data['asignadas'] == 1
+        assert respuesta.data['asignaciones'][0]['operario_asignado'] == self.beto.id
+        orden.refresh_from_db()
+        assert orden.estado == 'asignada' and orden.operario_asignado == self.beto
+
+    def test_auto_asignar_rechaza_ids_no_enteros(self):
+        url = reverse('ordenmantenimiento-auto-asignar')
+        for datos in ({'ordenes': ['1']}, {'ordenes': [None]}, {'tecnicos': [1.5]}, {'tecnicos': [True]},
+                      {'ordenes': 3}):
+            assert self.client.post(url, datos, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_auto_asignar_requiere_supervisor(self):
+        self.client.force_authenticate(user=self.ana)
+        respuesta = self.client.post(reverse('ordenmantenimiento-auto-asignar'), {}, format='json')
+        assert respuesta.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,71 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import obtener_usuario
+from api.models import User, LineaProduccion, Deposito, Motor
+
+
+@pytest.mark.django_db
+class TestAutenticacionCache:
+
+    def setup_method(self):
+        self.usuario = User.objects.create_user(username='tecnico', password='pass', role='tecnico')
+        LineaProduccion.objects.create(nombre='L1')
+        self.client = APIClient()
+
+    def _login(self):
+        respuesta = self.client.post('/api/token/', {'username': 'tecnico', 'password': 'pass'}, format='json')
+        assert respuesta.status_code == 200
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {respuesta.data['access']}")
+        return respuesta.data['access']
+
+    def test_lecturas_sin_consulta_de_usuario(self, django_assert_num_queries):
+        token = self._login()
+        assert AccessToken(token)['role'] == 'tecnico'
+
+        etag = self.client.get('/api/lineas/')['ETag']
+        # 304 del GET condicional: ni el catálogo ni el usuario tocan la base
+        with django_assert_num_queries(0):
+            assert self.client.get('/api/lineas/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        with django_assert_num_queries(0):
+            assert self.client.get('/api/user-info/').data['role'] == 'tecnico'
+
+    def test_cambio_de_rol_y_desactivacion(self):
+        self._login()
+        datos = {'nombre': 'Talleres', 'especialidad': 'electrico', 'contacto': 'Ana',
+                 'telefono': '1', 'email': 'ana@example.com'}
+        assert self.client.post('/api/proveedores/', datos, format='json').status_code == 403
+
+        self.usuario.role = 'supervisor'
+        self.usuario.save()
+        assert self.client.post('/api/proveedores/', datos, format='json').status_code == 201
+
+        self.usuario.is_active = False
+        self.usuario.save()
+        assert self.client.get('/api/lineas/').status_code == 401
+
+    def test_usuario_de_cache_sirve_para_fk(self):
+        self._login()
+        deposito = Deposito.objects.create(nombre='Pañol')
+        respuesta = self.client.post('/api/motores/', {
+            'codigo': 'MTR-1', 'potencia': '5HP', 'tipo': 'T', 'rpm': '1500', 'brida': 'B3', 'anclaje': 'Base',
+            'ubicacion_tipo': 'deposito', 'deposito': deposito.id,
+        }, format='json')
+        assert respuesta.status_code == 201
+        assert Motor.objects.get(codigo='MTR-1').creado_por_id == self.usuario.id
+
+    def test_sin_foto_consulta_una_vez(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert obtener_usuario(self.usuario.id).username == 'tecnico'
+        with django_assert_num_queries(0):
+            usuario = obtener_usuario(self.usuario.id)
+        assert usuario.role == 'tecnico' and usuario.pk == self.usuario.pk
+        # Los campos fuera de la foto se leen bajo demanda
+        assert usuario.check_password('pass')
+
+    def test_login_simple_y_node_red_llevan_claims(self):
+        simple = self.client.post('/api/simple-login/', {'username': 'tecnico', 'password': 'pass'}, format='json')
+        assert AccessToken(simple.data['access'])['role'] == 'tecnico'
+        node_red = self.client.post('/api/node-red/auth/', {'username': 'tecnico', 'password': 'pass'}, format='json')
+        assert AccessToken(node_red.data['access_token'])['username'] == 'tecnico'
@@ -0,0 +1,104 @@
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import bandeja_service
+from api.models import User, NotificacionApp
+
+
+def _notificacion(usuario, **kwargs):
+    return NotificacionApp.objects.create(
+        usuario_id=usuario.id, usuario_nombre=usuario.username, titulo='T', mensaje='M', tipo='alerta',
+        prioridad='media', **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestBandejaNotificaciones:
+
+    def setup_method(self):
+        self.usuario = User.objects.create_user(username='tecnico', password='pass', role='tecnico')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.usuario)
+
+    def test_no_leidas_desde_cursor(self):
+        primera = _notificacion(self.usuario)
+        segunda = _notificacion(self.usuario)
+        _notificacion(self.usuario, leida=True)
+
+        url = reverse('notificaciones-no-leidas')
+        assert len(self.client.get(url).data) == 2
+        respuesta = self.client.get(url, {'since': primera.id})
+        assert [n['id'] for n in respuesta.data] == [segunda.id]
+        assert self.client.get(url, {'since': 'x'}).status_code == 400
+
+    def test_esperar_devuelve_de_inmediato_si_hay_nuevas(self):
+        nueva = _notificacion(self.usuario)
+        respuesta = self.client.get(reverse('notificaciones-esperar'), {'since': 0, 'timeout': 5})
+
+        assert respuesta.data['cursor'] == nueva.id
+        assert [n['id'] for n in respuesta.data['notificaciones']] == [nueva.id]
+
+    def test_esperar_vence_sin_novedades(self):
+        vieja = _notificacion(self.usuario)
+        respuesta = self.client.get(reverse('notificaciones-esperar'), {'since': vieja.id, 'timeout': 0})
+
+        assert respuesta.data == {'cursor': vieja.id, 'notificaciones': []}
+
+    def test_esperar_despierta_con_la_publicacion(self):
+        pubsub = mock.MagicMock()
+        llegada = []
+
+        def publicar(timeout):
+            # La notificación se crea mientras la petición está bloqueada
+            llegada.append(_notificacion(self.usuario))
+            return {'type': 'message', 'data': b'1'}
+        pubsub.get_message.side_effect = publicar
+
+        with mock.patch.object(bandeja_service, '_redis') as redis:
+            redis.return_value.pubsub.return_value = pubsub
+            filas = bandeja_service.esperar(self.usuario.id, since=0, timeout=10)
+
+        assert filas == llegada
+        pubsub.subscribe.assert_called_once_with(f"notificaciones:bandeja:{self.usuario.id}")
+        pubsub.close.assert_called_once()
+
+    def test_publicacion_al_crear_notificacion(self, django_capture_on_commit_callbacks):
+        from api.notification_service import NotificationService
+
+        with mock.patch.object(NotificationService, '__init__', lambda self: None), \
+                mock.patch.object(bandeja_service, 'publicar') as publicar:
+            with django_capture_on_commit_callbacks(execute=True):
+                NotificationService()._crear_notificacion_db(self.usuario.id, 'T', 'M', 'alerta', 'media')
+                publicar.assert_not_called()  # Recién al confirmar la transacción
+
+        publicar.assert_called_once_with([self.usuario.id])
+
+    def test_publicacion_desde_cualquier_origen(self, django_capture_on_commit_callbacks):
+        with mock.patch.object(bandeja_service, 'publicar') as publicar:
+            with django_capture_on_commit_callbacks(execute=True):
+                _notificacion(self.usuario)
+            with django_capture_on_commit_callbacks(execute=True):
+                _notificacion(self.usuario, leida=True)
+
+        publicar.assert_called_once_with([self.usuario.id])
+
+    def test_esperar_consulta_al_vencer(self):
+        pubsub = mock.MagicMock()
+        perdida = []
+
+        def sin_mensaje(timeout):
+            # La notificación llega pero el mensaje de pub/sub se pierde
+            if not perdida:
+                perdida.append(_notificacion(self.usuario))
+            return None
+        pubsub.get_message.side_effect = sin_mensaje
+
+        with mock.patch.object(bandeja_service, '_redis') as redis, \
+                mock.patch.object(bandeja_service.time, 'monotonic', side_effect=[0, 0, 0, 20, 20]):
+            redis.return_value.pubsub.return_value = pubsub
+            filas = bandeja_service.esperar(self.usuario.id, since=0, timeout=10)
+
+        assert filas == perdida
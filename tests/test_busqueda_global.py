@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Motor, PLC, PLCEntradaSalida, OrdenMantenimiento, SearchDocument
+from api.busqueda_service import reindexar_todo
+
+
+@pytest.mark.django_db
+class TestBusquedaGlobal:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.motor = Motor.objects.create(
+            codigo='MTR-001', potencia='5HP', tipo='Trifásico', rpm='1500',
+            brida='B3', anclaje='Base', creado_por=self.user
+        )
+        self.plc = PLC.objects.create(nombre='Horno principal', modelo='S7-1200', tipo='siemens')
+        self.entrada = PLCEntradaSalida.objects.create(
+            plc=self.plc, direccion='I0.1', tipo='digital_in', etiqueta='Sensor puerta',
+            descripcion='Final de carrera de la puerta del horno'
+        )
+
+    def _buscar(self, q):
+        response = self.client.get('/api/buscar/', {'q': q})
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_prefijo_y_acentos(self):
+        datos = self._buscar('trifas')
+        assert datos['motores'] == [{'id': self.motor.id, 'codigo': 'MTR-001', 'tipo': 'Trifásico', 'estado': self.motor.estado}]
+
+    def test_busca_en_descripcion_y_refleja_nombre_del_plc(self):
+        self.plc.nombre = 'Horno 2'
+        self.plc.save()
+
+        datos = self._buscar('carrera puerta')
+        assert [e['etiqueta'] for e in datos['entradas_salidas']] == ['Sensor puerta']
+        assert datos['entradas_salidas'][0]['plc__nombre'] == 'Horno 2'
+
+    def test_borrado_quita_el_documento(self):
+        self.motor.delete()
+        assert self._buscar('MTR-001')['motores'] == []
+
+    def test_subcadena_en_codigos(self):
+        otro = Motor.objects.create(
+            codigo='MTR001', potencia='5HP', tipo='Monofásico', rpm='1500',
+            brida='B3', anclaje='Base', creado_por=self.user
+        )
+        assert [m['codigo'] for m in self._buscar('001')['motores']] == ['MTR-001', 'MTR001']
+        assert [m['codigo'] for m in self._buscar('R00')['motores']] == ['MTR001']
+        # Palabras sin dígitos siguen siendo solo por prefijo de token
+        assert self._buscar('fasico')['motores'] == []
+        assert self._buscar('monof')['motores'][0]['id'] == otro.id
+
+    def test_consulta_vacia_o_con_sintaxis_fts(self):
+        assert self._buscar('')['motores'] == []
+        assert self._buscar('"OR (')['motores'] == []
+
+    def test_reindexar_todo(self):
+        SearchDocument.objects.all().delete()
+        assert reindexar_todo() == 3
+        assert self._buscar('s7')['plcs'][0]['nombre'] == 'Horno principal'
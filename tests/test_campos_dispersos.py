@@ -0,0 +1,88 @@
+import pytest
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from api.models import User, Motor, Variador, Equipo, Sector, LineaProduccion, OrdenMantenimiento, Deposito
+from api.serializers import MotorSerializer
+
+
+def _motor(codigo, **kwargs):
+    return Motor.objects.create(
+        codigo=codigo, potencia='5HP', tipo='T', rpm='1500', brida='B3', anclaje='Base', **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestCamposDispersos:
+
+    def setup_method(self):
+        self.usuario = User.objects.create_user(username='tecnico', password='pass', role='tecnico')
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        linea = LineaProduccion.objects.create(nombre='L1')
+        sector = Sector.objects.create(nombre='Horno', linea=linea)
+        self.equipo = Equipo.objects.create(nombre='Ventilador', sector=sector)
+        _motor('MTR-1', ubicacion_tipo='equipo', equipo=self.equipo, creado_por=self.usuario, imagen='motores/m1.jpg')
+        _motor('MTR-2')
+
+    def test_values_igual_que_instancias(self):
+        request = Request(RequestFactory().get('/api/motores/'))
+        queryset = Motor.objects.order_by('id')
+        por_values = MotorSerializer(queryset, many=True, context={'request': request}).data
+        por_instancia = [MotorSerializer(motor, context={'request': request}).data for motor in queryset]
+
+        assert por_values == por_instancia
+        assert por_values[0]['imagen_url'] == 'http://testserver/media/motores/m1.jpg'
+        assert por_values[0]['estado_display'] == 'Operativo'
+        # Sin equipo DRF omite los nombres que se leen a través de él
+        assert 'equipo_nombre' not in por_values[1] and por_values[1]['equipo'] is None
+
+    def test_fields_recorta_y_usa_una_consulta(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            respuesta = self.client.get('/api/motores/', {'fields': 'id,codigo,linea_nombre,estado_display'})
+
+        assert respuesta.status_code == 200
+        assert respuesta.data[0] == {
+            'id': respuesta.data[0]['id'], 'codigo': 'MTR-1', 'linea_nombre': 'L1', 'estado_display': 'Operativo',
+        }
+        assert set(respuesta.data[1]) == {'id', 'codigo', 'estado_display'}
+
+        # Detalle por instancia: only() + select_related de la cadena equipo→sector→línea
+        motor = Motor.objects.get(codigo='MTR-1')
+        with django_assert_num_queries(1):
+            detalle = self.client.get(f'/api/motores/{motor.id}/', {'fields': 'codigo,linea_nombre,imagen_url'})
+        assert detalle.data == {'codigo': 'MTR-1', 'linea_nombre': 'L1',
+                                'imagen_url': 'http://testserver/media/motores/m1.jpg'}
+
+    def test_omit(self):
+        respuesta = self.client.get('/api/variadores/', {'omit': 'parametros,manual_url'})
+        assert respuesta.status_code == 200
+        Variador.objects.create(codigo='VAR-1', marca='ABB', modelo='X', potencia='10HP')
+        fila = self.client.get('/api/variadores/', {'omit': 'parametros,manual_url'}).data[0]
+        assert 'parametros' not in fila and 'manual_url' not in fila and fila['codigo'] == 'VAR-1'
+
+    def test_orden_sin_anidados_acota_el_queryset(self, django_assert_num_queries):
+        orden = OrdenMantenimiento.objects.create(
+            titulo='Cambio de rodamientos', descripcion='x', tipo='correctivo', prioridad='alta', creado_por=self.usuario,
+        )
+        orden.equipos.add(self.equipo)
+
+        with django_assert_num_queries(2):  # Órdenes + m2m de equipos
+            respuesta = self.client.get('/api/ordenes/', {'fields': 'id,titulo,equipos'})
+        assert respuesta.data == [{'id': orden.id, 'titulo': 'Cambio de rodamientos', 'equipos': [self.equipo.id]}]
+
+        completa = self.client.get(f'/api/ordenes/{orden.id}/', {'omit': 'motores_info,variadores_info'})
+        assert completa.data['equipos_info'][0]['nombre'] == 'Ventilador'
+        assert 'motores_info' not in completa.data and 'titulo' in completa.data
+
+    def test_escrituras_usan_todos_los_campos(self):
+        deposito = Deposito.objects.create(nombre='Pañol')
+        respuesta = self.client.post(
+            '/api/motores/?fields=id', {'codigo': 'MTR-3', 'potencia': '5HP', 'tipo': 'T', 'rpm': '1500',
+                                        'brida': 'B3', 'anclaje': 'Base', 'ubicacion_tipo': 'deposito',
+                                        'deposito': deposito.id},
+            format='json',
+        )
+        assert respuesta.status_code == 201, respuesta.data
+        assert respuesta.data['codigo'] == 'MTR-3'
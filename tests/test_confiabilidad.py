@@ -0,0 +1,91 @@
+from datetime import datetime, date, time
+
+import pandas as pd
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, Sector, Equipo, FallaTurno
+from api.confiabilidad_service import calcular_indicadores, actualizar_indicadores, COLUMNAS_EVENTO
+
+
+def _eventos(*filas):
+    return pd.DataFrame.from_records(filas, columns=COLUMNAS_EVENTO)
+
+
+def test_intervalos_solapados_cuentan_como_una_falla():
+    eventos = _eventos(
+        ('equipo', 1, datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 10)),
+        ('equipo', 1, datetime(2025, 1, 1, 9), datetime(2025, 1, 1, 12)),
+        ('equipo', 1, datetime(2025, 1, 2, 8), datetime(2025, 1, 2, 9)),
+    )
+    inicios = {('equipo', 1): datetime(2025, 1, 1, 0)}
+
+    resultado = calcular_indicadores(eventos, inicios, datetime(2025, 1, 3, 0)).iloc[0]
+
+    assert resultado['cantidad_fallas'] == 2
+    assert resultado['horas_reparacion'] == pytest.approx(5)
+    assert resultado['horas_observadas'] == pytest.approx(48)
+    assert resultado['mttr_horas'] == pytest.approx(2.5)
+    assert resultado['mtbf_horas'] == pytest.approx(43 / 2)
+    assert resultado['disponibilidad'] == pytest.approx(43 / 48)
+
+
+def test_activos_se_calculan_por_separado():
+    eventos = _eventos(
+        ('motor', 1, datetime(2025, 1, 1, 0), datetime(2025, 1, 2, 0)),
+        ('variador', 1, datetime(2025, 1, 1, 0), datetime(2025, 1, 1, 6)),
+    )
+
+    resultado = calcular_indicadores(eventos, {}, datetime(2025, 1, 3, 0)).set_index('activo_tipo')
+
+    assert resultado.loc['motor', 'mttr_horas'] == pytest.approx(24)
+    assert resultado.loc['variador', 'mttr_horas'] == pytest.approx(6)
+
+
+def test_sin_eventos():
+    assert calcular_indicadores(_eventos(), {}, datetime(2025, 1, 1)).empty
+
+
+@pytest.mark.django_db
+class TestConfiabilidadEndpoint:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='super', password='pass', role='supervisor')
+        self.client.force_authenticate(user=self.user)
+        turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+        sector = Sector.objects.create(nombre='Envasado', linea=self.linea)
+        self.equipo = Equipo.objects.create(nombre='Llenadora', sector=sector)
+        for dia in (1, 5):
+            FallaTurno.objects.create(
+                fecha=date(2025, 1, dia), turno=turno, linea=self.linea, equipo=self.equipo,
+                tipo='mecanica', cantidad=1, duracion_minutos=90,
+            )
+
+    def test_ranking_y_resumen_por_linea(self):
+        assert actualizar_indicadores() == 1
+
+        response = self.client.get(reverse('dashboard-confiabilidad'))
+        assert response.status_code == status.HTTP_200_OK
+        fila = response.data[0]
+        assert fila['activo_nombre'] == 'Llenadora'
+        assert fila['linea_nombre'] == 'Línea 1'
+        assert fila['cantidad_fallas'] == 2
+        assert fila['mttr_horas'] == pytest.approx(1.5)
+
+        response = self.client.get(reverse('dashboard-confiabilidad-lineas'))
+        assert response.data[0]['cantidad_fallas'] == 2
+
+        # Sin eventos nuevos no se recalcula nada
+        assert actualizar_indicadores() == 0
+
+    def test_parametros_invalidos(self):
+        url = reverse('dashboard-confiabilidad')
+        for parametros in ({'linea': 'abc'}, {'linea': '-1'}, {'limit': 'x'}, {'limit': '0'}, {'limit': '-5'}):
+            assert self.client.get(url, parametros).status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.client.get(url, {'linea': self.linea.pk, 'limit': 1})
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,85 @@
+from unittest import mock
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import contadores_service
+from api.models import User, NotificacionApp
+from api.notification_service import NotificationService
+from api.tasks import reconciliar_contadores_notificaciones
+
+
+def _notificacion(usuario, **kwargs):
+    return NotificacionApp.objects.create(
+        usuario_id=usuario.id, usuario_nombre=usuario.username, titulo='T', mensaje='M', tipo='alerta',
+        prioridad='media', **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestContadoresNotificaciones:
+
+    def setup_method(self):
+        self.usuario = User.objects.create_user(username='tecnico', password='pass', role='tecnico')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.usuario)
+
+    def _conteo(self):
+        return self.client.get(reverse('notificaciones-conteo-no-leidas')).data['conteo']
+
+    def test_conteo_sin_consultas_tras_la_primera_lectura(self, django_assert_num_queries,
+                                                          django_capture_on_commit_callbacks):
+        _notificacion(self.usuario)
+        _notificacion(self.usuario, leida=True)
+        assert contadores_service.conteo(self.usuario.id) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            _notificacion(self.usuario)
+        with django_assert_num_queries(0):
+            assert contadores_service.conteo(self.usuario.id) == 2
+
+    def test_marcar_leida_y_todas(self):
+        primera = _notificacion(self.usuario)
+        _notificacion(self.usuario)
+        _notificacion(self.usuario)
+        assert self._conteo() == 3
+
+        url = reverse('notificaciones-marcar-leida', args=[primera.id])
+        self.client.post(url)
+        self.client.post(url)  # Marcar dos veces no descuenta dos veces
+        assert self._conteo() == 2
+
+        self.client.post(reverse('notificaciones-marcar-todas-leidas'))
+        assert self._conteo() == 0
+
+    def test_envio_masivo_incrementa(self, django_capture_on_commit_callbacks):
+        otro = User.objects.create_user(username='otro', password='pass', role='tecnico')
+        assert contadores_service.conteo(otro.id) == 0
+
+        with mock.patch.object(NotificationService, '__init__', lambda self: None), \
+                django_capture_on_commit_callbacks(execute=True):
+            NotificationService().enviar_notificacion_masiva([self.usuario, otro], 'T', 'M', 'alerta')
+
+        assert contadores_service.conteo(otro.id) == 1
+        assert self._conteo() == 1
+
+    def test_creacion_revertida_no_incrementa(self, django_capture_on_commit_callbacks):
+        assert contadores_service.conteo(self.usuario.id) == 0
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError), transaction.atomic():
+                _notificacion(self.usuario)
+                raise RuntimeError
+        # La transacción se revirtió: el incremento nunca se aplica
+        assert callbacks == []
+        assert contadores_service.conteo(self.usuario.id) == 0
+
+    def test_reconciliacion_corrige_deriva(self):
+        _notificacion(self.usuario)
+        assert contadores_service.conteo(self.usuario.id) == 1
+        NotificacionApp.objects.update(leida=True)  # Update masivo sin pasar por el contador
+
+        reconciliar_contadores_notificaciones()
+        assert contadores_service.conteo(self.usuario.id) == 0
@@ -0,0 +1,83 @@
+from datetime import date, time
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, ParadaTurno, FallaTurno, ResumenDetencion
+from api.detenciones_service import consultar, reconstruir_cubo
+
+
+@pytest.mark.django_db
+class TestCuboDetenciones:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+        self.fecha = date(2025, 3, 10)
+
+    def _parada(self, motivo, minutos, **kwargs):
+        datos = dict(fecha=self.fecha, turno=self.turno, linea=self.linea,
+                     motivo=motivo, duracion_minutos=minutos)
+        datos.update(kwargs)
+        return ParadaTurno.objects.create(**datos)
+
+    def test_cubo_se_actualiza_al_insertar_editar_y_borrar(self):
+        p1 = self._parada('limpieza', 30, tipo='programada')
+        self._parada('falla_equipo', 45)
+        self._parada('falla_equipo', 15)
+
+        motivos = {f['valor']: f for f in consultar('parada', 'motivo')}
+        assert motivos['falla_equipo']['registros'] == 2
+        assert motivos['falla_equipo']['minutos'] == 60
+        assert motivos['limpieza']['minutos'] == 30
+
+        p1.motivo = 'falla_equipo'
+        p1.save()
+        motivos = {f['valor']: f for f in consultar('parada', 'motivo')}
+        assert 'limpieza' not in motivos
+        assert motivos['falla_equipo']['minutos'] == 90
+
+        p1.delete()
+        tipos = {f['valor']: f for f in consultar('parada', 'tipo')}
+        assert tipos == {'no_programada': {'valor': 'no_programada', 'registros': 2, 'minutos': 60, 'cantidad': 2}}
+
+    def test_cambio_de_fecha_recalcula_ambos_turnos(self):
+        parada = self._parada('limpieza', 30)
+        parada.fecha = date(2025, 3, 11)
+        parada.save()
+
+        assert not ResumenDetencion.objects.filter(fecha=self.fecha).exists()
+        assert consultar('parada', 'motivo', fecha=date(2025, 3, 11))[0]['minutos'] == 30
+
+    def test_reconstruir_coincide_con_incremental(self):
+        self._parada('limpieza', 30)
+        FallaTurno.objects.create(fecha=self.fecha, turno=self.turno, linea=self.linea,
+                                  tipo='calidad', gravedad='leve', cantidad=5, duracion_minutos=10)
+        incremental = sorted(ResumenDetencion.objects.values_list(
+            'origen', 'dimension', 'valor', 'registros', 'minutos', 'cantidad'))
+
+        reconstruir_cubo()
+
+        assert sorted(ResumenDetencion.objects.values_list(
+            'origen', 'dimension', 'valor', 'registros', 'minutos', 'cantidad')) == incremental
+
+    def test_pareto_endpoint(self):
+        self._parada('falla_equipo', 60)
+        self._parada('limpieza', 30)
+        self._parada('personal', 10)
+
+        response = self.client.get(reverse('kpi-detenciones'), {'origen': 'parada', 'dimension': 'motivo'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total'] == 100
+        assert [i['valor'] for i in response.data['items']] == ['falla_equipo', 'limpieza', 'personal']
+        assert response.data['items'][1]['porcentaje_acumulado'] == 90
+
+    def test_pareto_dimension_invalida(self):
+        response = self.client.get(reverse('kpi-detenciones'), {'origen': 'parada', 'dimension': 'gravedad'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
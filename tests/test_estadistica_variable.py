@@ -0,0 +1,95 @@
+import statistics
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import (
+    User, RutaInspeccion, VariableInspeccion, InspeccionEjecucion, ResultadoInspeccion,
+    EstadisticaVariable, Evento,
+)
+
+
+def test_welford_y_ewma_coinciden_con_el_calculo_directo():
+    valores = [10.0, 12.5, 9.0, 11.0, 13.0, 8.5, 10.5]
+    estadistica = EstadisticaVariable()
+    for valor in valores:
+        estadistica.agregar(valor)
+
+    assert estadistica.cantidad == len(valores)
+    assert estadistica.media == pytest.approx(statistics.mean(valores))
+    assert estadistica.varianza == pytest.approx(statistics.variance(valores))
+    assert estadistica.ultimos == valores[-EstadisticaVariable.VENTANA:]
+
+    ewma = valores[0]
+    for valor in valores[1:]:
+        ewma = EstadisticaVariable.ALFA_EWMA * valor + (1 - EstadisticaVariable.ALFA_EWMA) * ewma
+    assert estadistica.ewma == pytest.approx(ewma)
+
+
+@pytest.mark.django_db
+class TestEstadisticaVariable:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='tecnico', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.ruta = RutaInspeccion.objects.create(
+            nombre='Ruta motores', activo_tipo='motor', activo_id=1, frecuencia_dias=7
+        )
+        self.variable = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Temperatura', unidad='°C', valor_referencia=60, tolerancia=5
+        )
+        self.ejecucion = InspeccionEjecucion.objects.create(ruta=self.ruta, tecnico=self.user)
+
+    def _resultado(self, valor):
+        return ResultadoInspeccion.objects.create(
+            ejecucion=self.ejecucion, variable=self.variable, valor_medido=valor
+        )
+
+    def test_tendencia_sin_consultar_historial(self):
+        self._resultado(63)
+        self._resultado(64)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self._resultado(72)
+
+        # Solo el INSERT toca la tabla de resultados
+        assert not any('FROM "api_resultadoinspeccion"' in q['sql'] for q in consultas.captured_queries)
+
+        estadistica = EstadisticaVariable.objects.get(variable=self.variable)
+        assert estadistica.cantidad == 3
+        assert estadistica.ultimos == [63, 64, 72]
+        assert Evento.objects.filter(descripcion__startswith='Predicción').count() == 1
+        assert Evento.objects.filter(descripcion__startswith='Alerta [crítico]').count() == 1
+
+    def test_variable_se_lee_una_vez_sin_instancia_en_cache(self):
+        with CaptureQueriesContext(connection) as consultas:
+            ResultadoInspeccion.objects.create(
+                ejecucion_id=self.ejecucion.id, variable_id=self.variable.id, valor_medido=75
+            )
+
+        # save y la señal de alerta comparten la misma variable cargada
+        lecturas = [q for q in consultas.captured_queries if 'FROM "api_variableinspeccion"' in q['sql']]
+        assert len(lecturas) == 1
+
+    def test_editar_resultado_no_duplica_estadistica(self):
+        resultado = self._resultado(61)
+        resultado.valor_medido = 62
+        resultado.save()
+
+        assert EstadisticaVariable.objects.get(variable=self.variable).cantidad == 1
+
+    def test_endpoint_estadistica(self):
+        self._resultado(58)
+        self._resultado(62)
+
+        response = self.client.get(reverse('variableinspeccion-estadistica', args=[self.variable.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['cantidad'] == 2
+        assert response.data['media'] == pytest.approx(60)
+        assert response.data['desviacion'] == pytest.approx(statistics.stdev([58, 62]))
@@ -0,0 +1,57 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import User, Sector, LineaProduccion
+
+
+@pytest.mark.django_db
+class TestGetCondicional:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='tecnico', password='pass', role='tecnico'))
+        self.linea = LineaProduccion.objects.create(nombre='L1')
+        self.sector = Sector.objects.create(nombre='Horno', linea=self.linea)
+
+    def test_304_sin_consultas(self, django_assert_num_queries):
+        url = reverse('lineaproduccion-list')
+        primera = self.client.get(url)
+        assert primera.status_code == 200
+        assert primera['Cache-Control'] == 'private, no-cache'
+
+        with django_assert_num_queries(0):
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+        assert respuesta.status_code == 304
+        assert respuesta['ETag'] == primera['ETag']
+
+    def test_cambio_en_tabla_relacionada_invalida(self):
+        url = reverse('sector-list')
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # El serializer de sector muestra el nombre de la línea
+        self.linea.nombre = 'L1 renombrada'
+        self.linea.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert respuesta.status_code == 200
+        assert respuesta['ETag'] != etag
+
+    def test_etag_distinto_por_url(self):
+        lista = self.client.get(reverse('sector-list'))['ETag']
+        detalle = self.client.get(reverse('sector-detail', args=[self.sector.id]))
+        assert detalle.status_code == 200
+        assert detalle['ETag'] != lista
+        assert self.client.get(reverse('sector-list'), {'linea': self.linea.id})['ETag'] != lista
+
+    def test_sin_cache_responde_normal(self, monkeypatch):
+        def caida(*args, **kwargs):
+            raise ConnectionError('redis caído')
+        monkeypatch.setattr(cache, 'get_many', caida)
+        monkeypatch.setattr(cache, 'incr', caida)
+
+        LineaProduccion.objects.create(nombre='L2')
+        respuesta = self.client.get(reverse('lineaproduccion-list'))
+        assert respuesta.status_code == 200
+        assert 'ETag' not in respuesta
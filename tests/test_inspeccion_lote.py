@@ -0,0 +1,101 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import (
+    User, RutaInspeccion, VariableInspeccion, InspeccionEjecucion, ResultadoInspeccion,
+    EstadisticaVariable, Evento,
+)
+from api.inspeccion_service import evaluar_tolerancias
+
+
+def test_evaluar_tolerancias_vectorizado():
+    _, severidades = evaluar_tolerancias([60, 65.5, 67, 71], [60] * 4, [5] * 4)
+    assert list(severidades) == ['', 'leve', 'moderado', 'crítico']
+
+
+@pytest.mark.django_db
+class TestInspeccionLote:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='tecnico', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.ruta = RutaInspeccion.objects.create(
+            nombre='Ruta motores', activo_tipo='motor', activo_id=1, frecuencia_dias=7
+        )
+        self.temperatura = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Temperatura', unidad='°C', valor_referencia=60, tolerancia=5
+        )
+        self.vibracion = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Vibración', unidad='mm/s', valor_referencia=2, tolerancia=1
+        )
+        self.url = reverse('inspeccionejecucion-lote')
+
+    def _payload(self, **kwargs):
+        payload = {
+            'uuid_cliente': str(uuid.uuid4()),
+            'ruta': self.ruta.id,
+            'observaciones': 'Sin novedades',
+            'resultados': [
+                {'variable': self.temperatura.id, 'valor_medido': 72},
+                {'variable': self.vibracion.id, 'valor_medido': 4.5},
+            ],
+        }
+        payload.update(kwargs)
+        return payload
+
+    def test_registra_ejecucion_completa_con_un_evento(self, django_capture_on_commit_callbacks):
+        with mock.patch('api.notification_service.NotificationService') as servicio, \
+                django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(self.url, self._payload(), format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['resultados']) == 2
+        assert {a['severidad'] for a in response.data['alertas']} == {'crítico'}
+        assert Evento.objects.count() == 1
+        assert EstadisticaVariable.objects.get(variable=self.temperatura).cantidad == 1
+        # Una sola notificación consolidada para las dos alertas
+        servicio.return_value.notificar_alertas_ejecucion.assert_called_once()
+        assert len(servicio.return_value.notificar_alertas_ejecucion.call_args.args[1]) == 2
+
+    def test_reintento_offline_es_idempotente(self):
+        payload = self._payload()
+        primera = self.client.post(self.url, payload, format='json')
+        segunda = self.client.post(self.url, payload, format='json')
+
+        assert segunda.status_code == status.HTTP_200_OK
+        assert segunda.data['duplicado'] is True
+        assert segunda.data['id'] == primera.data['id']
+        assert InspeccionEjecucion.objects.count() == 1
+        assert ResultadoInspeccion.objects.count() == 2
+        assert Evento.objects.count() == 1
+
+    def test_rechaza_variables_de_otra_ruta(self):
+        otra = RutaInspeccion.objects.create(nombre='Otra', activo_tipo='motor', activo_id=2, frecuencia_dias=7)
+        ajena = VariableInspeccion.objects.create(
+            ruta=otra, nombre='Presión', unidad='bar', valor_referencia=5, tolerancia=1
+        )
+        payload = self._payload(resultados=[{'variable': ajena.id, 'valor_medido': 5}])
+
+        response = self.client.post(self.url, payload, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not InspeccionEjecucion.objects.exists()
+
+    def test_registrar_lote_avanza_actualizado(self):
+        EstadisticaVariable.registrar_lote({self.temperatura.id: [60.0]})
+        ayer = timezone.now() - timedelta(days=1)
+        EstadisticaVariable.objects.filter(variable=self.temperatura).update(actualizado=ayer)
+
+        EstadisticaVariable.registrar_lote({self.temperatura.id: [61.0]})
+
+        estadistica = EstadisticaVariable.objects.get(variable=self.temperatura)
+        assert estadistica.cantidad == 2
+        assert estadistica.actualizado > ayer
@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api import jerarquia_service
+from api.admin_config import LineaProduccionFilter, SectorFilter
+from api.models import User, Motor, Variador, Equipo, Sector, LineaProduccion, Deposito
+
+
+def _motor(codigo, **kwargs):
+    return Motor.objects.create(
+        codigo=codigo, potencia='5HP', tipo='T', rpm='1500', brida='B3', anclaje='Base', **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestJerarquiaActivos:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='tecnico', password='pass', role='tecnico'))
+        self.linea = LineaProduccion.objects.create(nombre='L1')
+        self.sector = Sector.objects.create(nombre='Horno', linea=self.linea)
+        self.equipo = Equipo.objects.create(nombre='Ventilador', sector=self.sector)
+        _motor('MTR-EQ', linea=self.linea, sector=self.sector, equipo=self.equipo)
+        _motor('MTR-SEC', sector=self.sector)
+        _motor('MTR-DEP', ubicacion_tipo='deposito', deposito=Deposito.objects.create(nombre='Pañol'))
+        Variador.objects.create(codigo='VAR-1', marca='ABB', modelo='X', potencia='10HP', equipo=self.equipo)
+
+    def test_arbol_con_cinco_consultas_y_cacheado(self, django_assert_num_queries):
+        with django_assert_num_queries(5):
+            arbol = jerarquia_service.obtener()
+        with django_assert_num_queries(0):
+            jerarquia_service.obtener()
+
+        sector = arbol['lineas'][0]['sectores'][0]
+        equipo = sector['equipos'][0]
+        assert [m['codigo'] for m in equipo['motores']] == ['MTR-EQ']
+        assert equipo['variadores'][0]['marca'] == 'ABB'
+        assert [m['codigo'] for m in sector['motores']] == ['MTR-SEC']
+        assert [m['codigo'] for m in arbol['sin_ubicacion']['motores']] == ['MTR-DEP']
+
+    def test_endpoint_y_subarbol(self):
+        completo = self.client.get('/api/jerarquia/')
+        assert completo.status_code == 200 and completo['ETag']
+        assert completo.data['lineas'][0]['nombre'] == 'L1'
+
+        subarbol = self.client.get('/api/jerarquia/', {'nodo': f'equipo:{self.equipo.id}'})
+        assert subarbol.data['nombre'] == 'Ventilador' and subarbol.data['tipo'] == 'equipo'
+        assert subarbol['ETag'] != completo['ETag']
+
+        assert self.client.get('/api/jerarquia/', {'nodo': 'sector:999'}).status_code == 404
+        assert self.client.get('/api/jerarquia/', {'nodo': 'motor:1'}).status_code == 400
+
+    def test_senales_invalidan(self):
+        jerarquia_service.obtener()
+        self.equipo.nombre = 'Extractor'
+        self.equipo.save()
+        equipo = jerarquia_service.obtener(f'equipo:{self.equipo.id}')
+        assert equipo['nombre'] == 'Extractor'
+
+        Motor.objects.get(codigo='MTR-SEC').delete()
+        assert jerarquia_service.obtener(f'sector:{self.sector.id}')['motores'] == []
+
+    def test_filtros_admin_usan_la_cache(self, django_assert_num_queries):
+        otra = LineaProduccion.objects.create(nombre='L0')
+        Sector.objects.create(nombre='Secado', linea=otra)
+        jerarquia_service.obtener()
+
+        with django_assert_num_queries(0):
+            lineas = LineaProduccionFilter.lookups(None, None, None)
+            sectores = SectorFilter.lookups(None, None, None)
+        assert lineas == [(str(otra.id), 'L0'), (str(self.linea.id), 'L1')]
+        assert (str(self.sector.id), 'L1 - Horno') in sectores
@@ -0,0 +1,81 @@
+from datetime import date, time
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, ProduccionTurno, ParadaTurno, FallaTurno
+from api.oee_service import minutos_turno
+
+
+def test_minutos_turno_nocturno():
+    assert minutos_turno(time(6, 0), time(14, 0)) == 480
+    assert minutos_turno(time(22, 0), time(6, 0)) == 480
+
+
+@pytest.mark.django_db
+class TestKpiOEE:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+        self.fecha = date(2025, 3, 10)
+
+        ProduccionTurno.objects.create(
+            fecha=self.fecha, turno=self.turno, linea=self.linea, cantidad=400, meta_produccion=500
+        )
+        ParadaTurno.objects.create(
+            fecha=self.fecha, turno=self.turno, linea=self.linea,
+            motivo='limpieza', tipo='programada', duracion_minutos=30
+        )
+        ParadaTurno.objects.create(
+            fecha=self.fecha, turno=self.turno, linea=self.linea,
+            motivo='falla_equipo', tipo='no_programada', duracion_minutos=45
+        )
+        FallaTurno.objects.create(
+            fecha=self.fecha, turno=self.turno, linea=self.linea, tipo='calidad', cantidad=20
+        )
+
+    def _get(self, **params):
+        params.setdefault('fecha_desde', '2025-03-01')
+        params.setdefault('fecha_hasta', '2025-03-31')
+        return self.client.get(reverse('kpi-oee'), params)
+
+    def test_componentes_oee(self):
+        response = self._get()
+
+        assert response.status_code == status.HTTP_200_OK
+        fila = response.data['detalle'][0]
+        assert fila['linea_nombre'] == 'Línea 1'
+        assert fila['tiempo_planificado'] == 450
+        assert fila['tiempo_operativo'] == 405
+        assert fila['disponibilidad'] == pytest.approx(0.9)
+        assert fila['rendimiento'] == pytest.approx(400 / 450, abs=1e-4)
+        assert fila['calidad'] == pytest.approx(0.95)
+        # OEE = piezas buenas / meta
+        assert fila['oee'] == pytest.approx(380 / 500)
+        assert response.data['global']['oee'] == pytest.approx(380 / 500)
+
+    def test_cache_se_invalida_al_cargar_datos(self, django_capture_on_commit_callbacks):
+        assert self._get().data['global']['cantidad'] == 400
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProduccionTurno.objects.filter(linea=self.linea).update(cantidad=500)
+            ProduccionTurno.objects.get(linea=self.linea).save()
+
+        assert self._get().data['global']['cantidad'] == 500
+
+    def test_rango_sin_datos(self):
+        response = self._get(fecha_desde='2024-01-01', fecha_hasta='2024-01-31')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['global'] is None
+        assert response.data['detalle'] == []
+
+    def test_rango_invalido(self):
+        response = self._get(fecha_desde='2025-04-01', fecha_hasta='2025-03-01')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
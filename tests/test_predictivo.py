@@ -0,0 +1,97 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import predictivo_service
+from api.models import (
+    User, RutaInspeccion, VariableInspeccion, InspeccionEjecucion, ResultadoInspeccion,
+    PrediccionVariable, Evento,
+)
+
+
+class ModeloUmbral:
+    """Marca como anómala (-1) toda lectura por encima del límite"""
+
+    def __init__(self, limite):
+        self.limite = limite
+        self.llamadas = 0
+
+    def predict(self, X):
+        self.llamadas += 1
+        return np.where(X[:, 0] > self.limite, -1, 1)
+
+
+def test_modelo_cacheado_por_mtime(tmp_path):
+    path = tmp_path / 'modelo.pkl'
+    path.write_bytes(pickle.dumps({'version': 1}))
+
+    primero = predictivo_service.cargar_modelo(path)
+    assert predictivo_service.cargar_modelo(path) is primero
+
+    path.write_bytes(pickle.dumps({'version': 2}))
+    os.utime(path, (0, 0))
+    assert predictivo_service.cargar_modelo(path) == {'version': 2}
+
+    assert predictivo_service.cargar_modelo(tmp_path / 'no-existe.pkl') is None
+
+
+@pytest.mark.django_db
+class TestPrediccion:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='tecnico', password='pass')
+        self.ruta = RutaInspeccion.objects.create(
+            nombre='Ruta motores', activo_tipo='motor', activo_id=7, frecuencia_dias=7
+        )
+        self.temperatura = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Temperatura', unidad='°C', valor_referencia=60, tolerancia=1000
+        )
+        self.presion = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Presión', unidad='bar', valor_referencia=60, tolerancia=1000
+        )
+        self.modelo = ModeloUmbral(limite=100)
+
+    def _cargar(self, variable, valores):
+        for valor in valores:
+            ejecucion = InspeccionEjecucion.objects.create(ruta=self.ruta, tecnico=self.user)
+            ResultadoInspeccion.objects.create(ejecucion=ejecucion, variable=variable, valor_medido=valor)
+
+    def test_un_predict_y_alerta_solo_al_entrar(self):
+        self._cargar(self.temperatura, [50, 120, 130, 140, 60])
+        self._cargar(self.presion, [50, 55, 60, 65, 70])
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = predictivo_service.ejecutar_prediccion(modelo=self.modelo)
+
+        assert resultado == {'variables': 2, 'alertas': 1}
+        assert self.modelo.llamadas == 1
+        assert len([q for q in consultas if q['sql'].startswith('SELECT')]) <= 4
+
+        prediccion = PrediccionVariable.objects.get(variable=self.temperatura)
+        assert prediccion.score == pytest.approx(0.6)
+        assert prediccion.en_alerta
+        evento = Evento.objects.get()
+        assert evento.tipo == 'motor' and evento.objeto_id == 7
+        assert 'Temperatura' in evento.descripcion
+
+        # Sin resultados nuevos no se recalcula nada
+        assert predictivo_service.ejecutar_prediccion(modelo=self.modelo)['variables'] == 0
+
+        # Sigue en alerta: se actualiza el puntaje pero no se repite el evento
+        self._cargar(self.temperatura, [150])
+        assert predictivo_service.ejecutar_prediccion(modelo=self.modelo) == {'variables': 1, 'alertas': 0}
+        assert Evento.objects.count() == 1
+
+    def test_pocas_muestras_no_puntuan(self):
+        self._cargar(self.presion, [150, 160])
+
+        predictivo_service.ejecutar_prediccion(completo=True, modelo=self.modelo)
+
+        prediccion = PrediccionVariable.objects.get(variable=self.presion)
+        assert prediccion.muestras == 2
+        assert prediccion.score is None
+        assert not Evento.objects.exists()
@@ -0,0 +1,69 @@
+from datetime import date, time
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, Produccion, ProduccionComponente
+
+
+def test_parsear_codigo_compuesto():
+    assert ProduccionComponente.parsear('18x18x33|20&20x20x40|25') == [('18x18x33', 20.0), ('20x20x40', 25.0)]
+    assert ProduccionComponente.parsear('18x18x33') == [('18x18x33', None)]
+    assert ProduccionComponente.parsear('') == []
+
+
+@pytest.mark.django_db
+class TestProduccionComponentes:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+
+    def _produccion(self, dia, producto, toneladas):
+        return Produccion.objects.create(
+            fecha=date(2025, 3, dia), turno=self.turno, linea=self.linea,
+            producto=producto, fabricacion_toneladas=toneladas,
+        )
+
+    def test_componentes_se_sincronizan_al_guardar(self):
+        produccion = self._produccion(1, '18x18x33|40&20x20x40|60', 10)
+        assert list(produccion.componentes.values_list('producto', flat=True)) == ['18x18x33', '20x20x40']
+
+        produccion.producto = '20x20x40'
+        produccion.save()
+        assert list(produccion.componentes.values_list('producto', 'porcentaje')) == [('20x20x40', None)]
+
+    def test_filtro_por_producto_simple_en_codigo_compuesto(self):
+        self._produccion(1, '18x18x33|40&20x20x40|60', 10)
+        self._produccion(2, '20x20x40', 5)
+        self._produccion(3, '118x18x33', 5)
+
+        response = self.client.get(reverse('produccion-list'), {'producto': '18x18x33'})
+
+        assert response.status_code == status.HTTP_200_OK
+        resultados = response.data['results'] if isinstance(response.data, dict) else response.data
+        assert [r['producto'] for r in resultados] == ['18x18x33|40&20x20x40|60']
+
+    def test_filtro_no_interpreta_regex(self):
+        self._produccion(1, '18x18x33', 10)
+
+        response = self.client.get(reverse('produccion-list'), {'producto': '.*'})
+
+        resultados = response.data['results'] if isinstance(response.data, dict) else response.data
+        assert resultados == []
+
+    def test_totales_por_producto(self):
+        self._produccion(1, '18x18x33|40&20x20x40|60', 10)
+        self._produccion(2, '20x20x40', 5)
+
+        response = self.client.get(reverse('produccion-totales-por-producto'))
+
+        totales = {t['producto']: t for t in response.data}
+        assert totales['20x20x40']['fabricacion_toneladas'] == pytest.approx(11)
+        assert totales['20x20x40']['registros'] == 2
+        assert totales['18x18x33']['fabricacion_toneladas'] == pytest.approx(4)
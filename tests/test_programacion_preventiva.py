@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import (
+    User, Motor, Variador, PlanMantenimiento, VencimientoMantenimiento, OrdenMantenimiento, HistorialMantenimiento,
+)
+from api.programacion_service import calcular_vencimiento, generar_ordenes_preventivas, reconstruir_indice
+
+
+def _motor(codigo, **kwargs):
+    return Motor.objects.create(
+        codigo=codigo, potencia='5HP', tipo='Trifásico', rpm='1500', brida='B3', anclaje='Base', **kwargs
+    )
+
+
+def test_vence_lo_primero_entre_calendario_y_horas():
+    hoy = date(2025, 3, 10)
+    plan = PlanMantenimiento(intervalo_dias=90, intervalo_horas=1000, horas_uso_diarias=20)
+    motor = Motor(ultimo_mantenimiento=date(2025, 1, 1), horas_uso=1500, horas_ultimo_mantenimiento=600)
+
+    # Calendario: 1/4; horas: faltan 100 h a 20 h/día → 15/3
+    assert calcular_vencimiento(plan, motor, hoy) == (date(2025, 3, 15), 1600)
+
+    motor.horas_uso = 700
+    assert calcular_vencimiento(plan, motor, hoy) == (date(2025, 4, 1), 1600)
+
+
+@pytest.mark.django_db
+class TestProgramacionPreventiva:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='supervisor', password='pass', role='supervisor')
+        self.hoy = timezone.localdate()
+        self.plan = PlanMantenimiento.objects.create(
+            nombre='Lubricación', equipo_tipo='motor', intervalo_dias=90, anticipacion_dias=7, prioridad='alta'
+        )
+
+    def test_sin_planes_mantiene_frecuencias_historicas(self):
+        variador = Variador.objects.create(
+            codigo='VAR-1', marca='ABB', modelo='X', potencia='10HP', fecha_instalacion=self.hoy
+        )
+        assert variador.proximo_mantenimiento == self.hoy + timedelta(days=30)
+        assert not VencimientoMantenimiento.objects.filter(equipo_tipo='variador').exists()
+
+    def test_generacion_en_bloque_y_reprogramacion(self):
+        vence = _motor('MTR-1', ultimo_mantenimiento=self.hoy - timedelta(days=85))
+        lejos = _motor('MTR-2', ultimo_mantenimiento=self.hoy - timedelta(days=10))
+        for i in range(3, 6):
+            _motor(f'MTR-{i}', ultimo_mantenimiento=self.hoy - timedelta(days=88))
+
+        vence.refresh_from_db()
+        assert vence.proximo_mantenimiento == self.hoy + timedelta(days=5)
+        assert VencimientoMantenimiento.objects.count() == 5
+
+        with CaptureQueriesContext(connection) as consultas:
+            assert generar_ordenes_preventivas(creado_por=self.user) == 4
+        # Consultas constantes, independientes de la cantidad de órdenes
+        assert len(consultas) <= 12
+
+        orden = OrdenMantenimiento.objects.get(motores=vence)
+        assert orden.tipo == 'preventivo' and orden.prioridad == 'alta'
+        assert HistorialMantenimiento.objects.filter(orden=orden, equipo_id=vence.id).exists()
+        assert not OrdenMantenimiento.objects.filter(motores=lejos).exists()
+
+        # Una segunda pasada no duplica
+        assert generar_ordenes_preventivas() == 0
+
+        orden.estado = 'completada'
+        orden.fecha_cierre = timezone.now()
+        orden.save()
+
+        vence.refresh_from_db()
+        assert vence.ultimo_mantenimiento == self.hoy
+        assert vence.proximo_mantenimiento == self.hoy + timedelta(days=90)
+        vencimiento = VencimientoMantenimiento.objects.get(equipo_id=vence.id)
+        assert vencimiento.orden is None
+        assert vencimiento.fecha_vencimiento == self.hoy + timedelta(days=90)
+
+    def test_plan_por_horas_y_baja_del_equipo(self):
+        PlanMantenimiento.objects.create(
+            nombre='Rodamientos', equipo_tipo='motor', intervalo_horas=500, horas_uso_diarias=24, anticipacion_dias=2
+        )
+        motor = _motor('MTR-H', fecha_instalacion=self.hoy, horas_uso=450)
+
+        fila = VencimientoMantenimiento.objects.get(equipo_id=motor.id, plan__nombre='Rodamientos')
+        assert fila.fecha_vencimiento == self.hoy + timedelta(days=3)
+        assert fila.horas_vencimiento == 500
+
+        motor.ubicacion_tipo = 'deposito'
+        motor.save()
+        assert not VencimientoMantenimiento.objects.filter(equipo_id=motor.id).exists()
+
+        motor.ubicacion_tipo = 'linea'
+        motor.estado = 'operativo'
+        motor.save()
+        assert reconstruir_indice() == 2
@@ -0,0 +1,110 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, ProduccionTiempoReal
+from api.pronostico_service import ajustar, inicio_turno
+
+
+def test_ajuste_lineal_y_error():
+    t = np.array([0.5, 1.0, 1.5, 2.0])
+    tasa, proyeccion, error = ajustar(t, 10 * t + 2, 8.0)
+    assert tasa == pytest.approx(10)
+    assert proyeccion == pytest.approx(82)
+    assert error == pytest.approx(0)
+
+    assert ajustar(np.array([1.0, 2.0]), np.array([5.0, np.nan]), 8.0) is None
+
+
+def test_inicio_turno_nocturno():
+    turno = Turno(nombre='Noche', hora_inicio=time(22, 0), hora_fin=time(6, 0))
+    noche = timezone.make_aware(datetime(2025, 3, 10, 22, 0))
+
+    # Fecha del inicio del turno o fecha posterior a medianoche: mismo turno
+    assert inicio_turno(turno, date(2025, 3, 10), noche + timedelta(hours=1)) == noche
+    assert inicio_turno(turno, date(2025, 3, 11), noche + timedelta(hours=3)) == noche
+    # El turno de la noche siguiente no se corre
+    assert inicio_turno(turno, date(2025, 3, 11), noche + timedelta(hours=24)) == noche + timedelta(days=1)
+
+
+@pytest.mark.django_db
+class TestPronosticoTurno:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='supervisor', password='pass', role='supervisor')
+        self.client.force_authenticate(user=self.user)
+        self.turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+        self.fecha = date(2025, 3, 10)
+        self.inicio = timezone.make_aware(datetime.combine(self.fecha, self.turno.hora_inicio))
+
+    def _snapshot(self, horas, toneladas, meta=100):
+        return ProduccionTiempoReal.objects.create(
+            timestamp=self.inicio + timedelta(hours=horas), fecha=self.fecha, turno=self.turno,
+            linea=self.linea, fabricacion_toneladas=toneladas, bandejas=int(toneladas * 10),
+            meta_produccion=meta,
+        )
+
+    def _pronostico(self):
+        respuesta = self.client.get(
+            reverse('produccion-tiempo-real-pronostico'),
+            {'turno': self.turno.id, 'fecha': self.fecha.isoformat()},
+        )
+        assert respuesta.status_code == status.HTTP_200_OK
+        return respuesta.data
+
+    def test_proyeccion_contra_meta_y_cache(self):
+        for horas, toneladas in [(1, 10), (2, 21), (3, 29), (4, 40)]:
+            self._snapshot(horas, toneladas)
+
+        [pronostico] = self._pronostico()
+        toneladas = pronostico['metricas']['fabricacion_toneladas']
+        assert pronostico['avance_turno'] == pytest.approx(0.5)
+        assert toneladas['tasa_hora'] == pytest.approx(9.8)
+        assert toneladas['proyeccion'] == pytest.approx(9.8 * 8 + 0.5, abs=0.01)
+        assert toneladas['intervalo'][0] < toneladas['proyeccion'] < toneladas['intervalo'][1]
+        assert pronostico['probabilidad_meta'] < 0.05
+        assert pronostico['cumplimiento_proyectado'] == pytest.approx(78.9, abs=0.1)
+        assert 'bandejas' in pronostico['metricas']
+
+        # Sin muestras nuevas se sirve desde caché
+        with CaptureQueriesContext(connection) as consultas:
+            self._pronostico()
+        assert not [q for q in consultas if '"api_producciontiemporeal"."timestamp"' in q['sql']]
+
+        # Una muestra nueva invalida el pronóstico
+        self._snapshot(5, 60)
+        [pronostico] = self._pronostico()
+        assert pronostico['muestras'] == 5
+        assert pronostico['metricas']['fabricacion_toneladas']['tasa_hora'] > 9.8
+
+    def test_requiere_turno(self):
+        respuesta = self.client.get(reverse('produccion-tiempo-real-pronostico'))
+        assert respuesta.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_turno_que_cruza_medianoche(self):
+        noche = Turno.objects.create(nombre='Noche', hora_inicio=time(22, 0), hora_fin=time(6, 0))
+        inicio = timezone.make_aware(datetime(2025, 3, 10, 22, 0))
+        # Las muestras traen la fecha posterior a medianoche
+        for horas, toneladas in [(3, 30), (4, 40), (5, 50), (6, 60)]:
+            ProduccionTiempoReal.objects.create(
+                timestamp=inicio + timedelta(hours=horas), fecha=date(2025, 3, 11), turno=noche,
+                linea=self.linea, fabricacion_toneladas=toneladas, bandejas=toneladas * 10,
+                meta_produccion=80,
+            )
+
+        respuesta = self.client.get(
+            reverse('produccion-tiempo-real-pronostico'), {'turno': noche.id, 'fecha': '2025-03-11'},
+        )
+        [pronostico] = respuesta.data
+        assert pronostico['fin_turno'] == (inicio + timedelta(hours=8)).isoformat()
+        assert pronostico['avance_turno'] == pytest.approx(0.75)
+        assert pronostico['metricas']['fabricacion_toneladas']['proyeccion'] == pytest.approx(80)
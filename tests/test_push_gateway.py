@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from api import push_gateway
+from api.push_gateway import PushGateway, TransporteSimulado, obtener_gateway, reiniciar_gateway
+from api.notification_service import NotificationService
+
+
+@pytest.fixture
+def gateway_simulado(settings):
+    settings.FCM_TRANSPORTE = 'simulado'
+    settings.FCM_LATENCIA_SIMULADA = 0
+    reiniciar_gateway()
+    yield
+    reiniciar_gateway()
+
+
+def test_envio_concurrente_conserva_orden_y_errores():
+    transporte = TransporteSimulado(latencia=0.05, tokens_invalidos={'t3'})
+    gateway = PushGateway(transporte, max_workers=8)
+    tokens = [f"t{i}" for i in range(16)]
+
+    inicio = time.perf_counter()
+    respuesta = gateway.notify_multiple_devices(tokens, 'T', 'M', {'tipo': 'sistema'})
+    segundos = time.perf_counter() - inicio
+    gateway.cerrar()
+
+    # 16 envíos de 50 ms en 8 hilos: ~2 rondas en lugar de 0.8 s en serie
+    assert segundos < 0.4
+    assert respuesta['success'] == 15 and respuesta['failure'] == 1
+    assert respuesta['results'][3] == {'error': 'UNREGISTERED'}
+    assert transporte.enviados == 15
+
+
+def test_invalid_argument_solo_invalida_errores_de_token():
+    respuesta = {'results': [
+        {'message_id': 'm1'},
+        {'error': 'INVALID_ARGUMENT', 'detalle': 'The registration token is not a valid FCM registration token'},
+        {'error': 'INVALID_ARGUMENT', 'detalle': 'Invalid value at message.data'},
+        {'error': 'INVALID_ARGUMENT'},
+        {'error': 'UNREGISTERED'},
+    ]}
+
+    entregados, invalidos = NotificationService._analizar_respuesta(['a', 'b', 'c', 'd', 'e'], respuesta)
+
+    assert entregados == ['a']
+    assert invalidos == ['b', 'e']
+
+
+def test_gateway_unico_por_proceso(gateway_simulado):
+    gateway = obtener_gateway()
+    assert obtener_gateway() is gateway
+    assert NotificationService().push_service is gateway
+    assert isinstance(gateway.transporte, TransporteSimulado)
+
+    reiniciar_gateway()
+    assert push_gateway._gateway is None
+    assert obtener_gateway() is not gateway
+
+
+@pytest.mark.django_db
+def test_tokens_rechazados_por_el_gateway_se_desactivan(gateway_simulado):
+    from api.models import DispositivoApp
+
+    DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='bueno', plataforma='android')
+    DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='malo', plataforma='android')
+    obtener_gateway().transporte.tokens_invalidos.add('malo')
+
+    entregados, invalidos = NotificationService()._enviar_multicast(['bueno', 'malo'], 'T', 'M', {})
+    NotificationService._desactivar_tokens(invalidos)
+
+    assert entregados == ['bueno']
+    assert list(DispositivoApp.objects.filter(esta_activo=True).values_list('token_fcm', flat=True)) == ['bueno']
+
+
+@pytest.mark.django_db
+def test_envio_masivo_reintenta_usuarios_sin_entregas(gateway_simulado):
+    from api.models import DispositivoApp, NotificacionApp, User
+
+    ana = User.objects.create_user(username='ana', password='pass', role='tecnico')
+    beto = User.objects.create_user(username='beto', password='pass', role='tecnico')
+    DispositivoApp.objects.create(usuario_id=ana.id, usuario_nombre='ana', token_fcm='ana-1', plataforma='android')
+    DispositivoApp.objects.create(usuario_id=beto.id, usuario_nombre='beto', token_fcm='beto-1', plataforma='android')
+    # El único dispositivo de beto falla de forma transitoria
+    obtener_gateway().transporte.tokens_no_disponibles.add('beto-1')
+
+    assert NotificationService().enviar_notificacion_masiva([ana, beto], 'T', 'M', 'mantenimiento') == 1
+
+    assert NotificacionApp.objects.get(usuario_id=ana.id).enviada_push
+    fallida = NotificacionApp.objects.get(usuario_id=beto.id)
+    assert not fallida.enviada_push
+    assert fallida.intentos_envio == 1 and fallida.proximo_intento is not None
+    assert fallida.error_envio == 'FCM rechazó todos los dispositivos'
+    # Un error transitorio no desactiva el token
+    assert DispositivoApp.objects.get(token_fcm='beto-1').esta_activo
+
+
+@pytest.mark.django_db
+def test_servicio_notificaciones_usa_reintentos_y_desactiva_tokens(gateway_simulado):
+    from api.models import DispositivoApp, NotificacionApp
+    from api.notificaciones_service import ServicioNotificaciones
+
+    DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='muerto', plataforma='android')
+    DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='caido', plataforma='android')
+    transporte = obtener_gateway().transporte
+    transporte.tokens_invalidos.add('muerto')
+    transporte.tokens_no_disponibles.add('caido')
+    notificacion = NotificacionApp.objects.create(
+        usuario_id=1, usuario_nombre='u1', titulo='T', mensaje='M', tipo='revision', prioridad='media',
+    )
+
+    ServicioNotificaciones().enviar_notificacion_push(notificacion)
+
+    notificacion.refresh_from_db()
+    assert not notificacion.enviada_push
+    assert notificacion.intentos_envio == 1 and notificacion.proximo_intento is not None
+    assert list(DispositivoApp.objects.filter(esta_activo=True).values_list('token_fcm', flat=True)) == ['caido']
+
+    transporte.tokens_no_disponibles.clear()
+    ServicioNotificaciones().enviar_notificacion_push(notificacion)
+    notificacion.refresh_from_db()
+    assert notificacion.enviada_push
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from api.models import User, Motor, Variador, NotificacionApp, DispositivoApp
+from api.notification_service import NotificationService
+from api.tasks import verificar_mantenimientos_preventivos
+
+
+@pytest.fixture
+def push():
+    with mock.patch.object(NotificationService, '__init__', lambda self: None):
+        servicio = mock.MagicMock()
+        with mock.patch.object(NotificationService, 'push_service', servicio, create=True):
+            yield servicio
+
+
+@pytest.mark.django_db
+class TestRecordatoriosPreventivos:
+
+    def setup_method(self):
+        hoy = timezone.localdate()
+        # Sin planes: primer mantenimiento a los 30 días de la instalación
+        Motor.objects.create(
+            codigo='MTR-1', potencia='5HP', tipo='T', rpm='1500', brida='B3', anclaje='Base',
+            fecha_instalacion=hoy - timedelta(days=28),
+        )
+        Motor.objects.create(
+            codigo='MTR-LEJOS', potencia='5HP', tipo='T', rpm='1500', brida='B3', anclaje='Base',
+            fecha_instalacion=hoy,
+        )
+        Variador.objects.create(
+            codigo='VAR-1', marca='ABB', modelo='X', potencia='10HP', fecha_instalacion=hoy - timedelta(days=30),
+        )
+        self.tecnicos = [
+            User.objects.create_user(username=f'tecnico{i}', password='pass', role='tecnico') for i in range(3)
+        ]
+        for i, tecnico in enumerate(self.tecnicos[:2]):
+            DispositivoApp.objects.create(
+                usuario_id=tecnico.id, usuario_nombre=tecnico.username, token_fcm=f'token-{i}', plataforma='android'
+            )
+
+    def test_un_resumen_por_tecnico_y_un_envio(self, push, django_assert_max_num_queries):
+        with django_assert_max_num_queries(6):
+            resultado = verificar_mantenimientos_preventivos()
+
+        assert resultado == '2 equipos por vencer, 2 técnicos notificados'
+        notificaciones = NotificacionApp.objects.all()
+        assert notificaciones.count() == 3
+        mensaje = notificaciones[0].mensaje
+        assert 'VAR-1 (hoy)' in mensaje and 'MTR-1 (2 días)' in mensaje
+        assert 'MTR-LEJOS' not in mensaje
+        assert notificaciones.filter(enviada_push=True).count() == 2
+
+        push.notify_multiple_devices.assert_called_once()
+        assert sorted(push.notify_multiple_devices.call_args.kwargs['registration_ids']) == ['token-0', 'token-1']
+
+    def test_error_de_envio_queda_registrado(self, push):
+        push.notify_multiple_devices.side_effect = RuntimeError('FCM caído')
+
+        verificar_mantenimientos_preventivos()
+
+        assert NotificacionApp.objects.filter(intentos_envio=1, error_envio='FCM caído').count() == 2
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from api.models import User, NotificacionApp, DispositivoApp
+from api.notification_service import NotificationService
+from api.tasks import reintentar_notificaciones_fallidas
+
+
+@pytest.fixture
+def push():
+    with mock.patch.object(NotificationService, '__init__', lambda self: None):
+        servicio = mock.MagicMock()
+        with mock.patch.object(NotificationService, 'push_service', servicio, create=True):
+            yield servicio
+
+
+def _respuesta(*errores):
+    return {'results': [{'error': e} if e else {'message_id': 'x'} for e in errores]}
+
+
+@pytest.mark.django_db
+class TestReintentosPush:
+
+    def setup_method(self):
+        DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='vivo', plataforma='android')
+        DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u1', token_fcm='viejo', plataforma='android')
+        DispositivoApp.objects.create(usuario_id=2, usuario_nombre='u2', token_fcm='otro', plataforma='ios')
+
+    def _pendiente(self, usuario_id, intentos=1, vencida=True):
+        return NotificacionApp.objects.create(
+            usuario_id=usuario_id, usuario_nombre=f'u{usuario_id}', titulo='T', mensaje='M', tipo='sistema',
+            intentos_envio=intentos,
+            proximo_intento=timezone.now() + timedelta(minutes=-1 if vencida else 10),
+        )
+
+    def test_backoff_exponencial_con_jitter(self):
+        ahora = timezone.now()
+        for intentos, minutos in [(1, 5), (2, 10), (3, 20), (4, 40)]:
+            espera = NotificationService.calcular_proximo_intento(intentos, ahora) - ahora
+            assert timedelta(minutes=minutos / 2) <= espera <= timedelta(minutes=minutos)
+        assert NotificationService.calcular_proximo_intento(NotificationService.MAX_INTENTOS, ahora) is None
+
+    def test_fallo_de_envio_programa_reintento(self, push):
+        tecnico = User.objects.create_user(username='tecnico', password='pass', role='tecnico')
+        DispositivoApp.objects.create(usuario_id=tecnico.id, usuario_nombre='tecnico', token_fcm='t', plataforma='android')
+        push.notify_multiple_devices.side_effect = Exception('timeout')
+        assert NotificationService().enviar_notificacion_individual(tecnico.id, 'T', 'M', 'sistema') is False
+
+        notificacion = NotificacionApp.objects.get()
+        assert notificacion.intentos_envio == 1
+        assert notificacion.error_envio == 'timeout'
+        assert notificacion.proximo_intento > timezone.now()
+
+    def test_reintento_envia_y_desactiva_tokens_invalidos(self, push):
+        primera = self._pendiente(1)
+        segunda = self._pendiente(1)
+        self._pendiente(2, vencida=False)
+        push.notify_multiple_devices.side_effect = [_respuesta(None, 'NotRegistered'), _respuesta(None)]
+
+        resumen = reintentar_notificaciones_fallidas()
+
+        assert resumen == {'reintentadas': 2, 'enviadas': 2, 'tokens_invalidos': 1}
+        assert not DispositivoApp.objects.get(token_fcm='viejo').esta_activo
+        # El token rechazado no se vuelve a usar en la misma pasada
+        assert push.notify_multiple_devices.call_args_list[1].kwargs['registration_ids'] == ['vivo']
+        for notificacion in (primera, segunda):
+            notificacion.refresh_from_db()
+            assert notificacion.enviada_push and notificacion.proximo_intento is None
+        assert NotificacionApp.objects.filter(enviada_push=False).count() == 1
+
+    def test_reintento_fallido_aumenta_espera_y_se_agota(self, push):
+        notificacion = self._pendiente(2, intentos=3)
+        agotada = self._pendiente(2, intentos=4)
+        push.notify_multiple_devices.side_effect = Exception('FCM caído')
+
+        NotificationService().reintentar_fallidas()
+
+        notificacion.refresh_from_db()
+        agotada.refresh_from_db()
+        assert notificacion.intentos_envio == 4
+        assert timedelta(minutes=19) < notificacion.proximo_intento - timezone.now() <= timedelta(minutes=40)
+        assert agotada.intentos_envio == 5 and agotada.proximo_intento is None
+        assert agotada.error_envio == 'FCM caído'
+
+    def test_sin_dispositivos_sale_de_la_cola(self, push):
+        notificacion = self._pendiente(99)
+        NotificationService().reintentar_fallidas()
+
+        notificacion.refresh_from_db()
+        assert notificacion.proximo_intento is None
+        push.notify_multiple_devices.assert_not_called()
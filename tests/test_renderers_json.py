@@ -0,0 +1,57 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.models import User
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+
+
+def test_misma_salida_que_json_de_drf():
+    ahora = timezone.now()
+    datos = [{
+        'fecha': ahora, 'dia': ahora.date(), 'naive': ahora.replace(tzinfo=None),
+        'costo': Decimal('1520.50'), 'estado': gettext_lazy('Activo'), 'duracion': timedelta(minutes=5),
+        'texto': 'Línea ñandú', 'conteos': {1: 3}, 'vacio': None,
+    }]
+    assert ORJSONRenderer().render(datos, 'application/json') == JSONRenderer().render(datos, 'application/json')
+    assert ORJSONRenderer().render(None) == b''
+
+
+def test_indent():
+    contenido = ORJSONRenderer().render({'a': [1]}, 'application/json; indent=4')
+    assert contenido == b'{\n  "a": [\n    1\n  ]\n}'
+
+
+def test_parser():
+    parser = ORJSONParser()
+    assert parser.parse(BytesIO('{"linea": "Línea 1", "toneladas": 12.5}'.encode())) == {'linea': 'Línea 1', 'toneladas': 12.5}
+    with pytest.raises(ParseError):
+        parser.parse(BytesIO(b'{"valor": NaN}'))
+    with pytest.raises(ParseError):
+        parser.parse(BytesIO(b'{roto'))
+
+
+@pytest.mark.django_db
+def test_api_usa_orjson():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(username='sup', password='pass', role='supervisor'))
+    datos = {'nombre': 'Bobinados Ñuñoa', 'especialidad': 'electrico', 'contacto': 'Ana',
+             'telefono': '123', 'email': 'ana@example.com'}
+
+    creado = client.post('/api/proveedores/', datos, format='json')
+    assert creado.status_code == 201
+
+    lista = client.get('/api/proveedores/')
+    assert lista['Content-Type'] == 'application/json'
+    assert json.loads(lista.content)[0]['nombre'] == 'Bobinados Ñuñoa'
+    assert 'Ñuñoa'.encode() in lista.content
+    assert client.post('/api/proveedores/', '{roto', content_type='application/json').status_code == 400
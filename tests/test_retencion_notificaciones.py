@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from api import contadores_service
+from api.models import NotificacionApp, DispositivoApp, ResumenNotificacionArchivada
+from api.retencion_service import purgar_notificaciones, purgar_dispositivos, resumen_antiguedad
+from api.notification_service import NotificationService
+from api.tasks import limpiar_dispositivos_inactivos
+
+
+def _notificacion(dias, leida=True, tipo='alerta', usuario_id=1):
+    notificacion = NotificacionApp.objects.create(
+        usuario_id=usuario_id, usuario_nombre='u', titulo='T', mensaje='M', tipo=tipo, prioridad='media', leida=leida,
+    )
+    NotificacionApp.objects.filter(pk=notificacion.pk).update(fecha_creacion=timezone.now() - timedelta(days=dias))
+    return notificacion
+
+
+@pytest.mark.django_db
+class TestRetencionNotificaciones:
+
+    def test_purga_en_lotes_y_archiva(self, django_capture_on_commit_callbacks):
+        for _ in range(5):
+            _notificacion(120)
+        _notificacion(120, tipo='falla')
+        recientes = _notificacion(10)
+        no_leida = _notificacion(120, leida=False)
+        vieja_no_leida = _notificacion(400, leida=False)
+        assert contadores_service.conteo(1) == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            eliminadas = purgar_notificaciones(lote=2)
+
+        assert eliminadas == {'leidas': 6, 'no_leidas': 1}
+        assert set(NotificacionApp.objects.values_list('id', flat=True)) == {recientes.id, no_leida.id}
+        # Resumen acumulado entre lotes, por tipo
+        resumen = {}
+        for fila in ResumenNotificacionArchivada.objects.all():
+            cantidad, leidas = resumen.get(fila.tipo, (0, 0))
+            resumen[fila.tipo] = (cantidad + fila.cantidad, leidas + fila.leidas)
+        assert resumen == {'alerta': (6, 5), 'falla': (1, 1)}
+        # La no leída eliminada descuenta el contador
+        assert contadores_service.conteo(1) == 1
+        assert not NotificacionApp.objects.filter(pk=vieja_no_leida.pk).exists()
+
+    def test_resumen_por_antiguedad(self):
+        _notificacion(1)
+        _notificacion(50, leida=False)
+        _notificacion(500)
+
+        resumen = resumen_antiguedad()
+        assert resumen['leidas_7d'] == 1
+        assert resumen['no_leidas_90d'] == 1
+        assert resumen['leidas_mas_365d'] == 1
+        assert sum(resumen.values()) == 3
+
+    def test_purga_dispositivos(self):
+        hace = lambda dias: timezone.now() - timedelta(days=dias)
+        for token, activo, dias in [('rechazado', False, 40), ('recien_rechazado', False, 5),
+                                    ('abandonado', True, 300), ('vigente', True, 10)]:
+            DispositivoApp.objects.create(
+                usuario_id=1, usuario_nombre='u', token_fcm=token, plataforma='android', esta_activo=activo
+            )
+            DispositivoApp.objects.filter(token_fcm=token).update(ultima_actualizacion=hace(dias))
+
+        assert limpiar_dispositivos_inactivos() == {'inactivos': 1, 'sin_uso': 1}
+        assert set(DispositivoApp.objects.values_list('token_fcm', flat=True)) == {'recien_rechazado', 'vigente'}
+        assert purgar_dispositivos() == {'inactivos': 0, 'sin_uso': 0}
+
+    def test_token_rechazado_se_conserva_el_periodo_completo(self):
+        DispositivoApp.objects.create(usuario_id=1, usuario_nombre='u', token_fcm='viejo', plataforma='android')
+        # Registrado hace tiempo y rechazado hoy por FCM
+        DispositivoApp.objects.filter(token_fcm='viejo').update(ultima_actualizacion=timezone.now() - timedelta(days=200))
+
+        NotificationService._desactivar_tokens(['viejo'])
+
+        assert purgar_dispositivos() == {'inactivos': 0, 'sin_uso': 0}
+        assert not DispositivoApp.objects.get(token_fcm='viejo').esta_activo
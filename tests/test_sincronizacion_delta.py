@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import User, Motor, Variador, Equipo, Sector, LineaProduccion, RegistroEliminado, Deposito
+from api.sincronizacion_service import codificar_cursor
+
+
+def _motor(codigo, **kwargs):
+    return Motor.objects.create(
+        codigo=codigo, potencia='5HP', tipo='T', rpm='1500', brida='B3', anclaje='Base', **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestSincronizacionDelta:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='tecnico', password='pass', role='tecnico'))
+        linea = LineaProduccion.objects.create(nombre='L1')
+        self.sector = Sector.objects.create(nombre='Horno', linea=linea)
+        self.equipo = Equipo.objects.create(nombre='Ventilador', sector=self.sector)
+        self.viejo = _motor('MTR-VIEJO', linea=linea, sector=self.sector, equipo=self.equipo)
+        self.borrado = _motor('MTR-BORRADO')
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        Motor.objects.update(updated_at=hace_una_hora)
+        Equipo.objects.update(updated_at=hace_una_hora)
+        self.cursor = codificar_cursor(timezone.now() - timedelta(minutes=1))
+
+    def test_delta_con_cambios_y_eliminados(self):
+        nuevo = _motor('MTR-NUEVO')
+        borrado_id = self.borrado.id
+        self.borrado.delete()
+
+        respuesta = self.client.get('/api/mobile/motores/', {'since': self.cursor})
+
+        assert respuesta.status_code == 200
+        assert [m['codigo'] for m in respuesta.data['cambios']] == ['MTR-NUEVO']
+        assert respuesta.data['eliminados'] == [borrado_id]
+        assert respuesta.data['completo'] is False
+        assert int(respuesta.data['cursor']) > int(self.cursor)
+        assert nuevo.id not in respuesta.data['eliminados']
+
+    def test_renombrar_equipo_marca_sus_motores(self):
+        self.equipo.nombre = 'Extractor'
+        self.equipo.save()
+
+        respuesta = self.client.get(reverse('motor-list'), {'since': self.cursor})
+        assert [m['codigo'] for m in respuesta.data['cambios']] == ['MTR-VIEJO']
+        assert respuesta.data['cambios'][0]['equipo_nombre'] == 'Extractor'
+
+    def test_renombrar_deposito_marca_sus_motores(self):
+        deposito = Deposito.objects.create(nombre='Pañol')
+        guardado = _motor('MTR-PANOL', ubicacion_tipo='deposito', deposito=deposito)
+        Motor.objects.filter(pk=guardado.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        deposito.nombre = 'Pañol central'
+        deposito.save()
+
+        respuesta = self.client.get(reverse('motor-list'), {'since': self.cursor})
+        assert [m['codigo'] for m in respuesta.data['cambios']] == ['MTR-PANOL']
+        assert respuesta.data['cambios'][0]['deposito_nombre'] == 'Pañol central'
+
+    def test_delta_rechaza_filtros_de_ubicacion(self):
+        respuesta = self.client.get(reverse('motor-list'), {'since': self.cursor, 'equipo': self.equipo.id})
+        assert respuesta.status_code == 400
+        assert 'equipo' in respuesta.data['error']
+        assert self.client.get(reverse('equipo-list'), {'since': self.cursor, 'sector': self.sector.id}).status_code == 400
+        # Sin since el filtro sigue disponible
+        assert self.client.get(reverse('motor-list'), {'equipo': self.equipo.id}).status_code == 200
+
+    def test_cursor_vencido_pide_resincronizacion(self):
+        viejo = codificar_cursor(timezone.now() - timedelta(days=60))
+        respuesta = self.client.get(reverse('equipo-list'), {'since': viejo})
+
+        assert respuesta.data['completo'] is True
+        assert len(respuesta.data['cambios']) == 1
+        assert self.client.get(reverse('equipo-list'), {'since': 'abc'}).status_code == 400
+
+    def test_lista_completa_con_etag(self):
+        url = reverse('variador-list')
+        Variador.objects.create(codigo='VAR-1', marca='ABB', modelo='X', potencia='10HP')
+
+        primera = self.client.get(url)
+        assert primera.status_code == 200 and len(primera.data) == 1
+        etag = primera['ETag']
+        assert primera['X-Sync-Cursor'] and primera['Last-Modified']
+
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert self.client.get(url, HTTP_IF_MODIFIED_SINCE=primera['Last-Modified']).status_code == 304
+
+        Variador.objects.get().delete()
+        cambiada = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert cambiada.status_code == 200 and cambiada.data == []
+        assert RegistroEliminado.objects.filter(modelo='variador').count() == 1
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import (
+    User, RutaInspeccion, VariableInspeccion, InspeccionEjecucion, ResultadoInspeccion, CapacidadVariable,
+)
+from api.spc_service import (
+    calcular_capacidad, reglas_western_electric, actualizar_capacidades, A2, d2,
+)
+
+
+def test_cp_cpk_con_subgrupos_de_cinco():
+    valores = [59, 60, 61, 60, 60, 58, 60, 62, 61, 59, 60, 61, 59, 60, 60]
+    resultado = calcular_capacidad(valores, valor_referencia=60, tolerancia=6)
+
+    subgrupos = np.array(valores, dtype=float).reshape(-1, 5)
+    rango_medio = (subgrupos.max(axis=1) - subgrupos.min(axis=1)).mean()
+    media = subgrupos.mean()
+    sigma = rango_medio / d2
+
+    assert resultado['subgrupos'] == 3
+    assert resultado['sigma'] == pytest.approx(sigma)
+    assert resultado['cp'] == pytest.approx(12 / (6 * sigma))
+    assert resultado['cpk'] == pytest.approx(min(66 - media, media - 54) / (3 * sigma))
+    assert resultado['ucl_x'] == pytest.approx(media + A2 * rango_medio)
+
+
+def test_capacidad_requiere_subgrupos_suficientes():
+    assert calcular_capacidad([60, 61, 59, 60, 60, 61], 60, 5) is None
+
+
+def test_reglas_western_electric():
+    medias = [0.5, 0.2, 3.5, 2.5, 2.4, -0.1, 1.5, 1.2, 1.1, 1.3, -0.5]
+    violaciones = reglas_western_electric(medias, centro=0, sigma_x=1)
+
+    assert violaciones['regla_1'] == [2]
+    assert 4 in violaciones['regla_2']
+    assert 9 in violaciones['regla_3']
+    assert violaciones['regla_4'] == []
+
+    assert reglas_western_electric([0.1] * 8, centro=0, sigma_x=1)['regla_4'] == [7]
+
+
+@pytest.mark.django_db
+class TestCapacidadVariable:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='supervisor', password='pass', role='supervisor')
+        self.client.force_authenticate(user=self.user)
+        self.ruta = RutaInspeccion.objects.create(
+            nombre='Ruta motores', activo_tipo='motor', activo_id=1, frecuencia_dias=7
+        )
+        self.estable = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Temperatura', unidad='°C', valor_referencia=60, tolerancia=5
+        )
+        self.inestable = VariableInspeccion.objects.create(
+            ruta=self.ruta, nombre='Vibración', unidad='mm/s', valor_referencia=4, tolerancia=1
+        )
+
+    def _cargar(self, variable, valores):
+        for valor in valores:
+            ejecucion = InspeccionEjecucion.objects.create(ruta=self.ruta, tecnico=self.user)
+            ResultadoInspeccion.objects.create(ejecucion=ejecucion, variable=variable, valor_medido=valor)
+
+    def test_actualizacion_incremental_y_ranking(self):
+        self._cargar(self.estable, [60, 60.5, 59.5, 60, 60.2] * 3)
+        self._cargar(self.inestable, [3, 5, 4, 3.5, 4.8] * 3)
+
+        assert actualizar_capacidades() == 2
+        # Sin resultados nuevos no hay nada pendiente
+        assert actualizar_capacidades() == 0
+
+        capacidad = CapacidadVariable.objects.get(variable=self.inestable)
+        assert capacidad.muestras == 15
+        assert capacidad.subgrupos == 3
+
+        respuesta = self.client.get(reverse('dashboard-capacidad'))
+        assert respuesta.status_code == status.HTTP_200_OK
+        assert [c['variable'] for c in respuesta.data] == [self.inestable.id, self.estable.id]
+        assert respuesta.data[0]['variable_nombre'] == 'Vibración'
+
+        self._cargar(self.estable, [61])
+        assert actualizar_capacidades() == 1
+
+    def test_cambio_de_tolerancia_recalcula_cpk(self, django_capture_on_commit_callbacks):
+        self._cargar(self.estable, [60, 61, 59, 60, 62, 58, 60, 61, 59, 60])
+        actualizar_capacidades()
+        cpk = CapacidadVariable.objects.get(variable=self.estable).cpk
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.estable.tolerancia *= 2
+            self.estable.save()
+
+        assert CapacidadVariable.objects.get(variable=self.estable).cpk == pytest.approx(cpk * 2, rel=0.01)
+
+    def test_ranking_rechaza_parametros_invalidos(self):
+        url = reverse('dashboard-capacidad')
+        for parametros in ({'ruta_id': 'abc'}, {'ruta_id': '0'}, {'limit': 'x'}, {'limit': '-1'}):
+            assert self.client.get(url, parametros).status_code == status.HTTP_400_BAD_REQUEST
+        assert self.client.get(url, {'ruta_id': self.ruta.id}).status_code == status.HTTP_200_OK
+
+    def test_grafico_control(self):
+        self._cargar(self.estable, [60, 61, 59, 60, 62, 58, 60, 61, 59, 60])
+
+        respuesta = self.client.get(reverse('variableinspeccion-spc', args=[self.estable.id]))
+
+        assert respuesta.status_code == status.HTTP_200_OK
+        assert len(respuesta.data['medias']) == 2
+        assert respuesta.data['lie'] == 55
+        assert set(respuesta.data['violaciones']) == {'regla_1', 'regla_2', 'regla_3', 'regla_4'}
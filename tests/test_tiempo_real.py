@@ -0,0 +1,88 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import User, Turno, LineaProduccion, Evento
+from api.tiempo_real_service import procesar_muestra, MINUTOS_DETENCION
+
+
+INICIO = timezone.make_aware(datetime(2025, 3, 10, 6, 0))
+FECHA = date(2025, 3, 10)
+
+
+def _serie(linea_id, incrementos, minutos=5, inicio=0):
+    """Envía snapshots acumulados cada `minutos` y devuelve las alertas de cada uno"""
+    acumulado, alertas = inicio, []
+    for i, incremento in enumerate(incrementos):
+        acumulado += incremento
+        alertas.append(procesar_muestra(
+            linea_id, 1, FECHA, INICIO + timedelta(minutes=minutos * i), {'bandejas': acumulado}
+        ))
+    return alertas
+
+
+def test_caida_de_tasa_dispara_una_sola_alerta():
+    alertas = _serie(1, [0, 100, 100, 100, 100, 30, 30, 30])
+
+    tipos = [a['tipo'] for lote in alertas for a in lote]
+    assert tipos == ['caida']
+    alerta = alertas[6][0]
+    assert alerta['metrica'] == 'bandejas'
+    assert alerta['tasa'] == pytest.approx(360)
+    assert alerta['base'] == pytest.approx(1200)
+
+
+def test_detencion_y_recuperacion():
+    pasos_detencion = MINUTOS_DETENCION // 5
+    alertas = _serie(2, [0, 100, 100, 100, 100] + [0] * pasos_detencion + [100, 100] + [30, 30])
+
+    # La detención prevalece sobre la caída; al recuperar se rearma la detección
+    tipos = [a['tipo'] for lote in alertas for a in lote]
+    assert tipos == ['detencion', 'caida']
+
+
+def test_cambio_de_turno_reinicia_el_estado():
+    _serie(3, [0, 100, 100, 100, 100])
+    # Nuevo turno: el acumulado vuelve a cero sin alertar
+    alertas = procesar_muestra(3, 2, FECHA, INICIO + timedelta(hours=8), {'bandejas': 0})
+    assert alertas == []
+
+
+@pytest.mark.django_db
+def test_muestra_sin_consultas_a_la_base():
+    with CaptureQueriesContext(connection) as consultas:
+        _serie(4, [0, 100, 100, 100, 100, 10, 10])
+    assert len(consultas) == 0
+
+
+@pytest.mark.django_db
+class TestIngestaTiempoReal:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='nodered', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.turno = Turno.objects.create(nombre='Mañana', hora_inicio=time(6, 0), hora_fin=time(14, 0))
+        self.linea = LineaProduccion.objects.create(nombre='Línea 1')
+
+    def test_evento_al_detectar_caida(self):
+        for i, bandejas in enumerate([0, 100, 200, 300, 400, 420, 440]):
+            respuesta = self.client.post(reverse('produccion-tiempo-real-list'), {
+                'timestamp': (INICIO + timedelta(minutes=5 * i)).isoformat(),
+                'fecha': FECHA.isoformat(),
+                'turno': self.turno.id,
+                'linea': self.linea.id,
+                'bandejas': bandejas,
+            })
+            assert respuesta.status_code == status.HTTP_201_CREATED
+
+        evento = Evento.objects.get(tipo='linea')
+        assert evento.objeto_id == self.linea.id
+        assert 'Línea 1' in evento.descripcion
+        assert 'caída de bandejas' in evento.descripcion